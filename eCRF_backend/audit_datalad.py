@@ -11,7 +11,10 @@ from sqlalchemy.orm import Session
 from .database import get_db
 from . import models
 from .users import get_current_user
+from .datalad_audit_blobs import load_blob
+from .datalad_audit_log import tail_lines
 from .datalad_repo import DataladStudyRepo
+from .utils import parse_int_csv, parse_str_csv, utc_iso
 
 router = APIRouter(prefix="/audit", tags=["audit"])
 repo = DataladStudyRepo()
@@ -97,41 +100,8 @@ def _safe_iso_to_dt(value: Any) -> datetime:
 
 
 def _tail_lines(path: Path, limit: int) -> List[str]:
-    if not path.exists() or not path.is_file():
-        return []
-    if limit <= 0:
-        return []
-
-    with path.open("rb") as f:
-        f.seek(0, 2)
-        end = f.tell()
-        block_size = 8192
-        data = b""
-        pos = end
-        newline_count = 0
-
-        while pos > 0 and newline_count <= limit:
-            read_size = min(block_size, pos)
-            pos -= read_size
-            f.seek(pos)
-            chunk = f.read(read_size)
-            data = chunk + data
-            newline_count = data.count(b"\n")
-
-        text = data.decode("utf-8", errors="ignore")
-        lines = [ln for ln in text.splitlines() if ln.strip()]
-        return lines[-limit:]
-
-
-def _count_jsonl_lines(path: Path) -> int:
-    if not path.exists() or not path.is_file():
-        return 0
-    count = 0
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            if line.strip():
-                count += 1
-    return count
+    # Reads back into sealed segments when the active events.jsonl is short.
+    return [ln.decode("utf-8", errors="ignore") for ln in tail_lines(path, limit)]
 
 
 def _load_jsonl_tail(path: Path, limit: int) -> List[Dict[str, Any]]:
@@ -147,22 +117,6 @@ def _load_jsonl_tail(path: Path, limit: int) -> List[Dict[str, Any]]:
     return rows[:limit]
 
 
-def _iter_jsonl(path: Path):
-    if not path.exists() or not path.is_file():
-        return
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            s = line.strip()
-            if not s:
-                continue
-            try:
-                row = json.loads(s)
-            except Exception:
-                continue
-            if isinstance(row, dict):
-                yield row
-
-
 def _human_action(action: str) -> str:
     mapping = {
         "study_created": "Study created",
@@ -244,16 +198,6 @@ def _read_events_from_jsonl(path: Path, limit: int) -> List[Dict[str, Any]]:
     return out
 
 
-def _find_event_in_jsonl(path: Path, event_id: str) -> Optional[Dict[str, Any]]:
-    if not path.exists() or not path.is_file():
-        return None
-    found: Optional[Dict[str, Any]] = None
-    for row in _iter_jsonl(path):
-        if str(row.get("id") or "") == str(event_id):
-            found = row
-    return found
-
-
 def _find_event_record(
     study_id: int,
     study_name: str,
@@ -261,24 +205,11 @@ def _find_event_record(
     *,
     subject_index: Optional[int] = None,
 ) -> Dict[str, Any]:
-    paths = _paths_for_study(study_id, study_name)
-
-    candidates: List[Path] = []
-    if subject_index is not None:
-        candidates.append(_resolve_subject_events_file(paths["subjects_root"], subject_index))
-    candidates.append(paths["study_dir"] / "events.jsonl")
-
-    for events_file in candidates:
-        row = _find_event_in_jsonl(events_file, event_id)
-        if row:
-            return row
-
-    if subject_index is None and paths["subjects_root"].exists():
-        for subdir in sorted(paths["subjects_root"].glob("subject_*")):
-            row = _find_event_in_jsonl(subdir / "events.jsonl", event_id)
-            if row:
-                return row
-
+    # Event ids are unique per dataset, so the offset index needs no subject
+    # hint; ``subject_index`` stays accepted for existing callers.
+    row = repo.find_audit_event(study_id, study_name, event_id)
+    if row:
+        return row
     raise HTTPException(status_code=404, detail="Audit event not found")
 
 
@@ -365,12 +296,14 @@ def get_audit_event_diff(
     if not diff_rel:
         raise HTTPException(status_code=404, detail="No diff available for this event")
 
-    diff_abs = _paths_for_study(study_id, meta.study_name)["canonical_dir"] / str(diff_rel)
+    canonical_dir = _paths_for_study(study_id, meta.study_name)["canonical_dir"]
+    diff_abs = canonical_dir / str(diff_rel)
     if not diff_abs.exists() or not diff_abs.is_file():
         raise HTTPException(status_code=404, detail="Diff file not found")
 
     try:
-        diff_data = json.loads(diff_abs.read_text(encoding="utf-8"))
+        # Resolves delta-encoded blobs; older per-event diff files load as is.
+        diff_data = load_blob(canonical_dir, str(diff_rel))
     except Exception:
         raise HTTPException(status_code=500, detail="Failed to read diff")
 
@@ -396,37 +329,89 @@ def get_audit_overview(
     study_events_file = paths["study_dir"] / "events.jsonl"
     latest_study_events = _read_events_from_jsonl(study_events_file, 50)
 
-    subjects_root = paths["subjects_root"]
+    # Counts and latest events come from the audit index, not the logs.
+    summary = repo.audit_summary(study_id, meta.study_name, subject_limit)
     subject_summaries: List[Dict[str, Any]] = []
-
-    if subjects_root.exists() and subjects_root.is_dir():
-        for subdir in sorted(subjects_root.glob("subject_*")):
-            if not subdir.is_dir():
-                continue
-
-            events_file = subdir / "events.jsonl"
-            latest = _read_events_from_jsonl(events_file, 1)
-            if not latest:
-                continue
-
-            latest_event = latest[0]
-            subject_summaries.append({
-                "subject_index": latest_event.get("subject_index"),
-                "subject_raw": latest_event.get("subject_raw"),
-                "events_count": _count_jsonl_lines(events_file),
-                "latest_event": latest_event,
-            })
-
-    subject_summaries.sort(
-        key=lambda x: _safe_iso_to_dt((x.get("latest_event") or {}).get("timestamp")),
-        reverse=True,
-    )
+    for row in summary["subjects"]:
+        latest_event = _normalize_event(row["latest_event"] or {})
+        subject_summaries.append({
+            "subject_index": latest_event.get("subject_index"),
+            "subject_raw": latest_event.get("subject_raw"),
+            "events_count": row["events_count"],
+            "latest_event": latest_event,
+        })
 
     return {
         "study_id": study_id,
         "study_name": meta.study_name,
-        "study_events_count": _count_jsonl_lines(study_events_file),
+        "study_events_count": summary["study_events_count"],
+        "subject_events_count": summary["subject_events_count"],
+        "action_counts": summary["action_counts"],
         "latest_study_events": latest_study_events,
-        "subjects_count_with_audit": len(subject_summaries),
-        "subjects": subject_summaries[:subject_limit],
+        "subjects_count_with_audit": summary["subjects_count"],
+        "subjects": subject_summaries,
+    }
+
+
+@router.get("/studies/{study_id}/audit-events")
+def query_audit_events(
+    study_id: int,
+    actions: Optional[str] = Query(None, description="Comma-separated actions, e.g. entry_upserted"),
+    user_ids: Optional[str] = Query(None),
+    actor: Optional[str] = Query(None, description="Actor name, case-insensitive"),
+    subject_indexes: Optional[str] = Query(None),
+    subject_from: Optional[int] = Query(None, ge=0),
+    subject_to: Optional[int] = Query(None, ge=0),
+    entry_ids: Optional[str] = Query(None),
+    time_from: Optional[datetime] = Query(None),
+    time_to: Optional[datetime] = Query(None),
+    ascending: bool = Query(False, description="Oldest first"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Audit events across the study and subject logs, filtered by time range,
+    action, user, subject and entry, with keyset pagination via
+    ``next_cursor``.
+    """
+    meta = _ensure_can_view_study(db, current_user, study_id)
+    try:
+        result = repo.query_audit_events(
+            study_id,
+            meta.study_name,
+            actions=parse_str_csv(actions),
+            user_ids=parse_int_csv(user_ids),
+            actor=actor,
+            subject_indexes=parse_int_csv(subject_indexes),
+            subject_from=subject_from,
+            subject_to=subject_to,
+            entry_ids=parse_int_csv(entry_ids),
+            time_from=utc_iso(time_from),
+            time_to=utc_iso(time_to),
+            ascending=ascending,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "total": result["total"],
+        "events": [_normalize_event(row) for row in result["events"]],
+        "next_cursor": result["next_cursor"],
     }
+
+
+@router.post("/studies/{study_id}/audit-overview/rebuild")
+def rebuild_audit_overview(
+    study_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Recompute the audit index and summary from the JSONL logs."""
+    if not _is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Administrator role required")
+    meta = _ensure_can_view_study(db, current_user, study_id)
+    return repo.rebuild_audit_index(study_id, meta.study_name)
@@ -9,6 +9,8 @@ from sqlalchemy.orm import Session
 
 
 from .datalad_config import get_datalad_config, is_datalad_enabled
+from .datalad_lock import lock_stats_snapshot, reset_lock_stats
+from .datalad_runtime import get_datalad_worker, get_push_scheduler
 from .datalad_worker import DataladWorker
 from .datalad_store import DataladStudyStore
 from . import models
@@ -28,6 +30,8 @@ router = APIRouter(prefix="/datalad", tags=["datalad-ops"])
 @router.get("/status")
 def datalad_status() -> Dict[str, object]:
     cfg = get_datalad_config()
+    worker = get_datalad_worker()
+    scheduler = get_push_scheduler()
     return {
         "mode": cfg.mode,
         "sync_mode": cfg.sync_mode,
@@ -35,9 +39,54 @@ def datalad_status() -> Dict[str, object]:
         "primary_study_ids": sorted(cfg.primary_study_ids),
         "ria_url": cfg.ria_url,
         "ria_name": cfg.ria_name,
+        "commit_window_s": cfg.commit_window_s,
+        "commit_max_batch": cfg.commit_max_batch,
+        "workers": cfg.workers,
+        "commit_backend": cfg.commit_backend,
+        "push_interval_s": cfg.push_interval_s,
+        "worker": worker.stats() if worker is not None else None,
+        "replication": scheduler.status() if scheduler is not None else None,
     }
 
 
+def _is_admin(user: models.User) -> bool:
+    role = (getattr(getattr(user, "profile", None), "role", "") or "").strip()
+    return role == "Administrator"
+
+
+@router.get("/locks")
+def datalad_lock_stats(
+    reset: bool = Query(False, description="Clear the counters after reading them"),
+    user=Depends(get_current_user),
+) -> Dict[str, object]:
+    """Wait/hold histograms, contention and timeouts per dataset and lock, plus the slowest recent acquisitions."""
+    if not _is_admin(user):
+        raise HTTPException(403, "Administrator role required")
+    snapshot = lock_stats_snapshot()
+    if reset:
+        reset_lock_stats()
+    return snapshot
+
+
+@router.post("/push/flush")
+def flush_scheduled_pushes(
+    study_id: Optional[int] = Query(None, description="Only flush this study's dataset"),
+    timeout_s: float = Query(120.0, ge=1.0, le=600.0),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+) -> Dict[str, object]:
+    scheduler = get_push_scheduler()
+    if scheduler is None:
+        raise HTTPException(400, "Scheduled pushes are not enabled")
+    ds_path = None
+    if study_id is not None:
+        meta = db.query(models.StudyMetadata).filter_by(id=study_id).first()
+        if not meta:
+            raise HTTPException(404, "Study not found")
+        ds_path = Path(_dataset_path(meta.id, meta.study_name)).expanduser().resolve()
+    return scheduler.flush(ds_path, timeout_s=timeout_s)
+
+
 @router.get("/studies/{study_id}/dataset")
 def inspect_study_dataset(
     study_id: int,
@@ -0,0 +1,224 @@
+# eCRF_backend/datalad_audit_blobs.py
+"""
+Content-addressed audit diff blobs.
+
+A diff payload is stored once under ``canonical/audit/blobs/<aa>/<sha256>.json``,
+named by the hash of its canonical JSON, so repeated snapshots (the same
+``old_content`` written by several edits) share one file. A large payload
+can instead be stored as a JSON-patch delta against the previous blob of
+the same kind::
+
+    {"casee_delta": 1, "base": "<sha256>", "depth": 3, "patch": [...]}
+
+``load_blob`` resolves the chain and returns the full payload; blobs written
+before this scheme (``diffs/<event_id>.json``) are plain JSON and load as is.
+"""
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+BLOBS_DIR = "blobs"
+DELTA_MARKER = "casee_delta"
+# Longest chain of deltas before a full copy is written again.
+MAX_DELTA_DEPTH = 16
+
+Patch = List[Dict[str, Any]]
+
+
+def _canonical(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def blob_hash(obj: Any) -> str:
+    return hashlib.sha256(_canonical(obj)).hexdigest()
+
+
+def blob_rel_path(sha: str) -> str:
+    """Canonical-relative path of a blob."""
+    return f"audit/{BLOBS_DIR}/{sha[:2]}/{sha}.json"
+
+
+def _is_delta(obj: Any) -> bool:
+    return isinstance(obj, dict) and obj.get(DELTA_MARKER) == 1 and "base" in obj
+
+
+# ----------------------------------------------------------------------
+# JSON patch (RFC 6902 add/remove/replace)
+# ----------------------------------------------------------------------
+
+
+def _pointer(parts: List[Any]) -> str:
+    return "".join("/" + str(p).replace("~", "~0").replace("/", "~1") for p in parts)
+
+
+def _split_pointer(pointer: str) -> List[str]:
+    if pointer == "":
+        return []
+    return [p.replace("~1", "/").replace("~0", "~") for p in pointer[1:].split("/")]
+
+
+def make_patch(old: Any, new: Any) -> Patch:
+    ops: Patch = []
+    _diff(old, new, [], ops)
+    return ops
+
+
+def _diff(old: Any, new: Any, path: List[Any], ops: Patch) -> None:
+    if type(old) is not type(new):
+        ops.append({"op": "replace", "path": _pointer(path), "value": new})
+        return
+    if isinstance(old, dict):
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": _pointer(path + [key])})
+        for key, value in new.items():
+            if key not in old:
+                ops.append({"op": "add", "path": _pointer(path + [key]), "value": value})
+            elif old[key] != value:
+                _diff(old[key], value, path + [key], ops)
+        return
+    if isinstance(old, list):
+        # Trim the common prefix and suffix, then diff or splice the middle.
+        start = 0
+        while start < len(old) and start < len(new) and old[start] == new[start]:
+            start += 1
+        end_old, end_new = len(old), len(new)
+        while end_old > start and end_new > start and old[end_old - 1] == new[end_new - 1]:
+            end_old -= 1
+            end_new -= 1
+        if end_old - start == end_new - start:
+            for i in range(start, end_old):
+                _diff(old[i], new[i], path + [i], ops)
+            return
+        for i in range(end_old - 1, start - 1, -1):
+            ops.append({"op": "remove", "path": _pointer(path + [i])})
+        for i in range(start, end_new):
+            ops.append({"op": "add", "path": _pointer(path + [i]), "value": new[i]})
+        return
+    if old != new:
+        ops.append({"op": "replace", "path": _pointer(path), "value": new})
+
+
+def apply_patch(doc: Any, patch: Patch) -> Any:
+    doc = copy.deepcopy(doc)
+    for op in patch:
+        parts = _split_pointer(op["path"])
+        if not parts:
+            if op["op"] == "remove":
+                raise ValueError("Cannot remove the document root")
+            doc = copy.deepcopy(op["value"])
+            continue
+        parent = doc
+        for part in parts[:-1]:
+            parent = parent[int(part)] if isinstance(parent, list) else parent[part]
+        last = parts[-1]
+        if isinstance(parent, list):
+            index = len(parent) if last == "-" else int(last)
+            if op["op"] == "add":
+                parent.insert(index, copy.deepcopy(op["value"]))
+            elif op["op"] == "remove":
+                del parent[index]
+            elif op["op"] == "replace":
+                parent[index] = copy.deepcopy(op["value"])
+            else:
+                raise ValueError(f"Unsupported patch op: {op['op']}")
+        else:
+            if op["op"] in ("add", "replace"):
+                parent[last] = copy.deepcopy(op["value"])
+            elif op["op"] == "remove":
+                del parent[last]
+            else:
+                raise ValueError(f"Unsupported patch op: {op['op']}")
+    return doc
+
+
+# ----------------------------------------------------------------------
+# blob store
+# ----------------------------------------------------------------------
+
+
+def _read_json(path: Path) -> Any:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _write_json(path: Path, payload: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def load_blob(canonical_dir: Path, rel_path: str) -> Any:
+    """Full diff payload at ``rel_path``, applying delta chains."""
+    stored = _read_json(Path(canonical_dir) / rel_path)
+    patches: List[Patch] = []
+    seen = set()
+    while _is_delta(stored):
+        base = str(stored["base"])
+        if base in seen or len(patches) > MAX_DELTA_DEPTH:
+            raise ValueError(f"Broken delta chain at blob {base}")
+        seen.add(base)
+        patches.append(stored.get("patch") or [])
+        stored = _read_json(Path(canonical_dir) / blob_rel_path(base))
+    for patch in reversed(patches):
+        stored = apply_patch(stored, patch)
+    return stored
+
+
+def _depth(canonical_dir: Path, sha: str) -> int:
+    try:
+        stored = _read_json(Path(canonical_dir) / blob_rel_path(sha))
+    except Exception:
+        return MAX_DELTA_DEPTH
+    return int(stored.get("depth") or 0) if _is_delta(stored) else 0
+
+
+def write_blob(
+    canonical_dir: Path,
+    payload: Any,
+    *,
+    base: Optional[str] = None,
+    delta_min_bytes: int = 0,
+) -> Tuple[str, str, bool]:
+    """
+    Store ``payload`` unless a blob with the same content exists. With a
+    ``base`` blob and a payload of at least ``delta_min_bytes`` (0 disables
+    deltas), a delta is written when it is smaller than half the payload
+    and the chain is not too deep. Returns (sha, canonical-relative path,
+    whether a file was written).
+    """
+    canonical_dir = Path(canonical_dir)
+    sha = blob_hash(payload)
+    rel = blob_rel_path(sha)
+    path = canonical_dir / rel
+    if path.exists():
+        return sha, rel, False
+
+    stored: Any = payload
+    raw_size = len(_canonical(payload))
+    if base and base != sha and delta_min_bytes > 0 and raw_size >= delta_min_bytes:
+        try:
+            depth = _depth(canonical_dir, base)
+            if depth < MAX_DELTA_DEPTH:
+                base_payload = load_blob(canonical_dir, blob_rel_path(base))
+                patch = make_patch(base_payload, payload)
+                if len(_canonical(patch)) * 2 < raw_size and apply_patch(base_payload, patch) == payload:
+                    stored = {DELTA_MARKER: 1, "base": base, "depth": depth + 1, "patch": patch}
+        except Exception:
+            # Missing or unreadable base: fall back to a full copy.
+            stored = payload
+
+    _write_json(path, stored)
+    return sha, rel, True
+
+
+def blob_kind(payload: Any) -> str:
+    """Delta chains link blobs of the same kind, e.g. successive old_content snapshots."""
+    if isinstance(payload, dict) and len(payload) == 1:
+        return str(next(iter(payload)))
+    return "diff"
@@ -0,0 +1,557 @@
+# eCRF_backend/datalad_audit_index.py
+from __future__ import annotations
+
+import base64
+import json
+import sqlite3
+from collections import Counter
+from contextlib import closing, contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .datalad_audit_log import SEGMENTS_DIR, SEGMENT_SUFFIX, LogReader, open_log
+
+
+# Bump when the tables change; an index with another version is dropped and
+# rebuilt from the JSONL files.
+_SCHEMA_VERSION = 4
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id TEXT PRIMARY KEY,
+    file TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    at TEXT NOT NULL DEFAULT '',
+    action TEXT,
+    scope TEXT,
+    user_id INTEGER,
+    actor TEXT COLLATE NOCASE,
+    subject_index INTEGER,
+    visit_index INTEGER,
+    entry_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS ix_events_file ON events (file);
+CREATE INDEX IF NOT EXISTS ix_events_order ON events (at, id);
+CREATE INDEX IF NOT EXISTS ix_events_action ON events (action, at, id);
+CREATE INDEX IF NOT EXISTS ix_events_user ON events (user_id, at, id);
+CREATE INDEX IF NOT EXISTS ix_events_subject ON events (subject_index, at, id);
+CREATE INDEX IF NOT EXISTS ix_events_entry ON events (entry_id);
+CREATE TABLE IF NOT EXISTS files (
+    file TEXT PRIMARY KEY,
+    log TEXT NOT NULL DEFAULT '',
+    size INTEGER NOT NULL,
+    events_count INTEGER NOT NULL DEFAULT 0,
+    latest_event TEXT,
+    latest_at TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS ix_files_log ON files (log);
+CREATE TABLE IF NOT EXISTS actions (
+    file TEXT NOT NULL,
+    action TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (file, action)
+);
+"""
+
+EventRef = Tuple[str, int, int]
+
+# Column order of the tuples in JsonlScan.refs; "file" is added on insert.
+_EVENT_COLUMNS = (
+    "id",
+    "offset",
+    "length",
+    "at",
+    "action",
+    "scope",
+    "user_id",
+    "actor",
+    "subject_index",
+    "visit_index",
+    "entry_id",
+)
+
+_UPSERT_EVENT = (
+    f"INSERT INTO events (file, {', '.join(_EVENT_COLUMNS)}) "
+    f"VALUES (?, {', '.join('?' for _ in _EVENT_COLUMNS)}) "
+    "ON CONFLICT(id) DO UPDATE SET file = excluded.file, "
+    + ", ".join(f"{c} = excluded.{c}" for c in _EVENT_COLUMNS if c != "id")
+)
+
+
+def _sortable_ts(value: Any) -> str:
+    # UTC ISO string so timestamps with different offsets order correctly.
+    s = str(value or "").strip()
+    if not s:
+        return ""
+    try:
+        dt = datetime.fromisoformat(s[:-1] + "+00:00" if s.endswith("Z") else s)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.astimezone(timezone.utc).isoformat()
+    except Exception:
+        return ""
+
+
+def _int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except Exception:
+        return None
+
+
+def _event_columns(row: Dict[str, Any], offset: int, length: int) -> Tuple[Any, ...]:
+    payload = row.get("payload") if isinstance(row.get("payload"), dict) else {}
+    actor = str(payload.get("actor_name") or payload.get("actor") or "").strip() or None
+    return (
+        str(row["id"]),
+        offset,
+        length,
+        _sortable_ts(row.get("timestamp")),
+        row.get("action"),
+        row.get("scope"),
+        _int(payload.get("user_id")),
+        actor,
+        _int(payload.get("subject_index")),
+        _int(payload.get("visit_index")),
+        _int(payload.get("entry_id")),
+    )
+
+
+@dataclass
+class AuditQuery:
+    actions: Sequence[str] = ()
+    user_ids: Sequence[int] = ()
+    actor: Optional[str] = None
+    subject_indexes: Sequence[int] = ()
+    subject_from: Optional[int] = None
+    subject_to: Optional[int] = None
+    entry_ids: Sequence[int] = ()
+    # UTC ISO bounds, inclusive.
+    time_from: Optional[str] = None
+    time_to: Optional[str] = None
+
+
+def encode_audit_cursor(at: str, event_id: str) -> str:
+    raw = json.dumps([at, event_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_audit_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        at, event_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return str(at), str(event_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+@dataclass
+class JsonlScan:
+    refs: List[Tuple[Any, ...]] = field(default_factory=list)
+    end: int = 0
+    actions: Counter = field(default_factory=Counter)
+    latest: Optional[Dict[str, Any]] = None
+
+    def add(self, row: Dict[str, Any], offset: int, length: int) -> None:
+        self.refs.append(_event_columns(row, offset, length))
+        self.actions[str(row.get("action") or "")] += 1
+        self.latest = row
+
+
+def _is_sealed(rel: str) -> bool:
+    return rel.endswith(SEGMENT_SUFFIX)
+
+
+def _log_of(rel: str) -> str:
+    # Directory of the scope's log: sealed segments live one level below it.
+    parent = Path(rel).parent
+    if parent.name == SEGMENTS_DIR:
+        parent = parent.parent
+    return parent.as_posix()
+
+
+def scan_jsonl_offsets(path: Path, start: int = 0) -> JsonlScan:
+    """
+    Offsets and summary of every complete event line from ``start`` on;
+    ``end`` is the offset just past the last complete line. A trailing line
+    without a newline may still be being written and is left for the next
+    scan. Offsets in sealed segments are into the decompressed stream.
+    """
+    scan = JsonlScan(end=start)
+    with open_log(path) as f:
+        f.seek(start)
+        offset = start
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            length = len(line)
+            if line.strip():
+                try:
+                    row = json.loads(line)
+                except Exception:
+                    row = None
+                if isinstance(row, dict) and row.get("id"):
+                    scan.add(row, offset, length)
+            offset += length
+            scan.end = offset
+    return scan
+
+
+def _parse_event(raw: bytes) -> Optional[Dict[str, Any]]:
+    try:
+        row = json.loads(raw)
+    except Exception:
+        return None
+    return row if isinstance(row, dict) else None
+
+
+def read_event_at(path: Path, offset: int, length: int) -> Optional[Dict[str, Any]]:
+    try:
+        with LogReader(path) as reader:
+            return _parse_event(reader.read(offset, length))
+    except OSError:
+        return None
+
+
+def read_events_at(path: Path, spans: List[Tuple[int, int]]) -> List[Optional[Dict[str, Any]]]:
+    """read_event_at for several (offset, length) spans of one file, in one forward pass."""
+    rows: List[Optional[Dict[str, Any]]] = [None] * len(spans)
+    try:
+        with LogReader(path) as reader:
+            for i in sorted(range(len(spans)), key=lambda i: spans[i][0]):
+                rows[i] = _parse_event(reader.read(*spans[i]))
+    except OSError:
+        pass
+    return rows
+
+
+class AuditIndex:
+    """
+    Per-dataset SQLite index of the audit logs, kept at .casee/audit.sqlite.
+
+    ``events`` maps each event id to its events.jsonl file (canonical-
+    relative; an active events.jsonl or a sealed segment), byte offset and
+    length, plus the timestamp, action, actor,
+    subject and entry columns ``query`` filters on. ``files`` holds how far
+    each JSONL file has been indexed, its event count and latest event, and
+    ``actions`` the per-file action counts, so overview pages are served
+    without reading the logs. Events appended without the index (restored
+    dataset, an older writer) are picked up by ``refresh``, and a missing
+    index is rebuilt from the JSONL files.
+    """
+
+    def __init__(self, path: Path, canonical_dir: Path) -> None:
+        self.path = Path(path)
+        self.canonical_dir = Path(canonical_dir)
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=30.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        if int(conn.execute("PRAGMA user_version").fetchone()[0]) != _SCHEMA_VERSION:
+            conn.executescript(
+                "DROP TABLE IF EXISTS events; DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS actions;"
+            )
+            conn.executescript(_SCHEMA)
+            conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        return conn
+
+    @contextmanager
+    def _write(self, conn: sqlite3.Connection) -> Iterator[None]:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _rel(self, events_path: Path) -> str:
+        return Path(events_path).relative_to(self.canonical_dir).as_posix()
+
+    def _indexed_size(self, conn: sqlite3.Connection, rel: str) -> int:
+        row = conn.execute("SELECT size FROM files WHERE file = ?", (rel,)).fetchone()
+        return int(row[0]) if row else 0
+
+    def _apply(self, conn: sqlite3.Connection, rel: str, start: int, scan: JsonlScan) -> None:
+        # Caller holds a write transaction and has checked files.size == start.
+        if start == 0:
+            conn.execute("DELETE FROM events WHERE file = ?", (rel,))
+            conn.execute("DELETE FROM actions WHERE file = ?", (rel,))
+            conn.execute("DELETE FROM files WHERE file = ?", (rel,))
+        conn.executemany(_UPSERT_EVENT, [(rel, *ref) for ref in scan.refs])
+        conn.executemany(
+            "INSERT INTO actions (file, action, count) VALUES (?, ?, ?) "
+            "ON CONFLICT(file, action) DO UPDATE SET count = count + excluded.count",
+            [(rel, action, n) for action, n in scan.actions.items()],
+        )
+        conn.execute("INSERT OR IGNORE INTO files (file, log, size) VALUES (?, ?, 0)", (rel, _log_of(rel)))
+        if scan.latest is not None:
+            conn.execute(
+                "UPDATE files SET size = ?, events_count = events_count + ?, latest_event = ?, latest_at = ? "
+                "WHERE file = ?",
+                (
+                    scan.end,
+                    len(scan.refs),
+                    json.dumps(scan.latest, ensure_ascii=False, separators=(",", ":")),
+                    _sortable_ts(scan.latest.get("timestamp")),
+                    rel,
+                ),
+            )
+        else:
+            conn.execute("UPDATE files SET size = ? WHERE file = ?", (scan.end, rel))
+
+    def record(self, events_path: Path, event: Dict[str, Any], offset: int, length: int) -> None:
+        """Index one event just appended at ``offset``."""
+        rel = self._rel(events_path)
+        with closing(self._connect()) as conn:
+            with self._write(conn):
+                in_sync = self._indexed_size(conn, rel) == offset
+                if in_sync:
+                    scan = JsonlScan(end=offset + length)
+                    scan.add(event, offset, length)
+                    self._apply(conn, rel, offset, scan)
+        if not in_sync:
+            # Something was appended without the index; catch the file up.
+            self.refresh(events_path)
+
+    def sealed(self, events_path: Path, segment_path: Path) -> None:
+        """Repoint the rows of a just-sealed active segment at its compressed file."""
+        rel, seg = self._rel(events_path), self._rel(segment_path)
+        with closing(self._connect()) as conn:
+            with self._write(conn):
+                for table in ("events", "actions", "files"):
+                    conn.execute(f"UPDATE {table} SET file = ? WHERE file = ?", (seg, rel))
+
+    def _events_files(self) -> Iterator[Path]:
+        audit_dir = self.canonical_dir / "audit"
+        if audit_dir.exists():
+            yield from sorted(audit_dir.rglob("events.jsonl"))
+            yield from sorted(audit_dir.rglob(f"{SEGMENTS_DIR}/*{SEGMENT_SUFFIX}"))
+
+    def refresh(self, events_path: Optional[Path] = None) -> int:
+        """
+        Index whatever was appended since the last scan, for one file or every
+        log file under canonical/audit. A file that shrank is rescanned;
+        sealed segments never change and are scanned once. Returns the number
+        of events indexed.
+        """
+        files = [Path(events_path)] if events_path is not None else list(self._events_files())
+        indexed = 0
+        with closing(self._connect()) as conn:
+            known = {str(r["file"]): int(r["size"]) for r in conn.execute("SELECT file, size FROM files")}
+            if events_path is None:
+                present = {self._rel(path) for path in files}
+                gone = [(rel,) for rel in known if rel not in present]
+                if gone:
+                    with self._write(conn):
+                        for table in ("events", "actions", "files"):
+                            conn.executemany(f"DELETE FROM {table} WHERE file = ?", gone)
+
+            for path in files:
+                rel = self._rel(path)
+                if _is_sealed(rel) and rel in known:
+                    continue
+                try:
+                    size = path.stat().st_size
+                except OSError:
+                    size = 0
+                start = known.get(rel, 0)
+                if size == start and rel in known:
+                    continue
+                if size < start or _is_sealed(rel):
+                    start = 0
+                try:
+                    scan = scan_jsonl_offsets(path, start) if size else JsonlScan()
+                except OSError:
+                    continue
+                with self._write(conn):
+                    # Another writer may have indexed this file since ``known`` was read.
+                    if self._indexed_size(conn, rel) != known.get(rel, 0):
+                        continue
+                    self._apply(conn, rel, start, scan)
+                indexed += len(scan.refs)
+        return indexed
+
+    def rebuild(self) -> int:
+        with closing(self._connect()) as conn:
+            with self._write(conn):
+                for table in ("events", "actions", "files"):
+                    conn.execute(f"DELETE FROM {table}")
+        return self.refresh()
+
+    def lookup(self, event_id: str) -> Optional[EventRef]:
+        if not self.exists():
+            return None
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT file, offset, length FROM events WHERE id = ?", (str(event_id),)
+            ).fetchone()
+        return (str(row[0]), int(row[1]), int(row[2])) if row else None
+
+    def _read(self, event_id: str) -> Optional[Dict[str, Any]]:
+        ref = self.lookup(event_id)
+        if ref is None:
+            return None
+        rel, offset, length = ref
+        row = read_event_at(self.canonical_dir / rel, offset, length)
+        if row is not None and str(row.get("id") or "") == str(event_id):
+            return row
+        # The file was rewritten under the index; rescan it from the start.
+        with closing(self._connect()) as conn:
+            with self._write(conn):
+                conn.execute("DELETE FROM files WHERE file = ?", (rel,))
+        self.refresh(self.canonical_dir / rel)
+        return None
+
+    def find(self, event_id: str) -> Optional[Dict[str, Any]]:
+        """The event record, read with one seek; catches the index up on a miss."""
+        row = self._read(event_id)
+        if row is None:
+            self.refresh()
+            row = self._read(event_id)
+        return row
+
+    def summary(self, study_file: Path, subjects_dir: Path, subject_limit: int) -> Dict[str, Any]:
+        """
+        Event counts per scope and per action, and the ``subject_limit``
+        subject logs with the most recent events (log directory, events_count
+        and raw latest event), each summed over its segments. Builds the index
+        first when it is empty.
+        """
+        study_log = _log_of(self._rel(study_file))
+        subject_like = self._rel(subjects_dir).rstrip("/") + "/%"
+        self._ensure_built()
+        with closing(self._connect()) as conn:
+            study_row = conn.execute("SELECT SUM(events_count) FROM files WHERE log = ?", (study_log,)).fetchone()
+            subjects_count, subject_events = conn.execute(
+                "SELECT COUNT(DISTINCT log), COALESCE(SUM(events_count), 0) FROM files "
+                "WHERE log LIKE ? AND events_count > 0",
+                (subject_like,),
+            ).fetchone()
+            # With MAX(), SQLite takes latest_event from the row holding the maximum.
+            subjects = [
+                {
+                    "log": r["log"],
+                    "events_count": int(r["events_count"]),
+                    "latest_event": json.loads(r["latest_event"]) if r["latest_event"] else None,
+                }
+                for r in conn.execute(
+                    "SELECT log, SUM(events_count) AS events_count, MAX(latest_at) AS latest_at, latest_event "
+                    "FROM files WHERE log LIKE ? AND events_count > 0 "
+                    "GROUP BY log ORDER BY latest_at DESC, log LIMIT ?",
+                    (subject_like, int(subject_limit)),
+                )
+            ]
+            action_counts = {
+                str(r[0]): int(r[1])
+                for r in conn.execute("SELECT action, SUM(count) FROM actions GROUP BY action ORDER BY action")
+            }
+        return {
+            "study_events_count": int(study_row[0] or 0) if study_row else 0,
+            "subject_events_count": int(subject_events),
+            "subjects_count": int(subjects_count),
+            "subjects": subjects,
+            "action_counts": action_counts,
+        }
+
+    def _ensure_built(self) -> None:
+        with closing(self._connect()) as conn:
+            empty = conn.execute("SELECT 1 FROM files LIMIT 1").fetchone() is None
+        if empty:
+            self.refresh()
+
+    def query(
+        self,
+        q: AuditQuery,
+        *,
+        after: Optional[Tuple[str, str]] = None,
+        limit: int = 100,
+        ascending: bool = False,
+        with_total: bool = True,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Refs (id, file, offset, length, at) of events matching ``q``, ordered
+        by (timestamp, id), newest first unless ``ascending``; ``after`` is
+        the (at, id) of the last row of the previous page. Returns the refs
+        and the total match count (-1 without ``with_total``).
+        """
+        where: List[str] = []
+        params: List[Any] = []
+
+        def _in(column: str, values: Sequence[Any]) -> None:
+            if values:
+                where.append(f"{column} IN ({', '.join('?' for _ in values)})")
+                params.extend(values)
+
+        _in("action", list(q.actions))
+        _in("user_id", list(q.user_ids))
+        _in("subject_index", list(q.subject_indexes))
+        _in("entry_id", list(q.entry_ids))
+        if q.actor:
+            where.append("actor = ?")
+            params.append(q.actor.strip())
+        if q.subject_from is not None:
+            where.append("subject_index >= ?")
+            params.append(int(q.subject_from))
+        if q.subject_to is not None:
+            where.append("subject_index <= ?")
+            params.append(int(q.subject_to))
+        if q.time_from:
+            where.append("at >= ?")
+            params.append(_sortable_ts(q.time_from))
+        if q.time_to:
+            where.append("at <= ?")
+            params.append(_sortable_ts(q.time_to))
+
+        self._ensure_built()
+        with closing(self._connect()) as conn:
+            total = -1
+            if with_total:
+                sql = "SELECT COUNT(*) FROM events" + (f" WHERE {' AND '.join(where)}" if where else "")
+                total = int(conn.execute(sql, params).fetchone()[0])
+
+            page_where = list(where)
+            page_params = list(params)
+            if after is not None:
+                op = ">" if ascending else "<"
+                page_where.append(f"(at {op} ? OR (at = ? AND id {op} ?))")
+                page_params.extend([after[0], after[0], after[1]])
+
+            direction = "ASC" if ascending else "DESC"
+            sql = "SELECT id, file, offset, length, at FROM events"
+            if page_where:
+                sql += f" WHERE {' AND '.join(page_where)}"
+            sql += f" ORDER BY at {direction}, id {direction} LIMIT ?"
+            page_params.append(int(limit))
+            refs = [dict(r) for r in conn.execute(sql, page_params)]
+        return refs, total
+
+    def read(self, ref: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The event a ``query`` ref points at; reindexes and retries when the log moved."""
+        row = read_event_at(self.canonical_dir / ref["file"], int(ref["offset"]), int(ref["length"]))
+        if row is not None and str(row.get("id") or "") == str(ref["id"]):
+            return row
+        return self.find(str(ref["id"]))
+
+    def read_many(self, refs: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """``read`` for a page of refs, reading each log file once in offset order."""
+        by_file: Dict[str, List[int]] = {}
+        for i, ref in enumerate(refs):
+            by_file.setdefault(str(ref["file"]), []).append(i)
+        rows: List[Optional[Dict[str, Any]]] = [None] * len(refs)
+        for rel, indexes in by_file.items():
+            spans = [(int(refs[i]["offset"]), int(refs[i]["length"])) for i in indexes]
+            for i, row in zip(indexes, read_events_at(self.canonical_dir / rel, spans)):
+                rows[i] = row
+        for i, ref in enumerate(refs):
+            row = rows[i]
+            if row is None or str(row.get("id") or "") != str(ref["id"]):
+                rows[i] = self.find(str(ref["id"]))
+        return rows
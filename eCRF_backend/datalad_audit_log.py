@@ -0,0 +1,327 @@
+# eCRF_backend/datalad_audit_log.py
+"""
+Segmented audit logs.
+
+Each audit scope keeps appending to ``events.jsonl`` (the active segment).
+Before an append, the active segment is sealed once it holds an event from
+an earlier month or grows past ``max_bytes``: it is gzip-compressed into
+``segments/events-<seq>-<YYYYMM>.jsonl.gz`` and replaced by an empty file.
+Sealed segments never change, so each one is committed once and the
+active file stays small. ``iter_lines`` and ``tail_lines`` read a log
+across its sealed segments and the active file, oldest first.
+
+A sealed segment is a series of independent gzip members of about
+``SEGMENT_MEMBER_BYTES`` of whole lines each, closed by an empty member
+whose header extra field lists where every member starts (compressed and
+decompressed offsets). Any gzip reader still sees one stream; ``LogReader``
+uses the table to decompress only the member holding a requested event.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import re
+import struct
+import threading
+import zlib
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Iterator, List, Optional, Tuple
+
+SEGMENTS_DIR = "segments"
+SEGMENT_SUFFIX = ".jsonl.gz"
+
+# Keeps sealed segments in git: the text2git rule would annex them as binary.
+AUDIT_GITATTRIBUTES = f"**/{SEGMENTS_DIR}/*{SEGMENT_SUFFIX} annex.largefiles=nothing\n"
+
+_SEGMENT_RE = re.compile(r"events-(\d+)-\d{6}\.jsonl\.gz$")
+
+SEGMENT_MEMBER_BYTES = 64 * 1024
+
+# Member table: an empty gzip member (FLG.FEXTRA) whose "CM" subfield holds
+# (compressed, decompressed) start offsets as little-endian u32 pairs
+# followed by their count.
+_TABLE_SI = b"CM"
+_TABLE_MAX_MEMBERS = (0xFFFF - 8) // 8
+_EMPTY_DEFLATE = b"\x03\x00"
+_GZIP_TAIL = _EMPTY_DEFLATE + b"\x00" * 8
+
+_members_cache: "OrderedDict[Tuple[str, int, int], List[Tuple[int, int]]]" = OrderedDict()
+_members_cache_guard = threading.Lock()
+_MEMBERS_CACHE_SIZE = 256
+
+
+def open_log(path: Path) -> IO[bytes]:
+    """Binary reader for an active (plain) or sealed (gzip) segment."""
+    path = Path(path)
+    if path.name.endswith(SEGMENT_SUFFIX):
+        return gzip.open(path, "rb")
+    return path.open("rb")
+
+
+def sealed_segments(events_path: Path) -> List[Path]:
+    """Sealed segments of the log whose active segment is ``events_path``, oldest first."""
+    seg_dir = Path(events_path).parent / SEGMENTS_DIR
+    if not seg_dir.is_dir():
+        return []
+    found = []
+    for path in seg_dir.iterdir():
+        m = _SEGMENT_RE.match(path.name)
+        if m:
+            found.append((int(m.group(1)), path))
+    return [path for _seq, path in sorted(found)]
+
+
+def log_files(events_path: Path) -> List[Path]:
+    files = sealed_segments(events_path)
+    if Path(events_path).is_file():
+        files.append(Path(events_path))
+    return files
+
+
+def iter_lines(events_path: Path) -> Iterator[bytes]:
+    """Every non-empty line of the log, oldest first."""
+    for path in log_files(events_path):
+        with open_log(path) as f:
+            for line in f:
+                if line.strip():
+                    yield line
+
+
+def _tail_active(path: Path, limit: int) -> List[bytes]:
+    with path.open("rb") as f:
+        f.seek(0, 2)
+        pos = f.tell()
+        data = b""
+        while pos > 0 and data.count(b"\n") <= limit:
+            read_size = min(8192, pos)
+            pos -= read_size
+            f.seek(pos)
+            data = f.read(read_size) + data
+    return [ln for ln in data.splitlines() if ln.strip()][-limit:]
+
+
+def tail_lines(events_path: Path, limit: int) -> List[bytes]:
+    """The last ``limit`` non-empty lines of the log, oldest first."""
+    if limit <= 0:
+        return []
+    events_path = Path(events_path)
+    lines: List[bytes] = _tail_active(events_path, limit) if events_path.is_file() else []
+    # Older events come from the newest sealed segments, each bounded in size.
+    for path in reversed(sealed_segments(events_path)):
+        if len(lines) >= limit:
+            break
+        with open_log(path) as f:
+            older = [ln.rstrip(b"\n") for ln in f if ln.strip()]
+        lines = older[-(limit - len(lines)):] + lines
+    return lines[-limit:]
+
+
+def _first_event_month(path: Path) -> Optional[str]:
+    try:
+        with path.open("rb") as f:
+            for line in f:
+                if line.strip():
+                    ts = str(json.loads(line).get("timestamp") or "")
+                    return ts[:7] if len(ts) >= 7 else None
+    except Exception:
+        return None
+    return None
+
+
+def _write_segment(src: IO[bytes], raw: IO[bytes]) -> None:
+    members: List[Tuple[int, int]] = []
+    decompressed = 0
+    block: List[bytes] = []
+    block_size = 0
+
+    def emit() -> None:
+        nonlocal decompressed, block_size
+        data = b"".join(block)
+        members.append((raw.tell(), decompressed))
+        # mtime=0 keeps the compressed bytes a function of the content only.
+        raw.write(gzip.compress(data, mtime=0))
+        decompressed += len(data)
+        block.clear()
+        block_size = 0
+
+    for line in src:
+        block.append(line)
+        block_size += len(line)
+        if block_size >= SEGMENT_MEMBER_BYTES:
+            emit()
+    if block:
+        emit()
+    if 0 < len(members) <= _TABLE_MAX_MEMBERS:
+        payload = b"".join(struct.pack("<II", c, u) for c, u in members) + struct.pack("<I", len(members))
+        extra = _TABLE_SI + struct.pack("<H", len(payload)) + payload
+        # ID1 ID2 CM=deflate FLG=FEXTRA, MTIME=0, XFL=0, OS=unknown
+        header = b"\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff" + struct.pack("<H", len(extra))
+        raw.write(header + extra + _GZIP_TAIL)
+
+
+def _read_member_table(path: Path) -> Optional[List[Tuple[int, int]]]:
+    try:
+        with Path(path).open("rb") as f:
+            size = f.seek(0, 2)
+            if size < 4 + len(_GZIP_TAIL):
+                return None
+            f.seek(size - 4 - len(_GZIP_TAIL))
+            tail = f.read()
+            if tail[4:] != _GZIP_TAIL:
+                return None
+            count = struct.unpack("<I", tail[:4])[0]
+            payload_len = 8 * count + 4
+            start = size - len(_GZIP_TAIL) - payload_len - 16
+            if count == 0 or count > _TABLE_MAX_MEMBERS or start < 0:
+                return None
+            f.seek(start)
+            head = f.read(16)
+            if head[:4] != b"\x1f\x8b\x08\x04" or head[12:14] != _TABLE_SI:
+                return None
+            if struct.unpack("<HH", head[10:12] + head[14:16]) != (payload_len + 4, payload_len):
+                return None
+            payload = f.read(payload_len - 4)
+    except OSError:
+        return None
+    return [struct.unpack_from("<II", payload, 8 * i) for i in range(count)]
+
+
+def segment_members(path: Path) -> List[Tuple[int, int]]:
+    """
+    (compressed, decompressed) start offset of every gzip member of a sealed
+    segment. Segments sealed without a member table read as one member.
+    """
+    path = Path(path)
+    st = path.stat()
+    key = (str(path), st.st_size, st.st_mtime_ns)
+    with _members_cache_guard:
+        members = _members_cache.get(key)
+        if members is not None:
+            _members_cache.move_to_end(key)
+            return members
+    members = _read_member_table(path) or [(0, 0)]
+    with _members_cache_guard:
+        _members_cache[key] = members
+        while len(_members_cache) > _MEMBERS_CACHE_SIZE:
+            _members_cache.popitem(last=False)
+    return members
+
+
+class LogReader:
+    """
+    Reads byte ranges (decompressed offsets) of an active or sealed segment.
+    In a sealed segment a read starts at the gzip member holding its offset,
+    and reads at increasing offsets continue one forward pass.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._f = self.path.open("rb")
+        self._sealed = self.path.name.endswith(SEGMENT_SUFFIX)
+        self._members = segment_members(self.path) if self._sealed else []
+        self._starts = [u for _c, u in self._members]
+        self._d: Optional["zlib._Decompress"] = None
+        self._pos = 0  # decompressed offset of self._buf[0]
+        self._buf = b""
+        self._pending = b""  # compressed input after the current member
+
+    def __enter__(self) -> "LogReader":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._f.close()
+
+    def read(self, offset: int, length: int) -> bytes:
+        if not self._sealed:
+            self._f.seek(offset)
+            return self._f.read(length)
+        member = bisect_right(self._starts, offset) - 1
+        end = self._pos + len(self._buf)
+        if self._d is None or offset < self._pos or member > bisect_right(self._starts, end) - 1:
+            c_start, u_start = self._members[max(member, 0)]
+            self._f.seek(c_start)
+            self._d = zlib.decompressobj(31)
+            self._pos, self._buf, self._pending = u_start, b"", b""
+        while self._pos + len(self._buf) < offset + length:
+            if self._pos + len(self._buf) <= offset:
+                self._pos += len(self._buf)
+                self._buf = b""
+            more = self._inflate()
+            if more is None:
+                break
+            self._buf += more
+        start = max(0, offset - self._pos)
+        self._pos, self._buf = self._pos + start, self._buf[start:]
+        return self._buf[:length]
+
+    def _inflate(self) -> Optional[bytes]:
+        # One step, never past the end of the current member.
+        chunk = self._pending or self._f.read(1 << 14)
+        self._pending = b""
+        if not chunk:
+            return None
+        if self._d.eof:
+            self._d = zlib.decompressobj(31)
+        out = self._d.decompress(chunk)
+        if self._d.eof:
+            self._pending = self._d.unused_data
+        return out
+
+
+def seal_if_due(events_path: Path, *, max_bytes: int, now: datetime) -> Optional[Path]:
+    """
+    Seal the active segment when it is past ``max_bytes`` or started in an
+    earlier month than ``now``. Returns the new segment, or None. Callers
+    hold the lock that serialises appends to this log; ``max_bytes <= 0``
+    disables segmenting.
+    """
+    events_path = Path(events_path)
+    if max_bytes <= 0:
+        return None
+    try:
+        size = events_path.stat().st_size
+    except OSError:
+        return None
+    if size == 0:
+        return None
+
+    month = _first_event_month(events_path)
+    if size < max_bytes and (month is None or month >= now.strftime("%Y-%m")):
+        return None
+
+    existing = sealed_segments(events_path)
+    seq = int(_SEGMENT_RE.match(existing[-1].name).group(1)) + 1 if existing else 1
+    label = (month or now.strftime("%Y-%m")).replace("-", "")
+    segment = events_path.parent / SEGMENTS_DIR / f"events-{seq:06d}-{label}{SEGMENT_SUFFIX}"
+    segment.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp = segment.with_name(f".{segment.name}.tmp")
+    with events_path.open("rb") as src, open(tmp, "wb") as raw:
+        _write_segment(src, raw)
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp, segment)
+
+    empty = events_path.with_name(f".{events_path.name}.tmp")
+    empty.write_bytes(b"")
+    os.replace(empty, events_path)
+    return segment
+
+
+def ensure_audit_gitattributes(audit_dir: Path) -> Optional[Path]:
+    """Write canonical/audit/.gitattributes if missing; returns it when written."""
+    path = Path(audit_dir) / ".gitattributes"
+    if path.exists() and AUDIT_GITATTRIBUTES.strip() in path.read_text(encoding="utf-8"):
+        return None
+    existing = path.read_text(encoding="utf-8") if path.exists() else ""
+    if existing and not existing.endswith("\n"):
+        existing += "\n"
+    path.write_text(existing + AUDIT_GITATTRIBUTES, encoding="utf-8")
+    return path
@@ -0,0 +1,351 @@
+# eCRF_backend/datalad_bulk_import.py
+"""
+Streaming bulk import of entries into a DataLad-primary study.
+
+Input is CSV or NDJSON, read row by row. Every row becomes one new entry
+revision in its (subject, visit, group) slot of the latest form version:
+
+- NDJSON: one object per line with subject_index, visit_index, group_index,
+  data (section title -> field -> value) and optional skipped_required_flags.
+- CSV: subject_index, visit_index, group_index columns; an optional ``data``
+  column holding a JSON object; any other column named ``<section>.<field>``
+  (split at the first dot) is merged into data. Empty cells are skipped.
+
+Text values of number, slider and checkbox fields (every CSV cell) are
+converted to the JSON types the form stores for them.
+
+Rows are validated against the template in chunks, progress fields are
+computed, and each chunk is written with DataladStudyRepo.save_entries_batch
+(one lock, one audit pass, one DataLad save). After every committed chunk the
+number of consumed input rows is written to a checkpoint file, so rerunning
+the same input with the same checkpoint continues after the last committed
+chunk.
+
+The checkpoint records the input's size and SHA-256 and the form version; a
+rerun with another file or version is rejected. Before a chunk is written the
+checkpoint marks its rows as pending, and each imported entry carries an
+``import`` marker (the checkpoint's run id and the input row). A rerun after a crash between the
+write and the checkpoint update skips the pending rows that already have an
+entry instead of importing them twice.
+"""
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import math
+import uuid
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .datalad_repo import DataladStudyRepo, local_now
+from .entry_progress import calculate_overall_entry_progress, field_keys
+
+
+DEFAULT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 200
+
+_CSV_RESERVED = {"subject_index", "visit_index", "group_index", "data", "skipped_required_flags"}
+_NUMBER_TYPES = {"number", "slider"}
+_CHECKBOX_VALUES = {"true": True, "1": True, "yes": True, "false": False, "0": False, "no": False}
+
+
+def _json_cell(value: Any, default: Any) -> Any:
+    if value in (None, ""):
+        return default
+    if isinstance(value, (dict, list)):
+        return value
+    return json.loads(value)
+
+
+def iter_ndjson_rows(lines: Iterable[Any]) -> Iterator[Tuple[int, Any]]:
+    """Yield (line_no, row) for each non-blank line; unparsable lines yield the error."""
+    for line_no, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError as e:
+            yield line_no, e
+
+
+def iter_csv_rows(lines: Iterable[str]) -> Iterator[Tuple[int, Any]]:
+    reader = csv.DictReader(lines)
+    for record in reader:
+        line_no = reader.line_num
+        try:
+            data = _json_cell(record.get("data"), {})
+            if not isinstance(data, dict):
+                raise ValueError("data column must hold a JSON object")
+            for column, value in record.items():
+                if column is None or column in _CSV_RESERVED or value in (None, ""):
+                    continue
+                section, sep, field = column.partition(".")
+                if not sep:
+                    raise ValueError(f"Unknown column {column!r}; expected <section>.<field>")
+                data.setdefault(section, {})[field] = value
+            yield line_no, {
+                "subject_index": record.get("subject_index"),
+                "visit_index": record.get("visit_index"),
+                "group_index": record.get("group_index"),
+                "data": data,
+                "skipped_required_flags": _json_cell(record.get("skipped_required_flags"), []),
+            }
+        except ValueError as e:
+            yield line_no, e
+
+
+def source_fingerprint(fh: IO[bytes]) -> Dict[str, Any]:
+    """Size and SHA-256 of a seekable binary input; the position is restored."""
+    start = fh.tell()
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in iter(lambda: fh.read(1 << 20), b""):
+        digest.update(chunk)
+        size += len(chunk)
+    fh.seek(start)
+    return {"size": size, "sha256": digest.hexdigest()}
+
+
+def iter_import_rows(lines: Iterable[Any], fmt: str) -> Iterator[Tuple[int, Any]]:
+    fmt = (fmt or "").lower().lstrip(".")
+    if fmt in ("ndjson", "jsonl"):
+        return iter_ndjson_rows(lines)
+    if fmt == "csv":
+        return iter_csv_rows(lines)
+    raise ValueError(f"Unsupported import format: {fmt!r}")
+
+
+class TemplateValidator:
+    """Checks import rows against one template version and computes their progress."""
+
+    def __init__(self, schema: Dict[str, Any], form_version: int) -> None:
+        self.schema = schema or {}
+        self.form_version = int(form_version)
+        self.counts = {
+            name: len(self.schema.get(name) or []) if isinstance(self.schema.get(name), list) else 0
+            for name in ("subjects", "visits", "groups")
+        }
+        # Section title -> field key -> field type.
+        self.sections: Dict[str, Dict[str, str]] = {}
+        for section in self.schema.get("selectedModels") or []:
+            types: Dict[str, str] = {}
+            for index, field in enumerate(section.get("fields") or []):
+                field_type = str(field.get("type") or "").lower()
+                for key in field_keys(field, index):
+                    types.setdefault(key, field_type)
+            self.sections[str(section.get("title") or "")] = types
+
+    def _index(self, row: Dict[str, Any], name: str, collection: str) -> int:
+        try:
+            value = int(row.get(name))
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} must be an integer")
+        if not 0 <= value < max(self.counts[collection], 1):
+            raise ValueError(f"{name} {value} is outside the study's {collection}")
+        return value
+
+    @staticmethod
+    def _coerce(section: str, key: str, field_type: str, value: Any) -> Any:
+        if not isinstance(value, str):
+            return value
+        text = value.strip()
+        if field_type in _NUMBER_TYPES:
+            try:
+                return int(text)
+            except ValueError:
+                pass
+            try:
+                number = float(text)
+            except ValueError:
+                number = math.nan
+            if not math.isfinite(number):
+                raise ValueError(f"{section}.{key} must be a number, got {value!r}")
+            return number
+        if field_type == "checkbox":
+            try:
+                return _CHECKBOX_VALUES[text.lower()]
+            except KeyError:
+                raise ValueError(f"{section}.{key} must be true or false, got {value!r}")
+        return value
+
+    def validate(self, row: Any) -> Dict[str, Any]:
+        """Return a save_entries_batch item or raise ValueError."""
+        if isinstance(row, Exception):
+            raise ValueError(f"Unreadable row: {row}")
+        if not isinstance(row, dict):
+            raise ValueError("Row must be an object")
+
+        subject_index = self._index(row, "subject_index", "subjects")
+        visit_index = self._index(row, "visit_index", "visits")
+        group_index = self._index(row, "group_index", "groups")
+
+        raw_data = row.get("data") or {}
+        if not isinstance(raw_data, dict):
+            raise ValueError("data must be an object")
+        data: Dict[str, Any] = {}
+        for section, values in raw_data.items():
+            if section not in self.sections:
+                raise ValueError(f"Unknown section {section!r}")
+            if not isinstance(values, dict):
+                raise ValueError(f"Section {section!r} must be an object")
+            types = self.sections[section]
+            unknown = [key for key in values if str(key) not in types]
+            if unknown:
+                raise ValueError(f"Unknown field(s) in {section!r}: {', '.join(map(str, unknown))}")
+            data[section] = {
+                key: self._coerce(section, str(key), types[str(key)], value) for key, value in values.items()
+            }
+
+        flags = row.get("skipped_required_flags") or []
+        if not isinstance(flags, list):
+            raise ValueError("skipped_required_flags must be a list")
+
+        progress = calculate_overall_entry_progress(
+            study_data=self.schema,
+            data=data,
+            skipped_required_flags=flags,
+            visit_index=visit_index,
+            group_index=group_index,
+        )
+        return {
+            "subject_index": subject_index,
+            "visit_index": visit_index,
+            "group_index": group_index,
+            "form_version": self.form_version,
+            "data": data,
+            "skipped_required_flags": flags,
+            "progress_status": progress.get("progress_status"),
+            "progress_percentage": progress.get("progress_percentage"),
+            "progress_completed": progress.get("progress_completed"),
+            "progress_total": progress.get("progress_total"),
+            "progress_skipped": progress.get("progress_skipped"),
+        }
+
+
+def run_bulk_import(
+    repo: DataladStudyRepo,
+    *,
+    study_id: int,
+    study_name: str,
+    rows: Iterable[Tuple[int, Any]],
+    form_version: int,
+    actor: str,
+    actor_name: Optional[str] = None,
+    user_id: Optional[int] = None,
+    audit_label: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    checkpoint_path: Optional[Path] = None,
+    source: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Import ``rows`` (from iter_import_rows) into the study in batches of
+    ``batch_size`` valid rows. Invalid rows are reported and skipped.
+
+    With ``checkpoint_path`` the rows already committed by a previous run
+    are skipped and progress is recorded after each batch. ``source`` (see
+    source_fingerprint) must match the run that created the checkpoint.
+    Raises ValueError for a checkpoint of another study, input or version.
+    """
+    state: Dict[str, Any] = {"rows_done": 0, "saved": 0, "failed": 0, "batches": 0, "errors": []}
+    previous: Dict[str, Any] = {}
+    if checkpoint_path is not None:
+        previous = repo.read_import_checkpoint(checkpoint_path)
+    if previous:
+        if int(previous.get("study_id") or study_id) != int(study_id):
+            raise ValueError("Checkpoint belongs to a different study")
+        if int(previous.get("form_version") or form_version) != int(form_version):
+            raise ValueError("Checkpoint was written for a different form version")
+        if previous.get("source") != source:
+            raise ValueError("Checkpoint was written for a different input file")
+        for key in state:
+            if key in previous:
+                state[key] = previous[key]
+    resumed_from = int(state["rows_done"])
+
+    template = repo.get_template(study_id, study_name, version=form_version)
+    validator = TemplateValidator(template["schema"], form_version)
+    batch_size = max(1, int(batch_size))
+
+    run_id = str(previous.get("run_id") or uuid.uuid4().hex)
+    # Rows up to here may have been written by a batch whose checkpoint
+    # update was lost.
+    recheck_to = int((previous.get("pending") or {}).get("rows_to") or 0)
+
+    pending: List[Dict[str, Any]] = []
+    consumed = 0
+    committed = json.loads(json.dumps(state))
+
+    def _checkpoint(values: Dict[str, Any], **extra: Any) -> None:
+        if checkpoint_path is not None:
+            repo.write_import_checkpoint(Path(checkpoint_path), {
+                "study_id": int(study_id),
+                "form_version": int(form_version),
+                "source": source,
+                "run_id": run_id,
+                "updated_at": local_now().isoformat(),
+                **values,
+                **extra,
+            })
+
+    def _flush() -> None:
+        nonlocal committed
+        if pending:
+            _checkpoint(committed, pending={"rows_to": consumed})
+            items = list(pending)
+            recheck = [item for item in items if item["import"]["row"] <= recheck_to]
+            if recheck:
+                done = repo.imported_rows(
+                    study_id,
+                    study_name,
+                    run_id=run_id,
+                    slots=[
+                        (item["subject_index"], item["visit_index"], item["group_index"], item["form_version"])
+                        for item in recheck
+                    ],
+                )
+                items = [item for item in items if item["import"]["row"] not in done]
+                state["saved"] += len(pending) - len(items)
+            if items:
+                result = repo.save_entries_batch(
+                    study_id=study_id,
+                    study_name=study_name,
+                    items=items,
+                    actor=actor,
+                    actor_name=actor_name,
+                    user_id=user_id,
+                    audit_label=audit_label or "Bulk import",
+                )
+                state["saved"] += int(result["saved_count"])
+            state["batches"] += 1
+            pending.clear()
+        state["rows_done"] = consumed
+        _checkpoint(state)
+        committed = json.loads(json.dumps(state))
+
+    for line_no, row in rows:
+        consumed += 1
+        if consumed <= resumed_from:
+            continue
+        try:
+            item = validator.validate(row)
+        except ValueError as e:
+            state["failed"] += 1
+            if len(state["errors"]) < MAX_REPORTED_ERRORS:
+                state["errors"].append({"line": line_no, "error": str(e)})
+        else:
+            item["import"] = {"id": run_id, "row": consumed}
+            pending.append(item)
+        if len(pending) >= batch_size:
+            _flush()
+    _flush()
+
+    return {
+        "rows_read": consumed,
+        "resumed_from": resumed_from,
+        "form_version": int(form_version),
+        **state,
+    }
@@ -0,0 +1,112 @@
+# eCRF_backend/datalad_bulk_load.py
+from __future__ import annotations
+
+import json
+import re
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, Optional, Tuple
+
+from .settings import get_settings
+
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
+
+# Below this many files the pool hand-off costs more than it saves.
+SERIAL_THRESHOLD = 64
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_workers = 0
+_executor_guard = threading.Lock()
+
+
+# orjson turns integers beyond 64 bits into floats; any run this long
+# (even inside a string) sends the document to json.loads.
+_LONG_DIGITS = re.compile(rb"\d{19}")
+
+
+def loads_json(raw: bytes) -> Any:
+    """
+    Decode JSON bytes exactly as json.loads would, using orjson when it is
+    installed and the result is the same: documents with very long numbers,
+    or that orjson rejects (NaN, Infinity), go through json.loads.
+    """
+    if orjson is not None and not _LONG_DIGITS.search(raw):
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(raw)
+
+
+def load_json_file(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        row = loads_json(Path(path).read_bytes())
+    except Exception:
+        return None
+    return row if isinstance(row, dict) else None
+
+
+def _default_workers() -> int:
+    return max(0, int(get_settings().entry_load_workers))
+
+
+def _get_executor(workers: int) -> ThreadPoolExecutor:
+    global _executor, _executor_workers
+    with _executor_guard:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="entry-loader")
+            _executor_workers = workers
+        return _executor
+
+
+def iter_json_files(
+    paths: Iterable[Path],
+    *,
+    loader: Callable[[Path], Optional[Dict[str, Any]]] = load_json_file,
+    workers: Optional[int] = None,
+) -> Iterator[Tuple[Path, Dict[str, Any]]]:
+    """
+    Yield ``(path, row)`` for every path that loads to a JSON object, in input
+    order. Reads fan out over a shared bounded thread pool and at most a small
+    window of rows is in flight, so memory stays flat for callers that filter
+    while iterating. Unreadable files are skipped.
+    """
+    path_list = paths if isinstance(paths, list) else list(paths)
+    n_workers = _default_workers() if workers is None else max(0, int(workers))
+
+    if n_workers <= 1 or len(path_list) < SERIAL_THRESHOLD:
+        for path in path_list:
+            row = loader(path)
+            if row:
+                yield path, row
+        return
+
+    executor = _get_executor(n_workers)
+    window = n_workers * 4
+    pending: Deque[Tuple[Path, Future]] = deque()
+    remaining = iter(path_list)
+
+    for path in remaining:
+        pending.append((path, executor.submit(loader, path)))
+        if len(pending) >= window:
+            break
+
+    while pending:
+        path, future = pending.popleft()
+        nxt = next(remaining, None)
+        if nxt is not None:
+            pending.append((nxt, executor.submit(loader, nxt)))
+        try:
+            row = future.result()
+        except Exception:
+            continue
+        if row:
+            yield path, row
@@ -27,6 +27,32 @@ class DataladConfig:
 
     require_ria_for_writes: bool
 
+    # async group commit: saves for one dataset arriving within the window
+    # (or until the batch is full) are merged into a single ds.save
+    commit_window_s: float = 0.2
+    commit_max_batch: int = 50
+
+    # async worker pool size; jobs are sharded by dataset path
+    workers: int = 4
+
+    # datalad|git: "git" commits path-scoped canonical JSON saves with git
+    # plumbing and falls back to datalad save for anything else
+    commit_backend: str = "datalad"
+
+    # push_on_save pushes are debounced: each dirty dataset is pushed at
+    # most once per interval, up to push_concurrency datasets at a time
+    push_interval_s: float = 30.0
+    push_concurrency: int = 4
+
+    # audit logs are sealed into compressed segments past this size or at a
+    # month boundary; 0 keeps a single growing events.jsonl
+    audit_segment_max_bytes: int = 8 * 1024 * 1024
+
+    # audit diff blobs at least this large are stored as a JSON-patch delta
+    # against the previous blob of the same kind when that is smaller; 0
+    # always stores full copies
+    audit_delta_min_bytes: int = 16 * 1024
+
 
 def _parse_int_set(csv: str) -> Set[int]:
     out: Set[int] = set()
@@ -64,6 +90,10 @@ def get_datalad_config() -> DataladConfig:
     if push_data_mode not in ("auto-if-wanted", "all", "nothing"):
         push_data_mode = "auto-if-wanted"
 
+    commit_backend = (os.getenv("ECRF_DATALAD_COMMIT_BACKEND", "datalad") or "datalad").strip().lower()
+    if commit_backend not in ("datalad", "git"):
+        commit_backend = "datalad"
+
     cfg = DataladConfig(
         mode=mode,
         sync_mode=sync_mode,
@@ -79,6 +109,14 @@ def get_datalad_config() -> DataladConfig:
         require_ria_for_writes=(
             os.getenv("ECRF_DATALAD_REQUIRE_RIA_FOR_WRITES", "1" if settings.is_production else "0") == "1"
         ),
+        commit_window_s=max(0.0, float(os.getenv("ECRF_DATALAD_COMMIT_WINDOW_MS", "200")) / 1000.0),
+        commit_max_batch=max(1, int(os.getenv("ECRF_DATALAD_COMMIT_MAX_BATCH", "50"))),
+        workers=max(1, int(os.getenv("ECRF_DATALAD_WORKERS", "4"))),
+        commit_backend=commit_backend,
+        push_interval_s=max(0.0, float(os.getenv("ECRF_DATALAD_PUSH_INTERVAL_S", "30"))),
+        push_concurrency=max(1, int(os.getenv("ECRF_DATALAD_PUSH_CONCURRENCY", "4"))),
+        audit_segment_max_bytes=max(0, int(os.getenv("ECRF_DATALAD_AUDIT_SEGMENT_MAX_BYTES", str(8 * 1024 * 1024)))),
+        audit_delta_min_bytes=max(0, int(os.getenv("ECRF_DATALAD_AUDIT_DELTA_MIN_BYTES", str(16 * 1024)))),
     )
 
     if settings.is_production and cfg.require_ria_for_writes and not cfg.ria_url:
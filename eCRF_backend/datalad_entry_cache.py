@@ -0,0 +1,118 @@
+# eCRF_backend/datalad_entry_cache.py
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .datalad_bulk_load import loads_json
+from .settings import get_settings
+
+
+@dataclass
+class _CachedEntry:
+    signature: Tuple[int, int]
+    row: Dict[str, Any]
+    size: int
+
+
+class EntryCache:
+    """
+    Process-wide LRU of parsed entry JSON files, keyed by absolute path.
+
+    A cached row is reused only while the file's (mtime_ns, size) signature is
+    unchanged, so listing an unchanged study costs one stat() per file instead
+    of one json.loads(). Memory is bounded by the on-disk size of the cached
+    files. Returned rows are shared with the cache and must not be mutated.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max(0, int(max_bytes))
+        self._items: "OrderedDict[str, _CachedEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, path: Path) -> Optional[Dict[str, Any]]:
+        key = str(path)
+        try:
+            st = path.stat()
+        except OSError:
+            self.discard(path)
+            return None
+        signature = (st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            cached = self._items.get(key)
+            if cached is not None and cached.signature == signature:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return cached.row
+            self.misses += 1
+
+        try:
+            row = loads_json(path.read_bytes())
+        except Exception:
+            self.discard(path)
+            return None
+        if not isinstance(row, dict):
+            return None
+
+        self._store(key, signature, row, st.st_size)
+        return row
+
+    def discard(self, path: Path) -> None:
+        with self._lock:
+            cached = self._items.pop(str(path), None)
+            if cached is not None:
+                self._bytes -= cached.size
+
+    def discard_prefix(self, prefix: Path) -> None:
+        root = str(prefix).rstrip("/\\")
+        with self._lock:
+            for key in [k for k in self._items if k == root or k.startswith(root + "/") or k.startswith(root + "\\")]:
+                self._bytes -= self._items.pop(key).size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _store(self, key: str, signature: Tuple[int, int], row: Dict[str, Any], size: int) -> None:
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._items[key] = _CachedEntry(signature=signature, row=row, size=size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._items:
+                _key, evicted = self._items.popitem(last=False)
+                self._bytes -= evicted.size
+
+
+_cache: Optional[EntryCache] = None
+_cache_guard = threading.Lock()
+
+
+def get_entry_cache() -> EntryCache:
+    global _cache
+    if _cache is None:
+        with _cache_guard:
+            if _cache is None:
+                _cache = EntryCache(get_settings().entry_cache_max_bytes)
+    return _cache
@@ -0,0 +1,223 @@
+# eCRF_backend/datalad_entry_catalog.py
+from __future__ import annotations
+
+import base64
+import json
+import os
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    subject_index INTEGER,
+    visit_index INTEGER,
+    group_index INTEGER,
+    form_version INTEGER,
+    progress_status TEXT,
+    created_at TEXT,
+    updated_at TEXT NOT NULL DEFAULT '',
+    path TEXT NOT NULL,
+    is_head INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ix_entries_order ON entries (updated_at, id);
+CREATE INDEX IF NOT EXISTS ix_entries_head_order ON entries (is_head, updated_at, id);
+CREATE INDEX IF NOT EXISTS ix_entries_slot ON entries (subject_index, visit_index, group_index, form_version);
+"""
+
+_COLUMNS = (
+    "id",
+    "subject_index",
+    "visit_index",
+    "group_index",
+    "form_version",
+    "progress_status",
+    "created_at",
+    "updated_at",
+    "path",
+)
+
+
+@dataclass
+class EntryQuery:
+    subject_indexes: Sequence[int] = ()
+    visit_indexes: Sequence[int] = ()
+    group_indexes: Sequence[int] = ()
+    form_versions: Sequence[int] = ()
+    progress_statuses: Sequence[str] = ()
+    updated_from: Optional[str] = None
+    updated_to: Optional[str] = None
+    current_only: bool = False
+
+
+def encode_cursor(updated_at: str, entry_id: int) -> str:
+    raw = json.dumps([updated_at, int(entry_id)], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        updated_at, entry_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return str(updated_at), int(entry_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def catalog_row(entry: Dict[str, Any], logical_path: str) -> Dict[str, Any]:
+    def _int(value: Any) -> Optional[int]:
+        try:
+            return int(value)
+        except Exception:
+            return None
+
+    return {
+        "id": int(entry.get("id") or 0),
+        "subject_index": _int(entry.get("subject_index")),
+        "visit_index": _int(entry.get("visit_index")),
+        "group_index": _int(entry.get("group_index")),
+        "form_version": _int(entry.get("form_version")),
+        "progress_status": entry.get("progress_status"),
+        "created_at": entry.get("created_at"),
+        "updated_at": str(entry.get("updated_at") or ""),
+        "path": logical_path,
+    }
+
+
+class EntryCatalog:
+    """
+    Per-dataset SQLite catalog of entry revisions (slot, progress status,
+    timestamps, logical path and whether the row is the slot head). It is
+    derived from canonical/entries and lives next to the slot index under
+    .casee/. Writers hold either the dataset lock exclusively (rebuild, batch
+    writes) or the dataset lock shared plus the ``meta`` lock (slot writers);
+    readers take no lock.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def _connect(self, path: Optional[Path] = None) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(path or self.path), timeout=30.0)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @classmethod
+    def build(
+        cls,
+        path: Path,
+        rows: Iterable[Dict[str, Any]],
+        head_ids: Iterable[int],
+    ) -> "EntryCatalog":
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        if tmp.exists():
+            tmp.unlink()
+
+        catalog = cls(path)
+        with closing(catalog._connect(tmp)) as conn:
+            conn.executescript(_SCHEMA)
+            catalog._upsert(conn, rows)
+            conn.executemany(
+                "UPDATE entries SET is_head = 1 WHERE id = ?",
+                [(int(i),) for i in head_ids],
+            )
+            conn.commit()
+        os.replace(tmp, path)
+        return catalog
+
+    def _upsert(self, conn: sqlite3.Connection, rows: Iterable[Dict[str, Any]]) -> None:
+        conn.executemany(
+            f"INSERT INTO entries ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' for _ in _COLUMNS)}) "
+            "ON CONFLICT(id) DO UPDATE SET "
+            + ", ".join(f"{c} = excluded.{c}" for c in _COLUMNS if c != "id"),
+            [tuple(row.get(c) for c in _COLUMNS) for row in rows],
+        )
+
+    def apply(self, rows: List[Dict[str, Any]], heads: Dict[tuple, Optional[int]]) -> None:
+        """Upsert written rows and reset the head flag of every touched slot."""
+        with closing(self._connect()) as conn:
+            with conn:
+                self._upsert(conn, rows)
+                for slot, head_id in heads.items():
+                    subject_index, visit_index, group_index, form_version = slot
+                    conn.execute(
+                        "UPDATE entries SET is_head = CASE WHEN id = ? THEN 1 ELSE 0 END "
+                        "WHERE subject_index = ? AND visit_index = ? AND group_index = ? AND form_version = ?",
+                        (head_id or 0, subject_index, visit_index, group_index, form_version),
+                    )
+
+    def max_id(self) -> int:
+        if not self.exists():
+            return 0
+        with closing(self._connect()) as conn:
+            return int(conn.execute("SELECT MAX(id) FROM entries").fetchone()[0] or 0)
+
+    def get(self, entry_id: int) -> Optional[Dict[str, Any]]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM entries WHERE id = ?",
+                (int(entry_id),),
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    def query(
+        self,
+        q: EntryQuery,
+        *,
+        after: Optional[Tuple[str, int]] = None,
+        limit: Optional[int] = None,
+        with_total: bool = True,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        where: List[str] = []
+        params: List[Any] = []
+
+        def _in(column: str, values: Sequence[Any]) -> None:
+            if values:
+                where.append(f"{column} IN ({', '.join('?' for _ in values)})")
+                params.extend(values)
+
+        if q.current_only:
+            where.append("is_head = 1")
+        _in("subject_index", list(q.subject_indexes))
+        _in("visit_index", list(q.visit_indexes))
+        _in("group_index", list(q.group_indexes))
+        _in("form_version", list(q.form_versions))
+        _in("progress_status", list(q.progress_statuses))
+        if q.updated_from:
+            where.append("updated_at >= ?")
+            params.append(q.updated_from)
+        if q.updated_to:
+            where.append("updated_at <= ?")
+            params.append(q.updated_to)
+
+        with closing(self._connect()) as conn:
+            total = -1
+            if with_total:
+                sql = "SELECT COUNT(*) FROM entries" + (f" WHERE {' AND '.join(where)}" if where else "")
+                total = int(conn.execute(sql, params).fetchone()[0])
+
+            page_where = list(where)
+            page_params = list(params)
+            if after is not None:
+                page_where.append("(updated_at > ? OR (updated_at = ? AND id > ?))")
+                page_params.extend([after[0], after[0], int(after[1])])
+
+            sql = f"SELECT {', '.join(_COLUMNS)} FROM entries"
+            if page_where:
+                sql += f" WHERE {' AND '.join(page_where)}"
+            sql += " ORDER BY updated_at, id"
+            if limit is not None:
+                sql += " LIMIT ?"
+                page_params.append(int(limit))
+
+            rows = [dict(r) for r in conn.execute(sql, page_params)]
+        return rows, total
@@ -0,0 +1,196 @@
+# eCRF_backend/datalad_git_commit.py
+"""
+Git plumbing commit backend for canonical JSON.
+
+With ``text2git`` the canonical JSON/JSONL files live in git, not the
+annex, so a path-scoped save of them can skip ``datalad save`` and commit
+directly: ``update-index`` into a temporary index seeded from HEAD,
+``write-tree``, ``commit-tree`` and ``update-ref``. The tree therefore holds
+HEAD plus the scoped paths only, whatever else is staged in the real index.
+Afterwards the scoped paths are refreshed in the real index (recording stat
+info, so a later ``datalad status`` does not rehash them).
+
+Only used when ``ECRF_DATALAD_COMMIT_BACKEND=git`` and every path is
+eligible; anything that may end up in the annex goes through
+``datalad save`` as before.
+"""
+from __future__ import annotations
+
+import os
+import subprocess
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from .datalad_config import DataladConfig
+
+# Sealed audit segments are gzip but kept in git by canonical/audit/.gitattributes;
+# check-attr below confirms it.
+PLUMBING_SUFFIXES = (".json", ".jsonl", ".jsonl.gz")
+
+# Uploaded files may be binary and are left to git-annex.
+_ANNEX_PREFIXES = ("canonical/files/",)
+
+
+def _git(ds_path: Path, args: List[str], *, stdin: Optional[str] = None, env: Optional[Dict[str, str]] = None) -> str:
+    proc = subprocess.run(
+        ["git", "-C", str(ds_path), *args],
+        input=stdin,
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"git {args[0]} failed: {proc.stderr.strip() or proc.stdout.strip()}")
+    return proc.stdout.strip()
+
+
+def read_head(ds_path: Path) -> Optional[str]:
+    """HEAD commit id read from .git directly (no subprocess); None if unborn."""
+    git_dir = Path(ds_path) / ".git"
+    try:
+        if git_dir.is_file():
+            pointer = git_dir.read_text(encoding="utf-8").strip()
+            if not pointer.startswith("gitdir:"):
+                return None
+            git_dir = (Path(ds_path) / pointer[len("gitdir:"):].strip()).resolve()
+        head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    if not head.startswith("ref:"):
+        return head or None
+    ref = head[len("ref:"):].strip()
+    try:
+        return (git_dir / ref).read_text(encoding="utf-8").strip() or None
+    except OSError:
+        pass
+    try:
+        for line in (git_dir / "packed-refs").read_text(encoding="utf-8").splitlines():
+            sha, _, name = line.partition(" ")
+            if name == ref:
+                return sha
+    except OSError:
+        pass
+    # Unborn branch.
+    return None
+
+
+def _largefiles_keeps_text_in_git(value: str) -> bool:
+    # "nothing" keeps everything in git; the text2git rule only annexes binaries.
+    return value == "nothing" or "mimeencoding=binary" in value
+
+
+def plumbing_eligible(ds_path: Path, rel_paths: Sequence[str]) -> bool:
+    """True if every path is canonical text that ``datalad save`` would commit to git."""
+    if not rel_paths:
+        return False
+    for rel in rel_paths:
+        if not rel.startswith("canonical/") or rel.startswith(_ANNEX_PREFIXES):
+            return False
+        if not rel.endswith(PLUMBING_SUFFIXES):
+            return False
+        if (ds_path / rel).is_symlink():
+            # already annexed
+            return False
+
+    try:
+        out = _git(ds_path, ["check-attr", "-z", "annex.largefiles", "--", *rel_paths])
+    except Exception:
+        return False
+    fields = out.split("\0")
+    # -z output is path NUL attr NUL value NUL, repeated
+    values = fields[2::3]
+    if len(values) < len(rel_paths):
+        return False
+    return all(_largefiles_keeps_text_in_git(v) for v in values[: len(rel_paths)])
+
+
+def commit_paths(
+    ds_path: Path,
+    rel_paths: Sequence[str],
+    message: str,
+    *,
+    name: str,
+    email: str,
+    gpgsign: bool = False,
+    gpg_keyid: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Stage ``rel_paths`` (additions, modifications and removals) and commit
+    them on HEAD. Returns the new commit id, or None if nothing changed.
+    """
+    ds_path = Path(ds_path)
+    paths_z = "\0".join(rel_paths) + "\0"
+    try:
+        parent: Optional[str] = _git(ds_path, ["rev-parse", "--verify", "-q", "HEAD"])
+    except RuntimeError:
+        parent = None
+
+    git_dir = Path(_git(ds_path, ["rev-parse", "--absolute-git-dir"]))
+    index_file = git_dir / f"case-e-index.{os.getpid()}.{uuid.uuid4().hex}"
+    index_env = dict(os.environ, GIT_INDEX_FILE=str(index_file))
+    try:
+        _git(ds_path, ["read-tree", parent] if parent else ["read-tree", "--empty"], env=index_env)
+        _git(ds_path, ["update-index", "--add", "--remove", "-z", "--stdin"], stdin=paths_z, env=index_env)
+        tree = _git(ds_path, ["write-tree"], env=index_env)
+    finally:
+        for leftover in (index_file, index_file.with_name(index_file.name + ".lock")):
+            try:
+                leftover.unlink()
+            except FileNotFoundError:
+                pass
+
+    if parent and _git(ds_path, ["rev-parse", f"{parent}^{{tree}}"]) == tree:
+        return None
+
+    env = dict(os.environ)
+    env.update({
+        "GIT_AUTHOR_NAME": name,
+        "GIT_AUTHOR_EMAIL": email,
+        "GIT_COMMITTER_NAME": name,
+        "GIT_COMMITTER_EMAIL": email,
+    })
+    args = ["commit-tree", tree]
+    if parent:
+        args += ["-p", parent]
+    if gpgsign:
+        args.append(f"-S{gpg_keyid}" if gpg_keyid else "-S")
+    else:
+        args.append("--no-gpg-sign")
+    args += ["-F", "-"]
+    commit = _git(ds_path, args, stdin=message, env=env)
+
+    # Compare-and-swap on the old HEAD so a concurrent writer is never clobbered.
+    ref_args = ["update-ref", "-m", "case-e: commit (plumbing)", "HEAD", commit]
+    if parent:
+        ref_args.append(parent)
+    _git(ds_path, ref_args)
+    # Keep the real index in step with the new HEAD for these paths only.
+    _git(ds_path, ["update-index", "--add", "--remove", "-z", "--stdin"], stdin=paths_z)
+    return commit
+
+
+def try_plumbing_commit(
+    cfg: DataladConfig,
+    ds_path: Path,
+    rel_paths: Optional[Sequence[str]],
+    message: str,
+) -> bool:
+    """
+    Commit through git plumbing when configured and every path is eligible.
+    Returns False when the caller should fall back to ``datalad save``.
+    """
+    if getattr(cfg, "commit_backend", "datalad") != "git" or not rel_paths:
+        return False
+    if not plumbing_eligible(Path(ds_path), rel_paths):
+        return False
+    commit_paths(
+        Path(ds_path),
+        rel_paths,
+        message,
+        name=cfg.git_name,
+        email=cfg.git_email,
+        gpgsign=cfg.gpgsign,
+        gpg_keyid=cfg.gpg_keyid,
+    )
+    return True
@@ -1,13 +1,19 @@
 # eCRF_backend/datalad_lock.py
 from __future__ import annotations
 
+import sys
+import threading
+import time
+from collections import deque
 from contextlib import contextmanager
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
+from datetime import datetime
 from pathlib import Path
-from typing import Iterator, Optional
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
 
-from filelock import FileLock, Timeout
+from filelock import FileLock, ReadWriteLock, Timeout
 
+from .logger import logger
 from .settings import get_settings
 
 
@@ -16,6 +22,8 @@ class LockSpec:
     dataset_path: Path
     name: str = "dataset"
     timeout_s: Optional[float] = None
+    # Shared holders run concurrently; an exclusive holder runs alone.
+    shared: bool = False
 
 
 def _resolved_dataset_path(dataset_path: Path) -> Path:
@@ -24,8 +32,168 @@ def _resolved_dataset_path(dataset_path: Path) -> Path:
 
 def _lockfile_path(dataset_path: Path, name: str) -> Path:
     # Keep lock file outside .git to avoid accidental staging.
-    # Lock file is per dataset and per logical lock name.
-    return dataset_path / f".casee.{name}.lock"
+    # Lock file is per dataset and per logical lock name; it is a small
+    # SQLite database (ReadWriteLock), matched by the "*.lock" gitignore rule.
+    if name == "dataset":
+        return dataset_path / f".casee.{name}.rw.lock"
+    # Finer-grained locks (per slot, ...) live in the ignored .casee/ sidecar.
+    locks_dir = dataset_path / ".casee" / "locks"
+    locks_dir.mkdir(parents=True, exist_ok=True)
+    return locks_dir / f"{name}.rw.lock"
+
+
+def _legacy_lockfile_path(dataset_path: Path, name: str) -> Optional[Path]:
+    # Plain FileLock used by releases before the shared/exclusive lock. Exclusive
+    # holders take it too, so an older process still writing the dataset during
+    # a rolling upgrade is excluded.
+    if name == "dataset":
+        return dataset_path / f".casee.{name}.lock"
+    return None
+
+
+# ----------------------------------------------------------------------
+# instrumentation
+# ----------------------------------------------------------------------
+
+# Histogram bucket upper bounds in seconds; the last bucket is open-ended.
+LOCK_HISTOGRAM_BOUNDS: Tuple[float, ...] = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+# Waits longer than this count as contended.
+CONTENTION_THRESHOLD_S = 0.005
+SLOW_LOCKS_KEPT = 50
+
+
+def _bucket(seconds: float) -> int:
+    for i, bound in enumerate(LOCK_HISTOGRAM_BOUNDS):
+        if seconds <= bound:
+            return i
+    return len(LOCK_HISTOGRAM_BOUNDS)
+
+
+def _lock_family(name: str) -> str:
+    # Slot stripe locks ("slot_017", ...) aggregate under "slot".
+    return name.split("_", 1)[0]
+
+
+@dataclass
+class _LockStats:
+    acquisitions: int = 0
+    shared: int = 0
+    contended: int = 0
+    timeouts: int = 0
+    wait_total_s: float = 0.0
+    wait_max_s: float = 0.0
+    hold_total_s: float = 0.0
+    hold_max_s: float = 0.0
+    wait_hist: List[int] = field(default_factory=lambda: [0] * (len(LOCK_HISTOGRAM_BOUNDS) + 1))
+    hold_hist: List[int] = field(default_factory=lambda: [0] * (len(LOCK_HISTOGRAM_BOUNDS) + 1))
+
+
+_stats: Dict[Tuple[str, str], _LockStats] = {}
+_slow: Deque[Dict[str, Any]] = deque(maxlen=SLOW_LOCKS_KEPT)
+_stats_lock = threading.Lock()
+
+
+def _call_site() -> str:
+    # First frame outside this module and contextlib: the "with" statement.
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename != __file__ and not filename.endswith("contextlib.py"):
+            return f"{Path(filename).name}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "?"
+
+
+def _record(
+    dataset_path: Path,
+    spec: "LockSpec",
+    wait_s: float,
+    hold_s: Optional[float],
+) -> None:
+    """Account one acquisition; ``hold_s`` is None when it timed out."""
+    key = (str(dataset_path), _lock_family(spec.name))
+    with _stats_lock:
+        st = _stats.get(key)
+        if st is None:
+            st = _stats[key] = _LockStats()
+        st.wait_total_s += wait_s
+        st.wait_max_s = max(st.wait_max_s, wait_s)
+        st.wait_hist[_bucket(wait_s)] += 1
+        if wait_s > CONTENTION_THRESHOLD_S:
+            st.contended += 1
+        if hold_s is None:
+            st.timeouts += 1
+        else:
+            st.acquisitions += 1
+            st.shared += int(spec.shared)
+            st.hold_total_s += hold_s
+            st.hold_max_s = max(st.hold_max_s, hold_s)
+            st.hold_hist[_bucket(hold_s)] += 1
+
+    slow_s = float(get_settings().datalad_lock_slow_seconds)
+    if hold_s is not None and wait_s + hold_s < slow_s:
+        return
+    record = {
+        "at": datetime.now().astimezone().isoformat(),
+        "dataset_path": str(dataset_path),
+        "name": spec.name,
+        "mode": "shared" if spec.shared else "exclusive",
+        "wait_s": round(wait_s, 4),
+        "hold_s": round(hold_s, 4) if hold_s is not None else None,
+        "timed_out": hold_s is None,
+        "call_site": _call_site(),
+    }
+    with _stats_lock:
+        _slow.append(record)
+    logger.warning(
+        "[dataset_lock] Slow lock name=%s mode=%s wait_s=%.3f hold_s=%s timed_out=%s dataset=%s at %s",
+        record["name"],
+        record["mode"],
+        wait_s,
+        record["hold_s"],
+        record["timed_out"],
+        record["dataset_path"],
+        record["call_site"],
+    )
+
+
+def lock_stats_snapshot() -> Dict[str, Any]:
+    """Aggregated lock metrics per (dataset, lock family) plus the slowest recent acquisitions."""
+    with _stats_lock:
+        items = [
+            (key, replace(st, wait_hist=list(st.wait_hist), hold_hist=list(st.hold_hist)))
+            for key, st in _stats.items()
+        ]
+        slow = list(_slow)
+
+    locks = []
+    for (dataset_path, family), st in sorted(items):
+        attempts = st.acquisitions + st.timeouts
+        locks.append({
+            "dataset_path": dataset_path,
+            "name": family,
+            "acquisitions": st.acquisitions,
+            "shared": st.shared,
+            "contended": st.contended,
+            "timeouts": st.timeouts,
+            "wait_avg_s": st.wait_total_s / attempts if attempts else 0.0,
+            "wait_max_s": st.wait_max_s,
+            "hold_avg_s": st.hold_total_s / st.acquisitions if st.acquisitions else 0.0,
+            "hold_max_s": st.hold_max_s,
+            "wait_histogram": st.wait_hist,
+            "hold_histogram": st.hold_hist,
+        })
+    return {
+        "histogram_bounds_s": list(LOCK_HISTOGRAM_BOUNDS) + [None],
+        "locks": locks,
+        "slowest": sorted(slow, key=lambda r: (r["wait_s"] + (r["hold_s"] or 0.0)), reverse=True),
+    }
+
+
+def reset_lock_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+        _slow.clear()
 
 
 def _effective_timeout(timeout_s: Optional[float]) -> float:
@@ -37,27 +205,62 @@ def _effective_timeout(timeout_s: Optional[float]) -> float:
 
 @contextmanager
 def dataset_lock(spec: LockSpec) -> Iterator[None]:
+    """
+    Cross-process dataset lock, exclusive by default or shared with
+    ``spec.shared``. Not reentrant: do not take it again, in either mode,
+    while the current thread already holds it.
+    """
     dataset_path = _resolved_dataset_path(spec.dataset_path)
     dataset_path.mkdir(parents=True, exist_ok=True)
 
     lock_path = _lockfile_path(dataset_path, spec.name)
     timeout_s = _effective_timeout(spec.timeout_s)
-    lock = FileLock(str(lock_path))
+    # One instance per acquisition: a shared instance would make threads of
+    # this process raise instead of waiting for each other.
+    lock = ReadWriteLock(str(lock_path), timeout=timeout_s, is_singleton=False)
+
+    legacy_path = None if spec.shared else _legacy_lockfile_path(dataset_path, spec.name)
+    legacy = FileLock(str(legacy_path)) if legacy_path is not None else None
 
     acquired = False
+    started = time.perf_counter()
+    acquired_at = started
     try:
-        lock.acquire(timeout=timeout_s)
+        if spec.shared:
+            lock.acquire_read()
+        else:
+            lock.acquire_write()
         acquired = True
+        if legacy is not None:
+            try:
+                legacy.acquire(timeout=max(0.0, timeout_s - (time.perf_counter() - started)))
+            except Timeout:
+                acquired = False
+                lock.release()
+                raise
+        acquired_at = time.perf_counter()
         yield
     except Timeout as e:
+        if not acquired:
+            _record(dataset_path, spec, time.perf_counter() - started, None)
         raise RuntimeError(
-            f"Timeout acquiring lock '{spec.name}' for dataset '{dataset_path}' "
-            f"using lock file '{lock_path}' after {timeout_s} seconds"
+            f"Timeout acquiring {'shared' if spec.shared else 'exclusive'} lock '{spec.name}' "
+            f"for dataset '{dataset_path}' using lock file '{lock_path}' after {timeout_s} seconds"
         ) from e
     finally:
         if acquired:
+            if legacy is not None:
+                try:
+                    legacy.release()
+                except Exception:
+                    pass
             try:
                 lock.release()
             except Exception:
                 # best effort
-                pass
\ No newline at end of file
+                pass
+            _record(dataset_path, spec, acquired_at - started, time.perf_counter() - acquired_at)
+        try:
+            lock.close()
+        except Exception:
+            pass
\ No newline at end of file
@@ -0,0 +1,233 @@
+# eCRF_backend/datalad_push_scheduler.py
+"""
+Debounced pushes to the RIA sibling.
+
+Saves only mark their dataset dirty; a scheduler thread pushes each dirty
+dataset at most once per ``push_interval_s``, several datasets at a time,
+so write latency no longer includes network time. ``flush`` pushes now.
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .datalad_config import DataladConfig
+from .datalad_git_commit import read_head
+from .datalad_lock import dataset_lock, LockSpec
+
+try:
+    from datalad.api import Dataset  # type: ignore
+except Exception:  # pragma: no cover
+    Dataset = None  # type: ignore
+
+
+PushFn = Callable[[Path, str], None]
+
+
+@dataclass
+class _PushState:
+    dataset_path: Path
+    to: str
+    # Wall-clock time of the oldest save not yet on the sibling.
+    dirty_since: Optional[float] = None
+    # Oldest save that arrived while a push was already running.
+    dirty_since_next: Optional[float] = None
+    marks: int = 0
+    pushed_marks: int = 0
+    last_attempt: float = 0.0  # monotonic
+    last_pushed_at: Optional[float] = None
+    last_error: Optional[str] = None
+    pushes: int = 0
+    in_flight: Optional[Future] = None
+
+    @property
+    def dirty(self) -> bool:
+        return self.marks > self.pushed_marks
+
+
+def _study_id_from_path(ds_path: Path) -> Optional[int]:
+    m = re.match(r"study_(\d+)(?:_|$)", Path(ds_path).name)
+    return int(m.group(1)) if m else None
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(ts).astimezone().isoformat() if ts else None
+
+
+class PushScheduler:
+    def __init__(
+        self,
+        cfg: DataladConfig,
+        log: Callable[[str], None],
+        push: Optional[PushFn] = None,
+    ) -> None:
+        self.cfg = cfg
+        self.log = log
+        self._push = push or self._push_dataset
+        self._states: Dict[str, _PushState] = {}
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._t: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def interval_s(self) -> float:
+        return max(0.0, float(getattr(self.cfg, "push_interval_s", 30.0)))
+
+    def start(self) -> None:
+        if self._t and self._t.is_alive():
+            return
+        self._stop.clear()
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, int(getattr(self.cfg, "push_concurrency", 4))),
+            thread_name_prefix="datalad-push",
+        )
+        self._t = threading.Thread(target=self._run, name="datalad-push-scheduler", daemon=True)
+        self._t.start()
+        self.log(f"DataLad push scheduler started (interval={self.interval_s}s)")
+
+    def stop(self, timeout_s: float = 5.0) -> None:
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._t:
+            self._t.join(timeout=timeout_s)
+        if self._pool:
+            self._pool.shutdown(wait=False)
+        self.log("DataLad push scheduler stopped")
+
+    def mark_dirty(self, dataset_path: Path, to: Optional[str] = None) -> None:
+        key = str(Path(dataset_path))
+        now = time.time()
+        with self._cond:
+            state = self._states.get(key)
+            if state is None:
+                state = self._states[key] = _PushState(dataset_path=Path(dataset_path), to=to or self.cfg.ria_name)
+            elif to:
+                state.to = to
+            state.marks += 1
+            if state.dirty_since is None:
+                state.dirty_since = now
+            elif state.in_flight is not None and state.dirty_since_next is None:
+                state.dirty_since_next = now
+            self._cond.notify_all()
+
+    def flush(self, dataset_path: Optional[Path] = None, timeout_s: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Push dirty datasets now, ignoring the interval, and wait for the
+        result. Limited to ``dataset_path`` when given.
+        """
+        deadline = None if timeout_s is None else time.monotonic() + timeout_s
+        key = str(Path(dataset_path)) if dataset_path is not None else None
+        flushed: List[str] = []
+
+        # Two rounds: a push already running may predate the latest save.
+        for _ in range(2):
+            futures: List[Future] = []
+            with self._cond:
+                for state_key, state in self._states.items():
+                    if key is not None and state_key != key:
+                        continue
+                    if state.in_flight is not None:
+                        futures.append(state.in_flight)
+                    elif state.dirty:
+                        futures.append(self._submit(state))
+                        flushed.append(state_key)
+            if not futures:
+                break
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            wait(futures, timeout=remaining)
+
+        with self._cond:
+            states = [s for k, s in self._states.items() if key is None or k == key]
+            return {
+                "flushed": sorted(set(flushed)),
+                "pending": sorted(str(s.dataset_path) for s in states if s.dirty),
+                "errors": {str(s.dataset_path): s.last_error for s in states if s.last_error},
+            }
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Replication state per dataset; ``lag_s`` is the age of the oldest unpushed save."""
+        now = time.time()
+        with self._cond:
+            return [
+                {
+                    "dataset_path": str(s.dataset_path),
+                    "study_id": _study_id_from_path(s.dataset_path),
+                    "to": s.to,
+                    "dirty": s.dirty,
+                    "lag_s": round(now - s.dirty_since, 3) if s.dirty and s.dirty_since else 0.0,
+                    "in_flight": s.in_flight is not None,
+                    "pushes": s.pushes,
+                    "last_pushed_at": _iso(s.last_pushed_at),
+                    "last_error": s.last_error,
+                }
+                for s in sorted(self._states.values(), key=lambda s: str(s.dataset_path))
+            ]
+
+    def _submit(self, state: _PushState) -> Future:
+        # Caller holds self._cond.
+        if self._pool is None:
+            raise RuntimeError("Push scheduler is not started")
+        state.last_attempt = time.monotonic()
+        marks = state.marks
+        future = self._pool.submit(self._push_one, state, marks)
+        state.in_flight = future
+        return future
+
+    def _push_one(self, state: _PushState, marks: int) -> None:
+        error: Optional[str] = None
+        try:
+            self._push(state.dataset_path, state.to)
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+            self.log(f"Scheduled push failed for {state.dataset_path} to={state.to}: {error}")
+
+        with self._cond:
+            state.in_flight = None
+            state.last_error = error
+            if error is None:
+                state.pushes += 1
+                state.pushed_marks = marks
+                state.last_pushed_at = time.time()
+                state.dirty_since = state.dirty_since_next if state.dirty else None
+                state.dirty_since_next = None
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            with self._cond:
+                now = time.monotonic()
+                next_due: Optional[float] = None
+                for state in self._states.values():
+                    if not state.dirty or state.in_flight is not None:
+                        continue
+                    due = state.last_attempt + self.interval_s
+                    if due <= now:
+                        self._submit(state)
+                    else:
+                        next_due = due if next_due is None else min(next_due, due)
+                timeout = 1.0 if next_due is None else min(1.0, max(0.0, next_due - now))
+                self._cond.wait(timeout=timeout)
+
+    def _push_dataset(self, ds_path: Path, to: str) -> None:
+        if Dataset is None:
+            raise RuntimeError("DataLad not installed in this environment")
+        push_kwargs = {"to": to}
+        data_mode = getattr(self.cfg, "push_data_mode", "auto-if-wanted")
+        if data_mode and data_mode != "nothing":
+            push_kwargs["data"] = data_mode
+        # The lock is held only to wait out a save in progress and read a
+        # settled HEAD. The push itself runs unlocked: a save moves the
+        # branch only after its objects are written, so a commit landing
+        # meanwhile is either pushed whole or left for the next push.
+        with dataset_lock(LockSpec(dataset_path=Path(ds_path), timeout_s=300.0, shared=True)):
+            head = read_head(Path(ds_path))
+        Dataset(str(ds_path)).push(**push_kwargs)
+        self.log(f"Pushed dataset: {ds_path} to={to} data_mode={data_mode} head={head}")
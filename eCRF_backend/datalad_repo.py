@@ -7,15 +7,24 @@ import os
 import re
 import shutil
 import subprocess
+import threading
+from contextlib import ExitStack, contextmanager, nullcontext
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from .logger import logger
 from .datalad_config import get_datalad_config, is_datalad_enabled
+from .datalad_bulk_load import iter_json_files
+from .datalad_audit_blobs import blob_kind, write_blob
+from .datalad_audit_index import AuditIndex, AuditQuery, decode_audit_cursor, encode_audit_cursor
+from .datalad_audit_log import ensure_audit_gitattributes, seal_if_due
+from .datalad_entry_cache import get_entry_cache
+from .datalad_entry_catalog import EntryCatalog, EntryQuery, catalog_row, decode_cursor, encode_cursor
 from .datalad_lock import dataset_lock, LockSpec
-from .datalad_runtime import get_datalad_worker
+from .datalad_git_commit import read_head, try_plumbing_commit
+from .datalad_runtime import get_datalad_worker, get_push_scheduler
 from .settings import get_settings
 import tempfile
 try:
@@ -31,6 +40,10 @@ except Exception:
 
 ALLOWED_STUDY_STATUS = {"DRAFT", "PUBLISHED", "ARCHIVED"}
 
+# Slots share a fixed pool of lock files; two slots in one stripe simply
+# serialize.
+SLOT_LOCK_STRIPES = 256
+
 
 def local_now() -> datetime:
     return datetime.now(timezone.utc)
@@ -73,6 +86,29 @@ def _json_dump(path: Path, payload: Any) -> None:
     path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
 
 
+def _json_dump_atomic(path: Path, payload: Any, *, fsync: bool = False) -> None:
+    # Sidecar indexes are read without the dataset lock, so readers must
+    # never observe a half-written file.
+    _write_text_atomic(path, json.dumps(payload, ensure_ascii=False, separators=(",", ":")), fsync=fsync)
+
+
+def _entry_dump(path: Path, entry: Dict[str, Any]) -> None:
+    # Slot writers hold the dataset lock only shared, like readers, so entry
+    # files are replaced atomically. Same layout as _json_dump.
+    _write_text_atomic(path, json.dumps(entry, ensure_ascii=False, indent=2))
+
+
+def _write_text_atomic(path: Path, text: str, *, fsync: bool = False) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        f.write(text)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
 def _json_load(path: Path, default: Any = None) -> Any:
     if not path.exists():
         return default
@@ -88,7 +124,7 @@ def _ensure_gitignore(ds_path: Path) -> None:
     if gitignore.exists():
         lines = gitignore.read_text(encoding="utf-8").splitlines()
 
-    wanted = {".DS_Store", "*.lock", "__pycache__/"}
+    wanted = {".DS_Store", "*.lock", "__pycache__/", ".casee/"}
     changed = False
     for item in wanted:
         if item not in lines:
@@ -107,6 +143,27 @@ def _run_git(ds_path: Path, args: List[str]) -> str:
     return out.strip()
 
 
+def _slot_index_meta_file(ds_path: Path) -> Path:
+    return Path(ds_path) / ".casee" / "slots" / "index_meta.json"
+
+
+def note_own_commit(ds_path: Path, old_head: Optional[str], new_head: Optional[str]) -> None:
+    """
+    Record ``new_head`` as the slot index's commit after a scoped save of
+    files this repo wrote (and indexed) itself, so the next reader does not
+    diff the commit. Does nothing unless the index matched ``old_head``;
+    HEAD moved by anything else still goes through _ensure_slot_index.
+    Caller holds the dataset lock exclusively.
+    """
+    if not new_head or new_head == old_head:
+        return
+    path = _slot_index_meta_file(ds_path)
+    meta = _json_load(path)
+    if isinstance(meta, dict) and meta.get("git_head") == old_head:
+        meta["git_head"] = new_head
+        _json_dump_atomic(path, meta)
+
+
 def _git_show_json(ds_path: Path, rev: str, rel_path: str, default: Any = None) -> Any:
     try:
         raw = _run_git(ds_path, ["show", f"{rev}:{rel_path}"])
@@ -120,10 +177,81 @@ def _safe_status(s: Optional[str]) -> str:
     return s2 if s2 in ALLOWED_STUDY_STATUS else "PUBLISHED"
 
 
-def _append_jsonl(path: Path, row: Dict[str, Any]) -> None:
+def _append_jsonl(path: Path, row: Dict[str, Any]) -> Tuple[int, int]:
+    """Append one JSON line; returns its byte offset and length."""
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n")
+    data = (json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+    with path.open("ab") as f:
+        offset = f.seek(0, os.SEEK_END)
+        f.write(data)
+    return offset, len(data)
+
+
+def _scoped_save_paths(ds_path: Path, paths: Optional[Iterable[Path]]) -> Optional[List[str]]:
+    """
+    Dataset-relative, de-duplicated save paths, or None (save everything)
+    when the set is unknown, empty, or reaches outside the dataset.
+    """
+    if paths is None:
+        return None
+    out = set()
+    for raw in paths:
+        path = Path(raw)
+        if path.is_absolute():
+            # Resolve the parent only: the file itself may have been removed.
+            path = path.parent.resolve() / path.name
+            try:
+                path = path.relative_to(ds_path)
+            except ValueError:
+                return None
+        if not path.parts or path.parts[0] == "..":
+            return None
+        out.add(path.as_posix())
+    return sorted(out) or None
+
+
+@dataclass
+class _StudyContentSnapshot:
+    # Parsed canonical/study_content.json plus its path labels per index.
+    signature: Tuple[int, int]
+    study_data: Dict[str, Any]
+    subject_labels: List[str]
+    visit_labels: List[Optional[str]]
+    group_labels: List[Optional[str]]
+
+
+_study_content_cache: Dict[str, _StudyContentSnapshot] = {}
+_study_content_lock = threading.Lock()
+
+# Datasets already verified by ensure_dataset in this process, keyed by
+# dataset path; trusted while _dataset_ready_signature is unchanged.
+_dataset_ready_cache: Dict[str, Tuple[Any, ...]] = {}
+_dataset_ready_lock = threading.Lock()
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _dataset_ready_signature(dataset_path: Path, canonical_dir: Path, cfg: Any) -> Tuple[Any, ...]:
+    # Config values the setup steps depend on, plus the files they write:
+    # recreating the dataset, editing its config or removing canonical/
+    # changes one of these mtimes.
+    return (
+        *(getattr(cfg, name, None) for name in ("mode", "git_name", "git_email", "gpgsign", "gpg_keyid", "ria_url", "ria_name")),
+        _mtime_ns(dataset_path / ".datalad" / "config"),
+        _mtime_ns(dataset_path / ".git" / "config"),
+        _mtime_ns(dataset_path / ".gitignore"),
+        _mtime_ns(canonical_dir),
+    )
+
+
+def invalidate_dataset_ready(dataset_path: Path) -> None:
+    with _dataset_ready_lock:
+        _dataset_ready_cache.pop(str(Path(dataset_path).resolve()), None)
 
 
 @dataclass
@@ -312,6 +440,26 @@ class DataladStudyRepo:
     def ensure_dataset(self, study_id: int, study_name: str) -> StudyPaths:
         self._validate_storage_ready()
         p = self.paths(study_id, study_name)
+        cfg = self._cfg()
+
+        key = str(p.dataset_path.resolve())
+        with _dataset_ready_lock:
+            cached = _dataset_ready_cache.get(key)
+        if cached is not None and cached == _dataset_ready_signature(p.dataset_path, p.canonical_dir, cfg):
+            return p
+
+        try:
+            self._prepare_dataset(p, cfg, study_id, study_name)
+        except Exception:
+            invalidate_dataset_ready(p.dataset_path)
+            raise
+
+        signature = _dataset_ready_signature(p.dataset_path, p.canonical_dir, cfg)
+        with _dataset_ready_lock:
+            _dataset_ready_cache[key] = signature
+        return p
+
+    def _prepare_dataset(self, p: StudyPaths, cfg, study_id: int, study_name: str) -> None:
 
         logger.info(
             "[DataladStudyRepo.ensure_dataset] Start study_id=%s study_name=%s dataset_path=%s",
@@ -326,7 +474,6 @@ class DataladStudyRepo:
             p.dataset_path,
         )
 
-        cfg = self._cfg()
         datalad_enabled = is_datalad_enabled(cfg)
 
         if datalad_enabled and Dataset is None:
@@ -356,7 +503,7 @@ class DataladStudyRepo:
                 "[DataladStudyRepo.ensure_dataset] Filesystem-only dataset ready path=%s",
                 p.dataset_path,
             )
-            return p
+            return
 
         logger.info(
             "[DataladStudyRepo.ensure_dataset] About to acquire dataset lock dataset_path=%s",
@@ -429,7 +576,6 @@ class DataladStudyRepo:
             study_id,
             p.dataset_path,
         )
-        return p
 
     def next_study_id(self) -> int:
         max_id = 0
@@ -447,7 +593,12 @@ class DataladStudyRepo:
     # git / datalad history
     # ------------------------------------------------------------------
 
-    def save(self, ds_path: Path, message: str) -> None:
+    def save(self, ds_path: Path, message: str, paths: Optional[Iterable[Path]] = None) -> None:
+        """
+        Commit changes in the dataset. ``paths`` limits the save to the files
+        an operation touched, so datalad need not scan the whole tree;
+        ``None`` means the set is unknown and the full dataset is saved.
+        """
         if not is_datalad_enabled(self._cfg()):
             logger.info(
                 "[DataladStudyRepo.save] Filesystem-only mode; skipping DataLad save path=%s message=%s",
@@ -467,6 +618,7 @@ class DataladStudyRepo:
         cfg = self._cfg()
         ds_path = Path(ds_path).expanduser().resolve()
         worker = get_datalad_worker()
+        save_paths = _scoped_save_paths(ds_path, paths)
 
         logger.info(
             "[DataladStudyRepo.save] Start ds_path=%s message=%s sync_mode=%s push_on_save=%s ria_name=%s",
@@ -478,7 +630,7 @@ class DataladStudyRepo:
         )
 
         if cfg.sync_mode == "async" and worker is not None:
-            worker.enqueue_save(ds_path, message)
+            worker.enqueue_save(ds_path, message, paths=save_paths)
             logger.info("[DataladStudyRepo.save] Enqueued dataset save ds_path=%s msg=%s", ds_path, message)
             return
 
@@ -499,20 +651,34 @@ class DataladStudyRepo:
 
             if not ds.is_installed():
                 logger.error("[DataladStudyRepo.save] Dataset not installed ds_path=%s", ds_path)
+                invalidate_dataset_ready(ds_path)
                 raise RuntimeError(f"Dataset not installed at {ds_path}")
 
             self._set_repo_identity(ds)
             logger.info("[DataladStudyRepo.save] Repo identity configured ds_path=%s", ds_path)
 
+            head_before = read_head(ds_path)
             try:
                 logger.info("[DataladStudyRepo.save] Calling ds.save ds_path=%s message=%s", ds_path, message)
-                ds.save(message=message)
+                if try_plumbing_commit(cfg, ds_path, save_paths, message):
+                    logger.info("[DataladStudyRepo.save] Committed via git plumbing ds_path=%s", ds_path)
+                elif save_paths is None:
+                    ds.save(message=message)
+                else:
+                    ds.save(path=save_paths, message=message)
                 logger.info("[DataladStudyRepo.save] Saved dataset ds_path=%s msg=%s", ds_path, message)
             except Exception:
                 logger.exception("[DataladStudyRepo.save] ds.save failed ds_path=%s msg=%s", ds_path, message)
+                invalidate_dataset_ready(ds_path)
                 raise
-
-            if cfg.push_on_save and cfg.ria_name:
+            if save_paths is not None:
+                note_own_commit(ds_path, head_before, read_head(ds_path))
+
+            scheduler = get_push_scheduler()
+            if cfg.push_on_save and cfg.ria_name and scheduler is not None:
+                scheduler.mark_dirty(ds_path, to=cfg.ria_name)
+                logger.info("[DataladStudyRepo.save] Push scheduled ds_path=%s to=%s", ds_path, cfg.ria_name)
+            elif cfg.push_on_save and cfg.ria_name:
                 push_kwargs = {"to": cfg.ria_name}
                 if cfg.push_data_mode != "nothing":
                     push_kwargs["data"] = cfg.push_data_mode
@@ -550,11 +716,76 @@ class DataladStudyRepo:
     # helpers for labels / users
     # ------------------------------------------------------------------
 
-    def _load_study_content_data(self, p: StudyPaths) -> Dict[str, Any]:
+    def _study_content_snapshot(self, p: StudyPaths) -> _StudyContentSnapshot:
+        # study_content.json is the largest document in a dataset and is
+        # needed for path labels on every write; reuse the parsed copy while
+        # the file's (mtime_ns, size) is unchanged.
+        key = str(p.content_json)
+        try:
+            st = p.content_json.stat()
+            signature: Optional[Tuple[int, int]] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            signature = None
+
+        if signature is not None:
+            with _study_content_lock:
+                cached = _study_content_cache.get(key)
+            if cached is not None and cached.signature == signature:
+                return cached
+
         content = _json_load(p.content_json, {}) or {}
+        study_data: Dict[str, Any] = {}
         if isinstance(content, dict) and isinstance(content.get("study_data"), dict):
-            return content.get("study_data") or {}
-        return {}
+            study_data = content.get("study_data") or {}
+
+        def _count(name: str) -> int:
+            value = study_data.get(name)
+            return len(value) if isinstance(value, list) else 0
+
+        snapshot = _StudyContentSnapshot(
+            signature=signature or (0, -1),
+            study_data=study_data,
+            subject_labels=[self._resolve_subject_label(study_data, i) for i in range(_count("subjects"))],
+            visit_labels=[self._resolve_visit_label(study_data, i) for i in range(_count("visits"))],
+            group_labels=[self._resolve_group_label(study_data, i) for i in range(_count("groups"))],
+        )
+        if signature is not None:
+            with _study_content_lock:
+                _study_content_cache[key] = snapshot
+        return snapshot
+
+    def _write_study_content(self, p: StudyPaths, content: Dict[str, Any]) -> None:
+        _json_dump(p.content_json, content)
+        with _study_content_lock:
+            _study_content_cache.pop(str(p.content_json), None)
+
+    def _table_label(
+        self,
+        table: List[Any],
+        index: Optional[int],
+        resolve: Callable[[Dict[str, Any], Optional[int]], Any],
+        study_data: Dict[str, Any],
+    ) -> Any:
+        if index is not None:
+            try:
+                idx = int(index)
+            except Exception:
+                idx = -1
+            if 0 <= idx < len(table):
+                return table[idx]
+        return resolve(study_data, index)
+
+    def _subject_label(self, p: StudyPaths, subject_index: Optional[int]) -> str:
+        snap = self._study_content_snapshot(p)
+        return self._table_label(snap.subject_labels, subject_index, self._resolve_subject_label, snap.study_data)
+
+    def _visit_label(self, p: StudyPaths, visit_index: Optional[int]) -> Optional[str]:
+        snap = self._study_content_snapshot(p)
+        return self._table_label(snap.visit_labels, visit_index, self._resolve_visit_label, snap.study_data)
+
+    def _group_label(self, p: StudyPaths, group_index: Optional[int]) -> Optional[str]:
+        snap = self._study_content_snapshot(p)
+        return self._table_label(snap.group_labels, group_index, self._resolve_group_label, snap.study_data)
 
     def _resolve_subject_label(self, study_data: Dict[str, Any], subject_index: Optional[int]) -> str:
         if subject_index is None:
@@ -634,27 +865,25 @@ class DataladStudyRepo:
         visit_raw: Optional[str] = None,
         group_raw: Optional[str] = None,
     ) -> Dict[str, Any]:
-        study_data = self._load_study_content_data(p)
-
         resolved_subject_raw = subject_raw
         resolved_visit_raw = visit_raw
         resolved_group_raw = group_raw
 
         try:
             if resolved_subject_raw in (None, "") and subject_index is not None:
-                resolved_subject_raw = self._resolve_subject_label(study_data, subject_index)
+                resolved_subject_raw = self._subject_label(p, subject_index)
         except Exception:
             pass
 
         try:
             if resolved_visit_raw in (None, "") and visit_index is not None:
-                resolved_visit_raw = self._resolve_visit_label(study_data, visit_index)
+                resolved_visit_raw = self._visit_label(p, visit_index)
         except Exception:
             pass
 
         try:
             if resolved_group_raw in (None, "") and group_index is not None:
-                resolved_group_raw = self._resolve_group_label(study_data, group_index)
+                resolved_group_raw = self._group_label(p, group_index)
         except Exception:
             pass
 
@@ -704,12 +933,11 @@ class DataladStudyRepo:
         if subject_index is None and visit_index is None:
             return p.files_dir / "metadata"
 
-        study_data = self._load_study_content_data(p)
         version = int(form_version or 1)
 
-        subject_label = self._resolve_subject_label(study_data, subject_index)
-        visit_label = self._resolve_visit_label(study_data, visit_index)
-        group_label = self._resolve_group_label(study_data, group_index)
+        subject_label = self._subject_label(p, subject_index)
+        visit_label = self._visit_label(p, visit_index)
+        group_label = self._group_label(p, group_index)
         modality_label = self._resolve_primary_modality_label(modalities)
 
         base = p.files_dir / f"v{version:03d}" / f"sub-{subject_label}"
@@ -825,7 +1053,7 @@ class DataladStudyRepo:
                 p.metadata_json,
             )
 
-            _json_dump(p.content_json, safe_content)
+            self._write_study_content(p, safe_content)
             logger.info(
                 "[DataladStudyRepo.create_or_replace_published_snapshot] Wrote content study_id=%s path=%s",
                 study_id,
@@ -960,7 +1188,7 @@ class DataladStudyRepo:
 
         with dataset_lock(LockSpec(dataset_path=p.dataset_path)):
             _json_dump(p.metadata_json, metadata)
-            _json_dump(p.content_json, content)
+            self._write_study_content(p, content)
 
             v1_dir = p.templates_dir / "v001"
             v1_dir.mkdir(parents=True, exist_ok=True)
@@ -1047,7 +1275,7 @@ class DataladStudyRepo:
 
         with dataset_lock(LockSpec(dataset_path=p.dataset_path)):
             _json_dump(p.metadata_json, metadata)
-            _json_dump(p.content_json, content)
+            self._write_study_content(p, content)
             _json_dump(latest_schema_path, new_schema)
 
             diffs = self._compute_json_diff(
@@ -1083,6 +1311,8 @@ class DataladStudyRepo:
         ds = self.study_dataset_path(study_id, study_name)
         if ds.exists():
             shutil.rmtree(ds, ignore_errors=True)
+        get_entry_cache().discard_prefix(ds)
+        invalidate_dataset_ready(ds)
 
     def build_full_study_zip(
         self,
@@ -1162,10 +1392,9 @@ class DataladStudyRepo:
         group_index: int,
         entry_id: int,
     ) -> Path:
-        study_data = self._load_study_content_data(p)
-        subject_label = self._resolve_subject_label(study_data, subject_index)
-        visit_label = self._resolve_visit_label(study_data, visit_index) or f"visit_{int(visit_index) + 1:02d}"
-        group_label = self._resolve_group_label(study_data, group_index) or f"group_{int(group_index) + 1:02d}"
+        subject_label = self._subject_label(p, subject_index)
+        visit_label = self._visit_label(p, visit_index) or f"visit_{int(visit_index) + 1:02d}"
+        group_label = self._group_label(p, group_index) or f"group_{int(group_index) + 1:02d}"
 
         return (
             p.entries_dir
@@ -1176,22 +1405,25 @@ class DataladStudyRepo:
             / f"entry_{int(entry_id):09d}.json"
         )
 
-    def _next_entry_id(self, p: StudyPaths) -> int:
+    def _scan_max_entry_id(self, p: StudyPaths) -> int:
         max_id = 0
         for f in p.entries_dir.rglob("entry_*.json"):
             m = re.match(r"entry_(\d+)\.json$", f.name)
             if m:
                 max_id = max(max_id, int(m.group(1)))
-        return max_id + 1
-
-    def _next_entry_id_from_rows(self, rows: List[Dict[str, Any]]) -> int:
-        max_id = 0
-        for row in rows or []:
-            try:
-                max_id = max(max_id, int(row.get("id") or 0))
-            except Exception:
-                continue
-        return max_id + 1
+        return max_id
+
+    def _next_entry_id(self, p: StudyPaths, count: int = 1) -> int:
+        # Caller holds the dataset lock exclusively, or shared plus _meta_lock.
+        # Reserves ``count`` consecutive ids and returns the first one. Entry files are spread over slot
+        # directories, so the catalog's highest id stands in for a per-id probe.
+        return self._allocate_id(
+            p,
+            "entry_id",
+            scan=lambda: self._scan_max_entry_id(p),
+            floor=lambda: EntryCatalog(self._entry_catalog_path(p)).max_id(),
+            count=count,
+        )
 
     def bulk_clone_entries_to_version(
         self,
@@ -1208,9 +1440,11 @@ class DataladStudyRepo:
         p = self.ensure_dataset(study_id, study_name)
 
         with dataset_lock(LockSpec(dataset_path=p.dataset_path)):
-            existing_rows = self.list_entries(study_id, study_name)
-            next_entry_id = self._next_entry_id_from_rows(existing_rows)
+            self._ensure_slot_index(p)
+            next_entry_id = self._next_entry_id(p, count=len(clones)) if clones else 0
             written_ids: List[int] = []
+            written_entries: List[Dict[str, Any]] = []
+            written_catalog: List[Dict[str, Any]] = []
 
             for item in clones or []:
                 entry_id = next_entry_id
@@ -1234,6 +1468,8 @@ class DataladStudyRepo:
                     "cloned_from_version": int(source_version),
                 }
 
+                entry["revision_token"] = self._hash_entry_revision(entry)
+
                 path = self._entry_path(
                     p,
                     form_version=target_version,
@@ -1242,7 +1478,10 @@ class DataladStudyRepo:
                     group_index=group_index,
                     entry_id=entry_id,
                 )
-                _json_dump(path, entry)
+                _entry_dump(path, entry)
+                self._slot_index_add(p, entry, path)
+                written_entries.append(entry)
+                written_catalog.append(catalog_row(entry, self._logical_path(p.dataset_path, path)))
 
                 labels = self._resolve_subject_visit_group_labels(
                     p,
@@ -1279,6 +1518,8 @@ class DataladStudyRepo:
 
                 written_ids.append(entry_id)
 
+            self._catalog_apply(p, written_catalog, [self._slot_key(e) for e in written_entries])
+
         if written_ids:
             self.save(
                 p.dataset_path,
@@ -1316,21 +1557,17 @@ class DataladStudyRepo:
         expected_revision_token: Optional[str] = None,
     ) -> Dict[str, Any]:
         p = self.ensure_dataset(study_id, study_name)
+        slot = (int(subject_index), int(visit_index), int(group_index), int(form_version))
+        self._ensure_slot_index_for_write(p)
 
-        with dataset_lock(LockSpec(dataset_path=p.dataset_path)):
+        with self._slot_write_lock(p, [slot]):
             if expected_revision_token is not None:
-                latest = self.get_latest_entry_for_slot(
-                    study_id=study_id,
-                    study_name=study_name,
-                    subject_index=subject_index,
-                    visit_index=visit_index,
-                    group_index=group_index,
-                    form_version=form_version,
-                )
-                if self.compute_entry_revision_token(latest) != str(expected_revision_token):
+                current_token = self._slot_revision_token(p, study_id, slot)
+                if current_token != str(expected_revision_token):
                     raise ValueError("Slot state changed")
 
-            entry_id = self._next_entry_id(p)
+            with self._meta_lock(p):
+                entry_id = self._next_entry_id(p)
 
             entry = {
                 "id": entry_id,
@@ -1350,6 +1587,8 @@ class DataladStudyRepo:
                 "updated_at": local_now().isoformat(),
             }
 
+            entry["revision_token"] = self._hash_entry_revision(entry)
+
             path = self._entry_path(
                 p,
                 form_version=form_version,
@@ -1358,7 +1597,8 @@ class DataladStudyRepo:
                 group_index=group_index,
                 entry_id=entry_id,
             )
-            _json_dump(path, entry)
+            _entry_dump(path, entry)
+            self._slot_index_add(p, entry, path)
 
             labels = self._resolve_subject_visit_group_labels(
                 p,
@@ -1371,26 +1611,203 @@ class DataladStudyRepo:
             )
             actor_payload = self._build_actor_payload(actor=actor, actor_name=actor_name, user_id=user_id)
 
-            self._append_audit(
-                p,
-                action="entry_upserted",
-                study_id=study_id,
-                payload={
-                    "entry_id": entry_id,
-                    "subject_index": subject_index,
-                    "visit_index": visit_index,
-                    "group_index": group_index,
-                    "form_version": form_version,
-                    "ui_label": audit_label,
-                    **labels,
-                    **actor_payload,
-                },
-                subject_index=subject_index,
-            )
+            with self._meta_lock(p):
+                self._catalog_apply(
+                    p,
+                    [catalog_row(entry, self._logical_path(p.dataset_path, path))],
+                    [self._slot_key(entry)],
+                )
+                audit_paths = self._append_audit(
+                    p,
+                    action="entry_upserted",
+                    study_id=study_id,
+                    payload={
+                        "entry_id": entry_id,
+                        "subject_index": subject_index,
+                        "visit_index": visit_index,
+                        "group_index": group_index,
+                        "form_version": form_version,
+                        "ui_label": audit_label,
+                        **labels,
+                        **actor_payload,
+                    },
+                    subject_index=subject_index,
+                )
 
-        self.save(p.dataset_path, f"case-e: upsert_entry study={study_id} entry={entry_id}")
+        self.save(
+            p.dataset_path,
+            f"case-e: upsert_entry study={study_id} entry={entry_id}",
+            paths=[path, *audit_paths],
+        )
         return entry
 
+    def save_entries_batch(
+        self,
+        *,
+        study_id: int,
+        study_name: str,
+        items: List[Dict[str, Any]],
+        actor: str,
+        audit_label: Optional[str] = None,
+        user_id: Optional[int] = None,
+        actor_name: Optional[str] = None,
+        atomic: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Save new revisions for many slots with one lock acquisition and one
+        DataLad save.
+
+        Each item carries the save_entry arguments for its slot (subject_index,
+        visit_index, group_index, form_version, data, skipped_required_flags,
+        progress_* and *_raw) plus its own ``expected_revision_token``; an
+        ``import`` marker ({"id", "row"}) is stored on the entry. All
+        tokens are checked before anything is written; a second tokened item
+        for a slot already written by this batch counts as a conflict. Items
+        without a token (bulk imports) are written unconditionally. With
+        ``atomic`` a single conflict leaves the whole batch unwritten.
+
+        Returns one result per item, in order, with ``status`` "saved",
+        "conflict" or "not_saved" (atomic batch rejected).
+        """
+        p = self.ensure_dataset(study_id, study_name)
+        results: List[Dict[str, Any]] = [
+            {"index": i, "status": "not_saved", "entry": None} for i in range(len(items or []))
+        ]
+        written: List[tuple] = []
+        audit_paths: List[Path] = []
+
+        with dataset_lock(LockSpec(dataset_path=p.dataset_path)):
+            self._ensure_slot_index(p)
+
+            accepted: List[int] = []
+            claimed: set = set()
+            for i, item in enumerate(items or []):
+                slot = (
+                    int(item["subject_index"]),
+                    int(item["visit_index"]),
+                    int(item["group_index"]),
+                    int(item["form_version"]),
+                )
+                expected = item.get("expected_revision_token")
+                if expected is not None and (
+                    slot in claimed or self._slot_revision_token(p, study_id, slot) != str(expected)
+                ):
+                    results[i]["status"] = "conflict"
+                    continue
+                claimed.add(slot)
+                accepted.append(i)
+
+            conflicts = len(accepted) != len(results)
+            if accepted and not (atomic and conflicts):
+                next_entry_id = self._next_entry_id(p, count=len(accepted))
+                actor_payload = self._build_actor_payload(actor=actor, actor_name=actor_name, user_id=user_id)
+
+                for i in accepted:
+                    item = items[i]
+                    entry_id = next_entry_id
+                    next_entry_id += 1
+                    entry = {
+                        "id": entry_id,
+                        "study_id": study_id,
+                        "subject_index": int(item["subject_index"]),
+                        "visit_index": int(item["visit_index"]),
+                        "group_index": int(item["group_index"]),
+                        "form_version": int(item["form_version"]),
+                        "data": _deepcopy_json(item.get("data") or {}),
+                        "skipped_required_flags": _deepcopy_json(item.get("skipped_required_flags") or []),
+                        "progress_status": item.get("progress_status"),
+                        "progress_percentage": item.get("progress_percentage"),
+                        "progress_completed": item.get("progress_completed"),
+                        "progress_total": item.get("progress_total"),
+                        "progress_skipped": item.get("progress_skipped"),
+                        "created_at": local_now().isoformat(),
+                        "updated_at": local_now().isoformat(),
+                    }
+                    if item.get("import"):
+                        entry["import"] = _deepcopy_json(item["import"])
+                    entry["revision_token"] = self._hash_entry_revision(entry)
+
+                    path = self._entry_path(
+                        p,
+                        form_version=entry["form_version"],
+                        subject_index=entry["subject_index"],
+                        visit_index=entry["visit_index"],
+                        group_index=entry["group_index"],
+                        entry_id=entry_id,
+                    )
+                    _entry_dump(path, entry)
+                    self._slot_index_add(p, entry, path)
+                    written.append((entry, path))
+                    results[i].update({"status": "saved", "entry": entry})
+
+                self._catalog_apply(
+                    p,
+                    [catalog_row(entry, self._logical_path(p.dataset_path, path)) for entry, path in written],
+                    [self._slot_key(entry) for entry, _path in written],
+                )
+
+                for i, (entry, _path) in zip(accepted, written):
+                    item = items[i]
+                    labels = self._resolve_subject_visit_group_labels(
+                        p,
+                        subject_index=entry["subject_index"],
+                        visit_index=entry["visit_index"],
+                        group_index=entry["group_index"],
+                        subject_raw=item.get("subject_raw"),
+                        visit_raw=item.get("visit_raw"),
+                        group_raw=item.get("group_raw"),
+                    )
+                    audit_paths += self._append_audit(
+                        p,
+                        action="entry_upserted",
+                        study_id=study_id,
+                        payload={
+                            "entry_id": entry["id"],
+                            "subject_index": entry["subject_index"],
+                            "visit_index": entry["visit_index"],
+                            "group_index": entry["group_index"],
+                            "form_version": entry["form_version"],
+                            "ui_label": audit_label,
+                            **labels,
+                            **actor_payload,
+                        },
+                        subject_index=entry["subject_index"],
+                    )
+
+        if written:
+            self.save(
+                p.dataset_path,
+                f"case-e: upsert_entries study={study_id} count={len(written)}",
+                paths=[path for _entry, path in written] + audit_paths,
+            )
+
+        return {
+            "saved_count": len(written),
+            "conflict_count": sum(1 for r in results if r["status"] == "conflict"),
+            "results": results,
+        }
+
+    def imported_rows(
+        self,
+        study_id: int,
+        study_name: str,
+        *,
+        run_id: str,
+        slots: Iterable[tuple],
+    ) -> set:
+        """Input rows of bulk import run ``run_id`` already stored as entries in ``slots``."""
+        p = self.paths(study_id, study_name)
+        done: set = set()
+        if not self._ensure_slot_index_for_read(p):
+            return done
+        with self._shared_lock(p):
+            for slot in set(slots):
+                for ref in self._read_slot_refs(p, slot):
+                    marker = (self._load_slot_row(p, ref, study_id, slot) or {}).get("import") or {}
+                    if marker.get("id") == run_id:
+                        done.add(int(marker.get("row") or 0))
+        return done
+
     def update_entry(
         self,
         *,
@@ -1408,25 +1825,30 @@ class DataladStudyRepo:
         expected_revision_token: Optional[str] = None,
     ) -> Dict[str, Any]:
         p = self.paths(study_id, study_name)
-        target = None
-        for f in p.entries_dir.rglob(f"entry_{int(entry_id):09d}.json"):
-            target = f
-            break
+        self._ensure_slot_index_for_write(p)
+        target = self._catalog_entry_path(p, entry_id)
         if target is None:
             raise FileNotFoundError("Entry not found")
 
-        with dataset_lock(LockSpec(dataset_path=p.dataset_path)):
+        # The slots to lock come from an unlocked read; re-checked below.
+        old_slot = self._slot_key(_json_load(target, {}) or {})
+        if old_slot is None:
+            raise FileNotFoundError("Entry not found")
+        new_slot = (
+            int(payload["subject_index"]),
+            int(payload["visit_index"]),
+            int(payload["group_index"]),
+            old_slot[3],
+        )
+
+        with self._slot_write_lock(p, [old_slot, new_slot]):
             old_entry = _json_load(target, {})
+            if self._slot_key(old_entry or {}) != old_slot:
+                # Moved or removed by a concurrent update.
+                raise ValueError("Slot state changed")
             if expected_revision_token is not None:
-                latest = self.get_latest_entry_for_slot(
-                    study_id=study_id,
-                    study_name=study_name,
-                    subject_index=int(payload["subject_index"]),
-                    visit_index=int(payload["visit_index"]),
-                    group_index=int(payload["group_index"]),
-                    form_version=int(old_entry.get("form_version") or 1),
-                )
-                if self.compute_entry_revision_token(latest) != str(expected_revision_token):
+                current_token = self._slot_revision_token(p, study_id, new_slot)
+                if current_token != str(expected_revision_token):
                     raise ValueError("Slot state changed")
 
             new_entry = _deepcopy_json(old_entry)
@@ -1444,6 +1866,8 @@ class DataladStudyRepo:
                 "updated_at": local_now().isoformat(),
             })
 
+            new_entry["revision_token"] = self._hash_entry_revision(new_entry)
+
             diffs = self._compute_json_diff(old_entry.get("data", {}), new_entry.get("data", {}))
 
             new_path = self._entry_path(
@@ -1457,13 +1881,19 @@ class DataladStudyRepo:
 
             if new_path.resolve() != target.resolve():
                 new_path.parent.mkdir(parents=True, exist_ok=True)
-                _json_dump(new_path, new_entry)
+                _entry_dump(new_path, new_entry)
                 try:
                     target.unlink()
                 except Exception:
                     pass
             else:
-                _json_dump(target, new_entry)
+                _entry_dump(target, new_entry)
+            # In-place rewrites can keep the same size within one mtime tick.
+            get_entry_cache().discard(target)
+
+            if self._slot_key(old_entry) != self._slot_key(new_entry):
+                self._slot_index_remove(p, old_entry)
+            self._slot_index_add(p, new_entry, new_path)
 
             labels = self._resolve_subject_visit_group_labels(
                 p,
@@ -1476,35 +1906,98 @@ class DataladStudyRepo:
             )
             actor_payload = self._build_actor_payload(actor=actor, actor_name=actor_name, user_id=user_id)
 
-            self._append_audit(
-                p,
-                action="entry_upserted",
-                study_id=study_id,
-                payload={
-                    "entry_id": entry_id,
-                    "subject_index": new_entry["subject_index"],
-                    "visit_index": new_entry["visit_index"],
-                    "group_index": new_entry["group_index"],
-                    "ui_label": audit_label,
-                    "diff_kind": "entry_data",
-                    "diff_payload": diffs,
-                    **labels,
-                    **actor_payload,
-                },
-                subject_index=new_entry["subject_index"],
-            )
+            with self._meta_lock(p):
+                self._catalog_apply(
+                    p,
+                    [catalog_row(new_entry, self._logical_path(p.dataset_path, new_path))],
+                    [self._slot_key(old_entry), self._slot_key(new_entry)],
+                )
+                audit_paths = self._append_audit(
+                    p,
+                    action="entry_upserted",
+                    study_id=study_id,
+                    payload={
+                        "entry_id": entry_id,
+                        "subject_index": new_entry["subject_index"],
+                        "visit_index": new_entry["visit_index"],
+                        "group_index": new_entry["group_index"],
+                        "ui_label": audit_label,
+                        "diff_kind": "entry_data",
+                        "diff_payload": diffs,
+                        **labels,
+                        **actor_payload,
+                    },
+                    subject_index=new_entry["subject_index"],
+                )
 
-        self.save(p.dataset_path, f"case-e: update_entry study={study_id} entry={entry_id}")
+        # ``target`` is listed too so a slot move also commits the removal.
+        self.save(
+            p.dataset_path,
+            f"case-e: update_entry study={study_id} entry={entry_id}",
+            paths=[target, new_path, *audit_paths],
+        )
         return new_entry
 
-    def list_entries(self, study_id: int, study_name: str) -> List[Dict[str, Any]]:
+    def iter_entries(self, study_id: int, study_name: str) -> Iterator[Dict[str, Any]]:
         p = self.paths(study_id, study_name)
-        out = []
-        for f in sorted(p.entries_dir.rglob("entry_*.json")):
-            row = _json_load(f)
-            if row:
-                out.append(row)
-        return out
+        paths = sorted(p.entries_dir.rglob("entry_*.json"))
+        for _path, row in iter_json_files(paths, loader=get_entry_cache().load):
+            yield dict(row)
+
+    def list_entries(self, study_id: int, study_name: str) -> List[Dict[str, Any]]:
+        # Materialized under the shared lock: study-level writers are held off.
+        # Slot writers may still run; each file is the old or the new revision.
+        with self._shared_lock(self.paths(study_id, study_name)):
+            return list(self.iter_entries(study_id, study_name))
+
+    def _shared_lock(self, p: StudyPaths):
+        """
+        Shared dataset lock for read paths: readers run concurrently, writers
+        wait. Never nest it (or take it while holding the exclusive lock), and
+        build the slot index before taking it.
+        """
+        if not p.dataset_path.exists():
+            # Nothing to read; do not create the dataset directory for a lock.
+            return nullcontext()
+        return dataset_lock(LockSpec(dataset_path=p.dataset_path, shared=True))
+
+    @contextmanager
+    def _slot_write_lock(
+        self, p: StudyPaths, slots: List[tuple], timeout_s: Optional[float] = None
+    ) -> Iterator[None]:
+        """
+        Lock for single-entry writes: the dataset lock in shared mode (so
+        study-level writers, which take it exclusively, still run alone)
+        plus an exclusive lock per slot stripe, taken in sorted order.
+        Writers for different slots mostly proceed in parallel; shared files
+        are updated in short _meta_lock sections.
+        """
+        with ExitStack() as stack:
+            stack.enter_context(
+                dataset_lock(LockSpec(dataset_path=p.dataset_path, shared=True, timeout_s=timeout_s))
+            )
+            for stripe in sorted({self._slot_lock_stripe(slot) for slot in slots}):
+                name = f"slot_{stripe:03d}"
+                stack.enter_context(dataset_lock(LockSpec(dataset_path=p.dataset_path, name=name, timeout_s=timeout_s)))
+            yield
+
+    @staticmethod
+    def _slot_lock_stripe(slot: tuple) -> int:
+        # Stable across processes (unlike hash()), so every writer agrees.
+        key = "_".join(str(int(v)) for v in slot).encode("ascii")
+        return int.from_bytes(hashlib.blake2b(key, digest_size=4).digest(), "big") % SLOT_LOCK_STRIPES
+
+    def _meta_lock(self, p: StudyPaths):
+        # Id counters, the catalog and audit logs are shared by
+        # all slots. Only taken inside _slot_write_lock.
+        return dataset_lock(LockSpec(dataset_path=p.dataset_path, name="meta"))
+
+    def _ensure_slot_index_for_write(self, p: StudyPaths) -> None:
+        # Slot writers only hold the dataset lock shared, so the index must be
+        # built (exclusively) before they start.
+        if not self._slot_index_ready(p):
+            with dataset_lock(LockSpec(dataset_path=p.dataset_path)):
+                self._ensure_slot_index(p)
 
     def _entry_sort_key(self, row: Dict[str, Any]) -> tuple:
         updated_at = str(row.get("updated_at") or "")
@@ -1526,28 +2019,16 @@ class DataladStudyRepo:
         form_version: int,
     ) -> List[Dict[str, Any]]:
         p = self.paths(study_id, study_name)
+        slot = (int(subject_index), int(visit_index), int(group_index), int(form_version))
         out: List[Dict[str, Any]] = []
+        if not self._ensure_slot_index_for_read(p):
+            return out
 
-        for f in p.entries_dir.rglob("entry_*.json"):
-            row = _json_load(f)
-            if not row:
-                continue
-
-            try:
-                if int(row.get("study_id")) != int(study_id):
-                    continue
-                if int(row.get("subject_index")) != int(subject_index):
-                    continue
-                if int(row.get("visit_index")) != int(visit_index):
-                    continue
-                if int(row.get("group_index")) != int(group_index):
-                    continue
-                if int(row.get("form_version")) != int(form_version):
-                    continue
-            except Exception:
-                continue
-
-            out.append(row)
+        with self._shared_lock(p):
+            for ref in self._read_slot_refs(p, slot):
+                row = self._load_slot_row(p, ref, study_id, slot)
+                if row:
+                    out.append(row)
 
         out.sort(key=self._entry_sort_key)
         return out
@@ -1562,17 +2043,59 @@ class DataladStudyRepo:
         group_index: int,
         form_version: int,
     ) -> Optional[Dict[str, Any]]:
-        rows = self.find_entries_for_slot(
-            study_id=study_id,
-            study_name=study_name,
-            subject_index=subject_index,
-            visit_index=visit_index,
-            group_index=group_index,
-            form_version=form_version,
-        )
-        return rows[-1] if rows else None
+        p = self.paths(study_id, study_name)
+        slot = (int(subject_index), int(visit_index), int(group_index), int(form_version))
+        if not self._ensure_slot_index_for_read(p):
+            return None
+
+        with self._shared_lock(p):
+            return self._latest_slot_row(p, study_id, slot)
+
+    def _latest_slot_row(self, p: StudyPaths, study_id: int, slot: tuple) -> Optional[Dict[str, Any]]:
+        for ref in reversed(self._read_slot_refs(p, slot)):
+            row = self._load_slot_row(p, ref, study_id, slot)
+            if row:
+                return row
+        return None
+
+    def get_slot_revision_token(
+        self,
+        *,
+        study_id: int,
+        study_name: str,
+        subject_index: int,
+        visit_index: int,
+        group_index: int,
+        form_version: int,
+    ) -> str:
+        """Revision token of the slot's latest entry, read from the slot index when stamped."""
+        p = self.paths(study_id, study_name)
+        slot = (int(subject_index), int(visit_index), int(group_index), int(form_version))
+        if not self._ensure_slot_index_for_read(p):
+            return self.compute_entry_revision_token(None)
+
+        with self._shared_lock(p):
+            return self._slot_revision_token(p, study_id, slot)
+
+    def _slot_revision_token(self, p: StudyPaths, study_id: int, slot: tuple) -> str:
+        # Callers hold the dataset lock with the slot index in place.
+        for ref in reversed(self._read_slot_refs(p, slot)):
+            token = ref.get("revision_token")
+            if token and (p.dataset_path / str(ref.get("path") or "")).is_file():
+                return str(token)
+            row = self._load_slot_row(p, ref, study_id, slot)
+            if row:
+                return self.compute_entry_revision_token(row)
+        return self.compute_entry_revision_token(None)
 
     def compute_entry_revision_token(self, entry: Optional[Dict[str, Any]]) -> str:
+        # Entries written since tokens are stamped carry their own; older
+        # entries are hashed on demand.
+        if entry and entry.get("revision_token"):
+            return str(entry["revision_token"])
+        return self._hash_entry_revision(entry)
+
+    def _hash_entry_revision(self, entry: Optional[Dict[str, Any]]) -> str:
         if not entry:
             payload = {
                 "empty": True,
@@ -1604,17 +2127,15 @@ class DataladStudyRepo:
         group_index: int,
         form_version: int,
     ) -> Dict[str, Any]:
-        latest = self.get_latest_entry_for_slot(
-            study_id=study_id,
-            study_name=study_name,
-            subject_index=subject_index,
-            visit_index=visit_index,
-            group_index=group_index,
-            form_version=form_version,
-        )
+        p = self.paths(study_id, study_name)
+        slot = (int(subject_index), int(visit_index), int(group_index), int(form_version))
+        latest = None
+        if self._ensure_slot_index_for_read(p):
+            with self._shared_lock(p):
+                latest = self._latest_slot_row(p, study_id, slot)
 
         labels = self._resolve_subject_visit_group_labels(
-            self.paths(study_id, study_name),
+            p,
             subject_index=subject_index,
             visit_index=visit_index,
             group_index=group_index,
@@ -1663,8 +2184,8 @@ class DataladStudyRepo:
         group_index: int,
         form_version: int,
         expected_revision_token: Optional[str],
-    ) -> Dict[str, Any]:
-        latest_state = self.get_current_slot_state(
+    ) -> str:
+        current_token = self.get_slot_revision_token(
             study_id=study_id,
             study_name=study_name,
             subject_index=subject_index,
@@ -1672,14 +2193,12 @@ class DataladStudyRepo:
             group_index=group_index,
             form_version=form_version,
         )
-
-        current_token = str(latest_state.get("revision_token") or "")
         expected_token = str(expected_revision_token or "")
 
         if expected_token != current_token:
             raise ValueError("Slot state changed")
 
-        return latest_state
+        return current_token
 
     def version_has_entries(self, study_id: int, study_name: str, version: int) -> bool:
         p = self.paths(study_id, study_name)
@@ -1690,40 +2209,512 @@ class DataladStudyRepo:
             return True
         return False
 
-    def list_latest_entries_by_slot(self, study_id: int, study_name: str) -> List[Dict[str, Any]]:
-        rows = self.list_entries(study_id, study_name)
-        latest_by_slot: Dict[tuple, Dict[str, Any]] = {}
+    # ------------------------------------------------------------------
+    # slot index
+    # ------------------------------------------------------------------
+    #
+    # Sidecar index under <dataset>/.casee/slots/ with one small JSON file per
+    # (subject, visit, group, form_version) slot listing its entry ids, their
+    # logical paths and the latest revision. It is derived data: it is kept out
+    # of git, updated by every entry write under its slot lock and can be
+    # rebuilt from canonical/entries at any time. index_meta.json records the
+    # HEAD commit it matches, so entries brought in by a pull, merge or
+    # restore trigger a rebuild.
+
+    def _index_dir(self, p: StudyPaths) -> Path:
+        return p.dataset_path / ".casee"
+
+    def _slot_index_dir(self, p: StudyPaths) -> Path:
+        return self._index_dir(p) / "slots"
+
+    def _slot_index_meta_path(self, p: StudyPaths) -> Path:
+        return _slot_index_meta_file(p.dataset_path)
+
+    def _slot_key(self, row: Dict[str, Any]) -> Optional[tuple]:
+        try:
+            return (
+                int(row.get("subject_index")),
+                int(row.get("visit_index")),
+                int(row.get("group_index")),
+                int(row.get("form_version")),
+            )
+        except Exception:
+            return None
+
+    def _slot_index_path(self, p: StudyPaths, slot: tuple) -> Path:
+        subject_index, visit_index, group_index, form_version = slot
+        return (
+            self._slot_index_dir(p)
+            / f"v{int(form_version):03d}"
+            / f"slot_{int(subject_index):05d}_{int(visit_index):05d}_{int(group_index):05d}.json"
+        )
+
+    def _slot_ref(self, p: StudyPaths, entry: Dict[str, Any], path: Path) -> Dict[str, Any]:
+        return {
+            "id": int(entry.get("id") or 0),
+            "path": self._logical_path(p.dataset_path, path),
+            "created_at": entry.get("created_at"),
+            "updated_at": entry.get("updated_at"),
+            "revision_token": entry.get("revision_token"),
+        }
 
-        for row in rows:
+    def _read_slot_index(self, p: StudyPaths, slot: tuple) -> Dict[str, Any]:
+        return _json_load(self._slot_index_path(p, slot), {}) or {}
+
+    def _write_slot_index(self, p: StudyPaths, slot: tuple, refs: List[Dict[str, Any]]) -> None:
+        path = self._slot_index_path(p, slot)
+        if not refs:
             try:
-                key = (
-                    int(row.get("subject_index")),
-                    int(row.get("visit_index")),
-                    int(row.get("group_index")),
-                    int(row.get("form_version")),
-                )
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            return
+
+        subject_index, visit_index, group_index, form_version = slot
+        refs = sorted(refs, key=self._entry_sort_key)
+        _json_dump_atomic(path, {
+            "subject_index": subject_index,
+            "visit_index": visit_index,
+            "group_index": group_index,
+            "form_version": form_version,
+            "entry_ids": [ref["id"] for ref in refs],
+            "entries": refs,
+            "latest": refs[-1],
+        })
+
+    def _rebuild_slot_index(self, p: StudyPaths) -> int:
+        slots: Dict[tuple, List[Dict[str, Any]]] = {}
+        heads: Dict[tuple, Dict[str, Any]] = {}
+        catalog_rows: List[Dict[str, Any]] = []
+        max_entry_id = 0
+        paths = list(p.entries_dir.rglob("entry_*.json"))
+        for f, row in iter_json_files(paths, loader=get_entry_cache().load):
+            key = self._slot_key(row)
+            if key is None:
+                continue
+            ref = self._slot_ref(p, row, f)
+            max_entry_id = max(max_entry_id, ref["id"])
+            slots.setdefault(key, []).append(ref)
+            catalog_rows.append(catalog_row(row, ref["path"]))
+            prev = heads.get(key)
+            if prev is None or self._entry_sort_key(ref) > self._entry_sort_key(prev):
+                heads[key] = ref
+
+        index_dir = self._slot_index_dir(p)
+        stale = set(index_dir.rglob("slot_*.json")) if index_dir.exists() else set()
+        for key, refs in slots.items():
+            path = self._slot_index_path(p, key)
+            stale.discard(path)
+            self._write_slot_index(p, key, refs)
+        for path in stale:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+        EntryCatalog.build(
+            self._entry_catalog_path(p),
+            catalog_rows,
+            [ref["id"] for ref in heads.values()],
+        )
+        self._reseed_counter(p, "entry_id", max_entry_id)
+        _json_dump_atomic(self._slot_index_meta_path(p), {
+            "format": 2,
+            "rebuilt_at": local_now().isoformat(),
+            "slot_count": len(slots),
+            "git_head": read_head(p.dataset_path),
+        })
+        logger.info(
+            "[DataladStudyRepo._rebuild_slot_index] Rebuilt slot index dataset_path=%s slots=%s",
+            p.dataset_path,
+            len(slots),
+        )
+        return len(slots)
+
+    def _slot_index_meta(self, p: StudyPaths) -> Optional[Dict[str, Any]]:
+        if not self._entry_catalog_path(p).exists():
+            return None
+        meta = _json_load(self._slot_index_meta_path(p))
+        return meta if isinstance(meta, dict) else None
+
+    def _slot_index_ready(self, p: StudyPaths) -> bool:
+        # The index matches the commit recorded in index_meta.json; a pull,
+        # merge or restore moves HEAD and sends the next caller through
+        # _ensure_slot_index.
+        meta = self._slot_index_meta(p)
+        return meta is not None and meta.get("git_head") == read_head(p.dataset_path)
+
+    def _ensure_slot_index(self, p: StudyPaths) -> None:
+        # Caller must hold the dataset lock.
+        meta = self._slot_index_meta(p)
+        if meta is None:
+            self._rebuild_slot_index(p)
+            return
+        head = read_head(p.dataset_path)
+        if meta.get("git_head") == head:
+            return
+        if self._entry_commits_indexed(p, meta.get("git_head"), head):
+            # Only our own saves were committed since; the index already has them.
+            meta["git_head"] = head
+            _json_dump_atomic(self._slot_index_meta_path(p), meta)
+            return
+        logger.info(
+            "[DataladStudyRepo._ensure_slot_index] Entries changed outside the repo; rebuilding dataset_path=%s old_head=%s head=%s",
+            p.dataset_path,
+            meta.get("git_head"),
+            head,
+        )
+        self._rebuild_slot_index(p)
+
+    def _entry_commits_indexed(self, p: StudyPaths, old_head: Optional[str], head: Optional[str]) -> bool:
+        """Whether every entry file changed between two commits is already in the catalog as on disk."""
+        if not old_head or not head:
+            return False
+        try:
+            changed = _run_git(
+                p.dataset_path,
+                ["diff", "--name-only", "--no-renames", old_head, head, "--",
+                 self._logical_path(p.dataset_path, p.entries_dir)],
+            ).splitlines()
+        except Exception:
+            # Unknown old commit (history rewritten, dataset replaced).
+            return False
+
+        catalog = EntryCatalog(self._entry_catalog_path(p))
+        for rel in changed:
+            m = re.match(r"entry_(\d+)\.json$", Path(rel).name)
+            if not m:
+                continue
+            ref = catalog.get(int(m.group(1)))
+            path = p.dataset_path / rel
+            if not path.is_file():
+                if ref and ref["path"] == rel:
+                    return False
+                continue
+            row = _json_load(path, {}) or {}
+            if not ref or ref["path"] != rel or ref["updated_at"] != str(row.get("updated_at") or ""):
+                return False
+        return True
+
+    def _slot_index_add(self, p: StudyPaths, entry: Dict[str, Any], path: Path) -> None:
+        key = self._slot_key(entry)
+        if key is None:
+            return
+        entry_id = int(entry.get("id") or 0)
+        refs = [
+            ref for ref in (self._read_slot_index(p, key).get("entries") or [])
+            if int(ref.get("id") or 0) != entry_id
+        ]
+        refs.append(self._slot_ref(p, entry, path))
+        self._write_slot_index(p, key, refs)
+
+    def _slot_index_remove(self, p: StudyPaths, entry: Dict[str, Any]) -> None:
+        key = self._slot_key(entry)
+        if key is None:
+            return
+        entry_id = int(entry.get("id") or 0)
+        refs = [
+            ref for ref in (self._read_slot_index(p, key).get("entries") or [])
+            if int(ref.get("id") or 0) != entry_id
+        ]
+        self._write_slot_index(p, key, refs)
+
+    def _ensure_slot_index_for_read(self, p: StudyPaths) -> bool:
+        # Read paths run without the dataset lock; only take it when the
+        # index has to be built. Returns False for datasets without entries.
+        if self._slot_index_ready(p):
+            return True
+        if not p.entries_dir.exists():
+            return False
+        with dataset_lock(LockSpec(dataset_path=p.dataset_path)):
+            self._ensure_slot_index(p)
+        return True
+
+    def _read_slot_refs(self, p: StudyPaths, slot: tuple) -> List[Dict[str, Any]]:
+        return list(self._read_slot_index(p, slot).get("entries") or [])
+
+    def _load_slot_row(self, p: StudyPaths, ref: Dict[str, Any], study_id: int, slot: tuple) -> Optional[Dict[str, Any]]:
+        rel = str(ref.get("path") or "")
+        if not rel:
+            return None
+        row = get_entry_cache().load(p.dataset_path / rel)
+        if not row or self._slot_key(row) != slot:
+            return None
+        try:
+            if int(row.get("study_id")) != int(study_id):
+                return None
+        except Exception:
+            return None
+        return dict(row)
+
+    def rebuild_slot_index(self, study_id: int, study_name: str) -> Dict[str, Any]:
+        p = self.paths(study_id, study_name)
+        with dataset_lock(LockSpec(dataset_path=p.dataset_path)):
+            slot_count = self._rebuild_slot_index(p)
+        return {"slot_count": slot_count}
+
+    # ------------------------------------------------------------------
+    # latest-per-slot heads
+    # ------------------------------------------------------------------
+    #
+    # The head of a slot is the ``latest`` ref of its slot index file, so an
+    # entry write only rewrites the index files of the slots it touched. The
+    # catalog's head flag is reset from these pointers for the same slots.
+
+    def _slot_heads(self, p: StudyPaths, slots: List[Optional[tuple]]) -> Dict[tuple, Optional[int]]:
+        # Caller holds the write lock of these slots (or the dataset lock
+        # exclusively) and has updated their slot index files.
+        heads: Dict[tuple, Optional[int]] = {}
+        for slot in slots:
+            if slot is None or slot in heads:
+                continue
+            latest = self._read_slot_index(p, slot).get("latest") or {}
+            heads[slot] = int(latest.get("id") or 0) or None
+        return heads
+
+    # ------------------------------------------------------------------
+    # entry catalog
+    # ------------------------------------------------------------------
+    #
+    # SQLite table of every entry revision (slot, progress status, timestamps,
+    # logical path, head flag) at <dataset>/.casee/entries.sqlite. It backs the
+    # filtered, keyset-paginated entry listing so a page only opens the entry
+    # files it returns. Head flags follow the slot index's latest pointers;
+    # the catalog is rebuilt with the slot index.
+
+    def _entry_catalog_path(self, p: StudyPaths) -> Path:
+        return self._index_dir(p) / "entries.sqlite"
+
+    def _catalog_apply(
+        self,
+        p: StudyPaths,
+        rows: List[Dict[str, Any]],
+        slots: List[Optional[tuple]],
+    ) -> None:
+        # Caller holds the dataset lock exclusively, or shared plus _meta_lock,
+        # and has updated the slot index files of ``slots``.
+        EntryCatalog(self._entry_catalog_path(p)).apply(rows, self._slot_heads(p, slots))
+
+    def _catalog_entry_path(self, p: StudyPaths, entry_id: int) -> Optional[Path]:
+        ref = EntryCatalog(self._entry_catalog_path(p)).get(entry_id)
+        if not ref:
+            return None
+        path = p.dataset_path / str(ref["path"])
+        return path if path.is_file() else None
+
+    def get_entry(self, study_id: int, study_name: str, entry_id: int) -> Optional[Dict[str, Any]]:
+        """Current revision of one entry, located through the catalog."""
+        p = self.paths(study_id, study_name)
+        if not self._ensure_slot_index_for_read(p):
+            return None
+        with self._shared_lock(p):
+            path = self._catalog_entry_path(p, entry_id)
+            row = get_entry_cache().load(path) if path is not None else None
+        if not row:
+            return None
+        try:
+            if int(row.get("study_id")) != int(study_id) or int(row.get("id")) != int(entry_id):
+                return None
+        except Exception:
+            return None
+        return dict(row)
+
+    def query_entries(
+        self,
+        study_id: int,
+        study_name: str,
+        *,
+        subject_indexes: Optional[List[int]] = None,
+        visit_indexes: Optional[List[int]] = None,
+        group_indexes: Optional[List[int]] = None,
+        form_versions: Optional[List[int]] = None,
+        progress_statuses: Optional[List[str]] = None,
+        updated_from: Optional[str] = None,
+        updated_to: Optional[str] = None,
+        current_only: bool = False,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        with_total: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Filtered entry listing ordered by (updated_at, id).
+
+        With ``limit`` the result is one page and ``next_cursor`` is set while
+        more rows follow; pass it back as ``cursor`` to continue. ``total`` is
+        None when ``with_total`` is False. Raises ValueError for a malformed
+        cursor.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        p = self.paths(study_id, study_name)
+        if not self._ensure_slot_index_for_read(p):
+            return {"total": 0, "entries": [], "next_cursor": None}
+
+        q = EntryQuery(
+            subject_indexes=list(subject_indexes or []),
+            visit_indexes=list(visit_indexes or []),
+            group_indexes=list(group_indexes or []),
+            form_versions=list(form_versions or []),
+            progress_statuses=list(progress_statuses or []),
+            updated_from=updated_from,
+            updated_to=updated_to,
+            current_only=bool(current_only),
+        )
+        refs, total = EntryCatalog(self._entry_catalog_path(p)).query(
+            q,
+            after=after,
+            limit=(int(limit) + 1) if limit is not None else None,
+            with_total=with_total,
+        )
+
+        next_cursor = None
+        if limit is not None and len(refs) > int(limit):
+            refs = refs[: int(limit)]
+            next_cursor = encode_cursor(refs[-1]["updated_at"], refs[-1]["id"])
+
+        paths = [p.dataset_path / str(ref["path"]) for ref in refs]
+        entries: List[Dict[str, Any]] = []
+        for _path, row in iter_json_files(paths, loader=get_entry_cache().load):
+            try:
+                if int(row.get("study_id")) != int(study_id):
+                    continue
             except Exception:
                 continue
+            entries.append(dict(row))
 
-            prev = latest_by_slot.get(key)
-            if prev is None or self._entry_sort_key(row) > self._entry_sort_key(prev):
-                latest_by_slot[key] = row
+        return {"total": total if with_total else None, "entries": entries, "next_cursor": next_cursor}
 
-        out = list(latest_by_slot.values())
-        out.sort(key=self._entry_sort_key)
-        return out
+    def iter_query_entries(
+        self,
+        study_id: int,
+        study_name: str,
+        *,
+        batch_size: int = 500,
+        **filters: Any,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield every entry matching ``filters`` (see query_entries), one catalog page at a time."""
+        cursor: Optional[str] = None
+        while True:
+            page = self.query_entries(
+                study_id,
+                study_name,
+                cursor=cursor,
+                limit=batch_size,
+                with_total=False,
+                **filters,
+            )
+            yield from page["entries"]
+            cursor = page["next_cursor"]
+            if not cursor:
+                return
+
+    # ------------------------------------------------------------------
+    # bulk import checkpoints
+    # ------------------------------------------------------------------
+
+    def import_checkpoint_path(self, study_id: int, study_name: str, import_id: str) -> Path:
+        """Checkpoint location for a server-side import, next to the dataset's derived indexes."""
+        name = "".join(c if c.isalnum() or c in "-_" else "_" for c in str(import_id))[:100]
+        if not name:
+            raise ValueError("import_id must not be empty")
+        return self._index_dir(self.paths(study_id, study_name)) / "imports" / f"{name}.json"
+
+    def read_import_checkpoint(self, path: Path) -> Dict[str, Any]:
+        return _json_load(Path(path), {}) or {}
+
+    def write_import_checkpoint(self, path: Path, state: Dict[str, Any]) -> None:
+        _json_dump_atomic(Path(path), state, fsync=True)
+
+    # ------------------------------------------------------------------
+    # id counters
+    # ------------------------------------------------------------------
+    #
+    # <dataset>/.casee/counters.json holds the last allocated id per kind so
+    # that allocation does not glob the dataset. A missing or unreadable
+    # counter is seeded from a one-off scan; a counter that fell behind the
+    # files on disk (restored dataset, external writer) is pushed forward by
+    # the slot index rebuild and by the ``taken`` / ``floor`` probes.
+
+    def _counters_path(self, p: StudyPaths) -> Path:
+        return self._index_dir(p) / "counters.json"
+
+    def _allocate_id(
+        self,
+        p: StudyPaths,
+        name: str,
+        *,
+        scan: Callable[[], int],
+        taken: Optional[Callable[[int], bool]] = None,
+        floor: Optional[Callable[[], int]] = None,
+        count: int = 1,
+    ) -> int:
+        path = self._counters_path(p)
+        counters = _json_load(path, {}) or {}
+        try:
+            last = int(counters[name])
+        except Exception:
+            last = scan()
+            logger.info(
+                "[DataladStudyRepo._allocate_id] Seeded counter from scan dataset_path=%s name=%s last=%s",
+                p.dataset_path,
+                name,
+                last,
+            )
+
+        if taken is not None and taken(last + 1):
+            last = max(last, scan())
+            logger.warning(
+                "[DataladStudyRepo._allocate_id] Counter was behind; reseeded dataset_path=%s name=%s last=%s",
+                p.dataset_path,
+                name,
+                last,
+            )
+
+        observed = floor() if floor is not None else 0
+        if observed > last:
+            logger.warning(
+                "[DataladStudyRepo._allocate_id] Counter was behind the index; reseeded dataset_path=%s name=%s last=%s observed=%s",
+                p.dataset_path,
+                name,
+                last,
+                observed,
+            )
+            last = observed
+
+        counters[name] = last + max(1, int(count))
+        _json_dump_atomic(path, counters, fsync=True)
+        return last + 1
+
+    def _reseed_counter(self, p: StudyPaths, name: str, observed_max: int) -> None:
+        path = self._counters_path(p)
+        counters = _json_load(path, {}) or {}
+        try:
+            last = int(counters[name])
+        except Exception:
+            last = 0
+        if observed_max > last:
+            counters[name] = int(observed_max)
+            _json_dump_atomic(path, counters, fsync=True)
 
     # ------------------------------------------------------------------
     # files
     # ------------------------------------------------------------------
 
-    def _next_file_id(self, p: StudyPaths) -> int:
+    def _scan_max_file_id(self, p: StudyPaths) -> int:
         max_id = 0
         for f in p.files_dir.glob("file_*.json"):
             m = re.match(r"file_(\d+)\.json$", f.name)
             if m:
                 max_id = max(max_id, int(m.group(1)))
-        return max_id + 1
+        return max_id
+
+    def _next_file_id(self, p: StudyPaths) -> int:
+        # Caller must hold the dataset lock.
+        return self._allocate_id(
+            p,
+            "file_id",
+            scan=lambda: self._scan_max_file_id(p),
+            taken=lambda file_id: (p.files_dir / f"file_{file_id:09d}.json").exists(),
+        )
 
     def save_uploaded_file(
         self,
@@ -2235,18 +3226,34 @@ class DataladStudyRepo:
         if subject_index is None:
             return None
 
-        study_data = self._load_study_content_data(p)
-        subject_label = self._resolve_subject_label(study_data, subject_index)
+        subject_label = self._subject_label(p, subject_index)
         subdir = p.audit_subject_dir / f"subject_{int(subject_index):05d}_{subject_label}"
         subdir.mkdir(parents=True, exist_ok=True)
         return subdir
 
-    def _write_diff_blob(self, scope_dir: Path, event_id: str, diff_obj: Any) -> str:
-        diffs_dir = scope_dir / "diffs"
-        diffs_dir.mkdir(parents=True, exist_ok=True)
-        diff_file = diffs_dir / f"{event_id}.json"
-        _json_dump(diff_file, diff_obj)
-        return str(diff_file.relative_to(self.paths_from_scope_dir(scope_dir).canonical_dir))
+    # Diff payloads are content-addressed blobs under canonical/audit/blobs/
+    # (see datalad_audit_blobs). <dataset>/.casee/audit_blob_heads.json
+    # remembers the last blob per kind as the base for the next delta; losing
+    # it only means the next blob is stored in full.
+
+    def _audit_blob_heads_path(self, p: StudyPaths) -> Path:
+        return self._index_dir(p) / "audit_blob_heads.json"
+
+    def _write_diff_blob(self, p: StudyPaths, diff_obj: Any) -> Tuple[str, str, bool]:
+        """Store a diff payload; returns (sha, canonical-relative path, whether a file was written)."""
+        heads_path = self._audit_blob_heads_path(p)
+        heads = _json_load(heads_path, {}) or {}
+        kind = blob_kind(diff_obj)
+        sha, rel, written = write_blob(
+            p.canonical_dir,
+            diff_obj,
+            base=heads.get(kind),
+            delta_min_bytes=int(getattr(self._cfg(), "audit_delta_min_bytes", 0) or 0),
+        )
+        if heads.get(kind) != sha:
+            heads[kind] = sha
+            _json_dump_atomic(heads_path, heads)
+        return sha, rel, written
 
     def paths_from_scope_dir(self, scope_dir: Path) -> StudyPaths:
         canonical_dir = scope_dir
@@ -2269,6 +3276,95 @@ class DataladStudyRepo:
             access_dir=canonical_dir / "access",
         )
 
+    # <dataset>/.casee/audit.sqlite maps each event id to its events.jsonl
+    # file, byte offset and length, so a single event is read with one seek
+    # instead of scanning every subject's log, and keeps per-log event counts,
+    # latest event and action counts for the audit overview. Written by
+    # _append_audit and caught up from the JSONL files on a lookup miss.
+
+    def _audit_index(self, p: StudyPaths) -> AuditIndex:
+        return AuditIndex(self._index_dir(p) / "audit.sqlite", p.canonical_dir)
+
+    def find_audit_event(self, study_id: int, study_name: str, event_id: str) -> Optional[Dict[str, Any]]:
+        p = self.paths(study_id, study_name)
+        if not p.audit_dir.exists():
+            return None
+        return self._audit_index(p).find(event_id)
+
+    def audit_summary(self, study_id: int, study_name: str, subject_limit: int = 100) -> Dict[str, Any]:
+        """Audit counts and the most recently active subjects, read from the index only."""
+        p = self.paths(study_id, study_name)
+        if not p.audit_dir.exists():
+            return {
+                "study_events_count": 0,
+                "subject_events_count": 0,
+                "subjects_count": 0,
+                "subjects": [],
+                "action_counts": {},
+            }
+        return self._audit_index(p).summary(
+            p.audit_system_study_dir / "events.jsonl",
+            p.audit_subject_dir,
+            subject_limit,
+        )
+
+    def query_audit_events(
+        self,
+        study_id: int,
+        study_name: str,
+        *,
+        actions: Optional[List[str]] = None,
+        user_ids: Optional[List[int]] = None,
+        actor: Optional[str] = None,
+        subject_indexes: Optional[List[int]] = None,
+        subject_from: Optional[int] = None,
+        subject_to: Optional[int] = None,
+        entry_ids: Optional[List[int]] = None,
+        time_from: Optional[str] = None,
+        time_to: Optional[str] = None,
+        ascending: bool = False,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        with_total: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Filtered audit events ordered by (timestamp, id), newest first unless
+        ``ascending``. Filters are answered by the audit index; only the
+        returned events are read from the logs. Paginate by passing
+        ``next_cursor`` back as ``cursor``. Raises ValueError for a malformed
+        cursor.
+        """
+        after = decode_audit_cursor(cursor) if cursor else None
+        p = self.paths(study_id, study_name)
+        if not p.audit_dir.exists():
+            return {"total": 0, "events": [], "next_cursor": None}
+
+        q = AuditQuery(
+            actions=list(actions or []),
+            user_ids=list(user_ids or []),
+            actor=actor,
+            subject_indexes=list(subject_indexes or []),
+            subject_from=subject_from,
+            subject_to=subject_to,
+            entry_ids=list(entry_ids or []),
+            time_from=time_from,
+            time_to=time_to,
+        )
+        index = self._audit_index(p)
+        refs, total = index.query(q, after=after, limit=int(limit) + 1, ascending=ascending, with_total=with_total)
+
+        next_cursor = None
+        if len(refs) > int(limit):
+            refs = refs[: int(limit)]
+            next_cursor = encode_audit_cursor(refs[-1]["at"], refs[-1]["id"])
+
+        events = [row for row in index.read_many(refs) if row is not None]
+        return {"total": total if with_total else None, "events": events, "next_cursor": next_cursor}
+
+    def rebuild_audit_index(self, study_id: int, study_name: str) -> Dict[str, Any]:
+        p = self.paths(study_id, study_name)
+        return {"event_count": self._audit_index(p).rebuild()}
+
     def _append_audit(
         self,
         p: StudyPaths,
@@ -2277,7 +3373,8 @@ class DataladStudyRepo:
         study_id: int,
         payload: Dict[str, Any],
         subject_index: Optional[int] = None,
-    ) -> None:
+    ) -> List[Path]:
+        """Append one audit event; returns the files written, for path-scoped saves."""
         now = local_now()
         ts = now.strftime("%Y%m%dT%H%M%S%f")
         scope = "subject" if subject_index is not None else "study"
@@ -2303,11 +3400,24 @@ class DataladStudyRepo:
         elif safe_payload.get("old_template_schema") is not None:
             diff_obj = {"old_template_schema": safe_payload.pop("old_template_schema")}
 
+        blob_paths: List[Path] = []
         diff_available = False
         diff_path = None
+        diff_sha = None
         if diff_obj is not None:
             diff_available = True
-            diff_path = self._write_diff_blob(scope_dir, event_id, diff_obj)
+            diff_sha, diff_path, diff_written = self._write_diff_blob(p, diff_obj)
+            if diff_written:
+                blob_paths.append(p.canonical_dir / diff_path)
+
+        # A snapshot that rides along with a diff_payload is a blob too, so the
+        # event line does not carry another full copy of the study.
+        for key in ("old_content", "old_template_schema"):
+            if safe_payload.get(key) is not None:
+                _sha, rel, snapshot_written = self._write_diff_blob(p, {key: safe_payload.pop(key)})
+                safe_payload[f"{key}_path"] = rel
+                if snapshot_written:
+                    blob_paths.append(p.canonical_dir / rel)
 
         body = {
             "id": event_id,
@@ -2318,9 +3428,46 @@ class DataladStudyRepo:
             "payload": safe_payload,
             "diff_available": diff_available,
             "diff_path": diff_path,
+            "diff_sha": diff_sha,
         }
 
-        _append_jsonl(scope_dir / "events.jsonl", body)
+        events_path = scope_dir / "events.jsonl"
+        written: List[Path] = []
+        segment = seal_if_due(
+            events_path,
+            max_bytes=int(getattr(self._cfg(), "audit_segment_max_bytes", 0) or 0),
+            now=now,
+        )
+        if segment is not None:
+            written.append(segment)
+            attributes = ensure_audit_gitattributes(p.audit_dir)
+            if attributes is not None:
+                written.append(attributes)
+            try:
+                self._audit_index(p).sealed(events_path, segment)
+            except Exception as e:
+                logger.warning(
+                    "[DataladStudyRepo._append_audit] Audit index not repointed to segment dataset_path=%s segment=%s error=%s",
+                    p.dataset_path,
+                    segment,
+                    e,
+                )
+
+        offset, length = _append_jsonl(events_path, body)
+        try:
+            self._audit_index(p).record(events_path, body, offset, length)
+        except Exception as e:
+            # Derived data: a lookup miss catches the index up from the JSONL.
+            logger.warning(
+                "[DataladStudyRepo._append_audit] Audit index update failed dataset_path=%s event_id=%s error=%s",
+                p.dataset_path,
+                event_id,
+                e,
+            )
+
+        written.append(events_path)
+        written.extend(blob_paths)
+        return written
 
     # ------------------------------------------------------------------
     # internal helpers
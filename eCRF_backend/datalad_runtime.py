@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import Optional, TYPE_CHECKING
 
 from .datalad_config import get_datalad_config, is_datalad_enabled
+from .datalad_push_scheduler import PushScheduler
 from .datalad_worker import DataladWorker
 from .logger import logger
 
@@ -11,11 +12,12 @@ if TYPE_CHECKING:
 
 
 _worker: Optional[DataladWorker] = None
+_push_scheduler: Optional[PushScheduler] = None
 _store: Optional["DataladStudyStore"] = None
 
 
 def init_datalad_runtime() -> None:
-    global _worker, _store
+    global _worker, _push_scheduler, _store
 
     if _store is not None:
         return
@@ -25,24 +27,39 @@ def init_datalad_runtime() -> None:
         logger.info("DataLad runtime disabled")
         return
 
-    _worker = DataladWorker(cfg, log=lambda s: logger.info(s))
-    _worker.start()
+    if cfg.push_on_save and cfg.ria_name:
+        _push_scheduler = PushScheduler(cfg, log=lambda s: logger.info(s))
+        _push_scheduler.start()
 
     # lazy import to avoid circular import:
     # bids_exporter -> versions -> datalad_repo -> datalad_runtime
+    from .datalad_repo import note_own_commit
     from .datalad_store import DataladStudyStore
 
+    _worker = DataladWorker(
+        cfg,
+        log=lambda s: logger.info(s),
+        push_scheduler=_push_scheduler,
+        on_commit=note_own_commit,
+    )
+    _worker.start()
+
     _store = DataladStudyStore(cfg, worker=_worker)
     logger.info("DataLad runtime initialized")
 
 
 def shutdown_datalad_runtime() -> None:
-    global _worker, _store
+    global _worker, _push_scheduler, _store
 
     if _worker is not None:
         _worker.stop()
+    if _push_scheduler is not None:
+        # Best effort: get pending saves onto the sibling before exiting.
+        _push_scheduler.flush(timeout_s=30.0)
+        _push_scheduler.stop()
 
     _worker = None
+    _push_scheduler = None
     _store = None
 
 
@@ -51,4 +68,8 @@ def get_datalad_store() -> Optional["DataladStudyStore"]:
 
 
 def get_datalad_worker() -> Optional[DataladWorker]:
-    return _worker
\ No newline at end of file
+    return _worker
+
+
+def get_push_scheduler() -> Optional[PushScheduler]:
+    return _push_scheduler
\ No newline at end of file
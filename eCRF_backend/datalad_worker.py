@@ -1,14 +1,20 @@
 # eCRF_backend/datalad_worker.py
 from __future__ import annotations
 
+import heapq
+import itertools
 import queue
 import threading
 import time
-from dataclasses import dataclass
+import zlib
+from collections import Counter, deque
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 
 from .datalad_config import DataladConfig
+from .datalad_git_commit import read_head, try_plumbing_commit
+from .datalad_push_scheduler import PushScheduler
 from .datalad_lock import dataset_lock, LockSpec
 
 try:
@@ -25,51 +31,266 @@ class DataladJob:
     to: Optional[str] = None
     attempt: int = 0
     max_attempts: int = 5
+    enqueued_at: float = field(default_factory=time.monotonic)
+    merged: int = 1
+    # Dataset-relative paths a save is limited to; None saves the whole dataset.
+    paths: Optional[List[str]] = None
+
+
+def _merge_save_paths(jobs: List[DataladJob]) -> Optional[List[str]]:
+    """Union of the jobs' save paths, or None if any job needs a full save."""
+    out = set()
+    for job in jobs:
+        if job.paths is None:
+            return None
+        out.update(job.paths)
+    return sorted(out)
+
+
+def _merge_save_messages(jobs: List[DataladJob]) -> str:
+    """One commit message for a group of saves: a summary line, then every original message."""
+    messages = [job.message or "case-e: save" for job in jobs]
+    if len(messages) == 1:
+        return messages[0]
+
+    ops = Counter()
+    for msg in messages:
+        first = msg.splitlines()[0] if msg else ""
+        if first.startswith("case-e: "):
+            first = first[len("case-e: "):]
+        ops[first.split(" ", 1)[0] or "save"] += 1
+    summary = ", ".join(f"{op} x{count}" for op, count in ops.most_common())
+    return f"case-e: batch of {len(messages)} saves ({summary})\n\n" + "\n".join(f"- {m}" for m in messages)
+
+
+class _Shard:
+    """One worker thread with its own queue; a dataset always maps to the same shard."""
+
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.q: "queue.Queue[DataladJob]" = queue.Queue()
+        # Jobs taken off the queue while collecting a group for another dataset.
+        self.pending: Deque[DataladJob] = deque()
+        # Failed jobs waiting for their backoff: (ready_at, seq, job).
+        self.retries: List[Tuple[float, int, DataladJob]] = []
+        self.thread: Optional[threading.Thread] = None
+        self.started_at = 0.0
+        self.busy_s = 0.0
+        self.jobs = 0
+        self.current: Optional[str] = None
+
+    def idle(self) -> bool:
+        return self.q.empty() and not self.pending and not self.retries
 
 
 class DataladWorker:
-    def __init__(self, cfg: DataladConfig, log: Callable[[str], None]) -> None:
+    """
+    Pool of ``cfg.workers`` threads. Jobs are sharded by dataset path, so
+    jobs for one dataset run in order on one thread while other datasets
+    proceed in parallel.
+    """
+
+    def __init__(
+        self,
+        cfg: DataladConfig,
+        log: Callable[[str], None],
+        push_scheduler: Optional[PushScheduler] = None,
+        on_commit: Optional[Callable[[Path, Optional[str], Optional[str]], None]] = None,
+    ) -> None:
         self.cfg = cfg
         self.log = log
-        self._q: "queue.Queue[DataladJob]" = queue.Queue()
+        self.push_scheduler = push_scheduler
+        # Called with (dataset, old HEAD, new HEAD) after a path-scoped save,
+        # still under the dataset lock.
+        self.on_commit = on_commit
+        self._shards = [_Shard(i) for i in range(max(1, int(getattr(cfg, "workers", 1))))]
         self._stop = threading.Event()
-        self._t: Optional[threading.Thread] = None
+        self._retry_seq = itertools.count()
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, Any] = {
+            "jobs": 0,
+            "commits": 0,
+            "max_batch": 0,
+            "last_batch": 0,
+            "latency_total_s": 0.0,
+            "latency_max_s": 0.0,
+            "retries": 0,
+            "failed": 0,
+        }
 
     def start(self) -> None:
-        if self._t and self._t.is_alive():
+        if any(s.thread and s.thread.is_alive() for s in self._shards):
             return
         self._stop.clear()
-        self._t = threading.Thread(target=self._run, name="datalad-worker", daemon=True)
-        self._t.start()
-        self.log("DataLad worker started")
+        for shard in self._shards:
+            shard.started_at = time.monotonic()
+            shard.busy_s = 0.0
+            shard.jobs = 0
+            shard.thread = threading.Thread(
+                target=self._run, args=(shard,), name=f"datalad-worker-{shard.index}", daemon=True
+            )
+            shard.thread.start()
+        self.log(f"DataLad worker pool started ({len(self._shards)} workers)")
 
     def stop(self, timeout_s: float = 5.0) -> None:
         self._stop.set()
-        if self._t:
-            self._t.join(timeout=timeout_s)
-        self.log("DataLad worker stopped")
+        deadline = time.monotonic() + timeout_s
+        for shard in self._shards:
+            if shard.thread:
+                shard.thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        self.log("DataLad worker pool stopped")
+
+    def join(self) -> None:
+        """Block until every enqueued job (including pending retries) has finished."""
+        for shard in self._shards:
+            shard.q.join()
+
+    def _shard_for(self, dataset_path: Path) -> _Shard:
+        # crc32 rather than hash(): stable across processes and PYTHONHASHSEED.
+        key = str(Path(dataset_path)).encode("utf-8")
+        return self._shards[zlib.crc32(key) % len(self._shards)]
 
     def enqueue(self, job: DataladJob) -> None:
-        self._q.put(job)
+        self._shard_for(job.dataset_path).q.put(job)
 
-    def enqueue_save(self, dataset_path: Path, message: str) -> None:
-        self.enqueue(DataladJob(dataset_path=Path(dataset_path), op="save", message=message))
+    def enqueue_save(self, dataset_path: Path, message: str, paths: Optional[List[str]] = None) -> None:
+        self.enqueue(
+            DataladJob(
+                dataset_path=Path(dataset_path),
+                op="save",
+                message=message,
+                paths=list(paths) if paths is not None else None,
+            )
+        )
 
     def enqueue_push(self, dataset_path: Path, to: str) -> None:
         self.enqueue(DataladJob(dataset_path=Path(dataset_path), op="push", to=to))
 
-    def _run(self) -> None:
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            out = dict(self._stats)
+        commits = out["commits"]
+        out["avg_batch"] = (out["jobs"] / commits) if commits else 0.0
+        out["avg_latency_s"] = (out["latency_total_s"] / out["jobs"]) if out["jobs"] else 0.0
+
+        now = time.monotonic()
+        workers = []
+        for shard in self._shards:
+            alive = bool(shard.thread and shard.thread.is_alive())
+            uptime = (now - shard.started_at) if shard.started_at else 0.0
+            workers.append({
+                "index": shard.index,
+                "alive": alive,
+                "queued": shard.q.qsize() + len(shard.pending),
+                "retrying": len(shard.retries),
+                "jobs": shard.jobs,
+                "busy_s": round(shard.busy_s, 3),
+                "utilization": round(shard.busy_s / uptime, 4) if uptime > 0 else 0.0,
+                "current": shard.current,
+            })
+        out["workers"] = workers
+        out["queued"] = sum(w["queued"] + w["retrying"] for w in workers)
+        return out
+
+    def _promote_retries(self, shard: _Shard) -> Optional[float]:
+        """Move due retries to ``pending``; return seconds until the next one is due."""
+        now = time.monotonic()
+        while shard.retries and (shard.retries[0][0] <= now or self._stop.is_set()):
+            shard.pending.append(heapq.heappop(shard.retries)[2])
+        return (shard.retries[0][0] - now) if shard.retries else None
+
+    def _next_job(self, shard: _Shard, timeout: float) -> DataladJob:
+        next_retry = self._promote_retries(shard)
+        if shard.pending:
+            return shard.pending.popleft()
+        if next_retry is not None:
+            timeout = min(timeout, max(next_retry, 0.0))
+        return shard.q.get(timeout=timeout)
+
+    def _collect_group(self, shard: _Shard, first: DataladJob) -> List[DataladJob]:
+        """
+        Group ``first`` with further saves for the same dataset: those already
+        waiting, plus any arriving until ``commit_window_s`` after ``first``
+        was enqueued, up to ``commit_max_batch`` jobs. Other jobs keep their
+        order in the shard's ``pending``.
+        """
+        group = [first]
+        if first.op != "save" or first.merged > 1:
+            return group
+        max_batch = max(1, int(getattr(self.cfg, "commit_max_batch", 1)))
+        window = float(getattr(self.cfg, "commit_window_s", 0.0))
+        key = Path(first.dataset_path)
+
+        skipped: Deque[DataladJob] = deque()
+        while shard.pending and len(group) < max_batch:
+            job = shard.pending.popleft()
+            if job.op == "save" and job.merged == 1 and Path(job.dataset_path) == key:
+                group.append(job)
+            else:
+                skipped.append(job)
+        skipped.extend(shard.pending)
+        shard.pending = skipped
+
+        deadline = first.enqueued_at + window
+        while len(group) < max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                job = shard.q.get(timeout=remaining) if remaining > 0 else shard.q.get_nowait()
+            except queue.Empty:
+                break
+            if job.op == "save" and job.merged == 1 and Path(job.dataset_path) == key:
+                group.append(job)
+            else:
+                shard.pending.append(job)
+        return group
+
+    def _record_group(self, group: List[DataladJob]) -> None:
+        # Latency is measured from enqueue to the end of the commit, per job.
+        now = time.monotonic()
+        jobs = sum(job.merged for job in group)
+        with self._stats_lock:
+            self._stats["jobs"] += jobs
+            self._stats["commits"] += 1
+            self._stats["last_batch"] = jobs
+            self._stats["max_batch"] = max(self._stats["max_batch"], jobs)
+            self._stats["latency_total_s"] += sum((now - job.enqueued_at) * job.merged for job in group)
+            self._stats["latency_max_s"] = max(
+                self._stats["latency_max_s"],
+                max(now - job.enqueued_at for job in group),
+            )
+
+    def _run(self, shard: _Shard) -> None:
         while True:
-            if self._stop.is_set() and self._q.empty():
+            if self._stop.is_set() and shard.idle():
                 break
 
             try:
-                job = self._q.get(timeout=0.5)
+                first = self._next_job(shard, timeout=0.5)
             except queue.Empty:
                 continue
 
+            group = self._collect_group(shard, first)
+            if len(group) == 1:
+                job = group[0]
+            else:
+                job = DataladJob(
+                    dataset_path=first.dataset_path,
+                    op="save",
+                    message=_merge_save_messages(group),
+                    enqueued_at=min(j.enqueued_at for j in group),
+                    merged=len(group),
+                    paths=_merge_save_paths(group),
+                )
+
+            shard.current = f"{job.op} {job.dataset_path}"
+            started = time.monotonic()
+            done = True
             try:
                 self._execute(job)
+                if job.op == "save":
+                    self._record_group(group)
+                if job.merged > 1:
+                    self.log(f"Group commit: {job.merged} saves for {job.dataset_path}")
             except Exception as e:
                 job.attempt += 1
                 if job.attempt < job.max_attempts and not self._stop.is_set():
@@ -77,14 +298,26 @@ class DataladWorker:
                     self.log(
                         f"Job failed ({job.op}) attempt={job.attempt}, retry in {backoff}s: {e}"
                     )
-                    time.sleep(backoff)
-                    self._q.put(job)
+                    # Re-enqueue after the backoff instead of sleeping, so the
+                    # shard keeps serving its other datasets meanwhile.
+                    heapq.heappush(shard.retries, (time.monotonic() + backoff, next(self._retry_seq), job))
+                    done = False
+                    with self._stats_lock:
+                        self._stats["retries"] += 1
                 else:
                     self.log(
                         f"Job permanently failed ({job.op}) after {job.attempt} attempts: {e}"
                     )
+                    with self._stats_lock:
+                        self._stats["failed"] += 1
             finally:
-                self._q.task_done()
+                shard.busy_s += time.monotonic() - started
+                shard.current = None
+                if done:
+                    shard.jobs += job.merged
+                    # A job stays unfinished for join() until its last attempt.
+                    for _ in range(job.merged):
+                        shard.q.task_done()
 
     def _set_repo_identity(self, ds) -> None:
         try:
@@ -123,11 +356,27 @@ class DataladWorker:
 
             if job.op == "save":
                 msg = job.message or "case-e: save"
-                ds.save(message=msg)
-                self.log(f"Saved dataset: {ds_path} msg={msg}")
+                head_before = read_head(ds_path)
+                if try_plumbing_commit(self.cfg, ds_path, job.paths, msg):
+                    backend = "git"
+                elif job.paths is None:
+                    ds.save(message=msg)
+                    backend = "datalad"
+                else:
+                    ds.save(path=job.paths, message=msg)
+                    backend = "datalad"
+                self.log(
+                    f"Saved dataset: {ds_path} msg={msg} "
+                    f"paths={len(job.paths) if job.paths is not None else 'all'} backend={backend}"
+                )
+                if job.paths is not None and self.on_commit is not None:
+                    self.on_commit(ds_path, head_before, read_head(ds_path))
 
                 if self.cfg.push_on_save and self.cfg.ria_name:
-                    self._push_dataset(ds, to=self.cfg.ria_name)
+                    if self.push_scheduler is not None:
+                        self.push_scheduler.mark_dirty(ds_path, to=self.cfg.ria_name)
+                    else:
+                        self._push_dataset(ds, to=self.cfg.ria_name)
 
             elif job.op == "push":
                 if not job.to:
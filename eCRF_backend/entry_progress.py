@@ -6,7 +6,7 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional, Set, Tuple
 
 
-def _field_keys(field: Dict[str, Any], index: int) -> List[str]:
+def field_keys(field: Dict[str, Any], index: int) -> List[str]:
     keys = [
         field.get("id"),
         field.get("_id"),
@@ -30,7 +30,7 @@ def _field_value(
     section_data = data.get(str(section.get("title") or ""))
     if not isinstance(section_data, dict):
         return None
-    for key in _field_keys(field, field_index):
+    for key in field_keys(field, field_index):
         if key in section_data:
             return section_data[key]
     return None
@@ -78,7 +78,7 @@ def _calculated_target_ids(study_data: Dict[str, Any]) -> Set[str]:
 def _is_calculated(field: Dict[str, Any], calculated_targets: Set[str]) -> bool:
     if field.get("computed") or field.get("isCalculatedField"):
         return True
-    return any(key in calculated_targets for key in _field_keys(field, -1))
+    return any(key in calculated_targets for key in field_keys(field, -1))
 
 
 def _to_number(value: Any) -> Optional[float]:
@@ -199,7 +199,7 @@ def _build_field_context(
     for section_index, section in enumerate(selected_models):
         for field_index, field in enumerate(section.get("fields") or []):
             values[(section_index, field_index)] = _field_value(data, section, field, field_index)
-            for key in _field_keys(field, field_index):
+            for key in field_keys(field, field_index):
                 lookup.setdefault(key, (section_index, field_index, field))
     return lookup, values
 
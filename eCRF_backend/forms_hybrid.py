@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import io
 import json
 import os
 import secrets
@@ -10,7 +11,7 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, HTTPException, Depends, Query, UploadFile, File, Form, Body, Request, status
-from fastapi.responses import FileResponse, RedirectResponse
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse
 
 from sqlalchemy.orm import Session
 
@@ -21,6 +22,8 @@ from .datalad_repo import DataladStudyRepo, _deepcopy_json, local_now
 from .versions import VersionManager
 from .settings import get_settings
 from .entry_progress import calculate_overall_entry_progress
+from .utils import parse_int_csv, parse_str_csv, utc_iso
+from .datalad_bulk_import import DEFAULT_BATCH_SIZE, iter_import_rows, run_bulk_import, source_fingerprint
 
 router = APIRouter(prefix="/forms", tags=["forms"])
 repo = DataladStudyRepo()
@@ -1273,6 +1276,146 @@ def save_study_data(
         )
 
 
+@router.post("/studies/{study_id}/data/batch", response_model=schemas.StudyDataBatchSaveOut)
+def save_study_data_batch(
+    study_id: int,
+    payload: schemas.StudyDataBatchSave = Body(...),
+    version: Optional[int] = Query(None),
+    audit_label: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    Save many slots in one request: one dataset lock, one audit pass and one
+    DataLad save. Each item carries its own expected_revision_token; stale
+    items come back with status "conflict" and the latest slot state.
+    """
+    meta = db.query(models.StudyMetadata).filter(models.StudyMetadata.id == study_id).first()
+    if not meta:
+        raise HTTPException(status_code=404, detail="Study not found")
+
+    _assert_has_study_permission(db, meta, current_user, required="add_data")
+    _assert_not_locked_by_other(meta, current_user)
+
+    if (meta.status or "PUBLISHED").upper().strip() != "PUBLISHED":
+        raise HTTPException(status_code=400, detail="Data entry is only allowed for published studies")
+
+    form_version = _resolve_form_version_or_400(db, study_id, version)
+    content_row = _get_content_row_or_404(db, study_id)
+    study_data = content_row.study_data or {}
+    selected_models = study_data.get("selectedModels") or []
+
+    items = []
+    for item in payload.items:
+        flags = _flags_dict_to_list(item.skipped_required_flags, selected_models)
+        # Progress is computed here; the client's progress fields are ignored.
+        overall_progress = calculate_overall_entry_progress(
+            study_data=study_data,
+            data=item.data,
+            skipped_required_flags=flags,
+            visit_index=item.visit_index,
+            group_index=item.group_index,
+        )
+        items.append(
+            {
+                "subject_index": item.subject_index,
+                "visit_index": item.visit_index,
+                "group_index": item.group_index,
+                "form_version": form_version,
+                "data": item.data,
+                "skipped_required_flags": flags,
+                "progress_status": overall_progress["progress_status"],
+                "progress_percentage": overall_progress["progress_percentage"],
+                "progress_completed": overall_progress["progress_completed"],
+                "progress_total": overall_progress["progress_total"],
+                "progress_skipped": overall_progress["progress_skipped"],
+                "expected_revision_token": item.expected_revision_token,
+            }
+        )
+
+    result = repo.save_entries_batch(
+        study_id=study_id,
+        study_name=meta.study_name,
+        items=items,
+        actor=_actor_identifier(current_user),
+        actor_name=_display_name(current_user),
+        user_id=current_user.id,
+        audit_label=audit_label,
+        atomic=payload.atomic,
+    )
+
+    for row in result["results"]:
+        if row["status"] != "conflict":
+            continue
+        item = items[row["index"]]
+        row["latest"] = repo.get_current_slot_state(
+            study_id=study_id,
+            study_name=meta.study_name,
+            subject_index=item["subject_index"],
+            visit_index=item["visit_index"],
+            group_index=item["group_index"],
+            form_version=form_version,
+        )
+
+    return result
+
+
+@router.post("/studies/{study_id}/data/import")
+def import_study_data(
+    study_id: int,
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="csv or ndjson; defaults to the file extension"),
+    import_id: Optional[str] = Query(None, description="Resumable import id; rerun with the same file to continue"),
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=5000),
+    audit_label: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    Stream a CSV/NDJSON file of entries into the latest form version. Rows are
+    validated against the template, and each batch is committed with one
+    DataLad save. With import_id, a failed import can be resumed by uploading
+    the same file again.
+    """
+    meta = db.query(models.StudyMetadata).filter(models.StudyMetadata.id == study_id).first()
+    if not meta:
+        raise HTTPException(status_code=404, detail="Study not found")
+
+    _assert_has_study_permission(db, meta, current_user, required="add_data")
+    _assert_not_locked_by_other(meta, current_user)
+
+    if (meta.status or "PUBLISHED").upper().strip() != "PUBLISHED":
+        raise HTTPException(status_code=400, detail="Data entry is only allowed for published studies")
+
+    form_version = _resolve_form_version_or_400(db, study_id, None)
+    fmt = format or Path(file.filename or "").suffix
+
+    try:
+        checkpoint = repo.import_checkpoint_path(study_id, meta.study_name, import_id) if import_id else None
+        source = source_fingerprint(file.file) if import_id else None
+        lines = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+        summary = run_bulk_import(
+            repo,
+            study_id=study_id,
+            study_name=meta.study_name,
+            rows=iter_import_rows(lines, fmt),
+            form_version=form_version,
+            actor=_actor_identifier(current_user),
+            actor_name=_display_name(current_user),
+            user_id=current_user.id,
+            audit_label=audit_label,
+            batch_size=batch_size,
+            checkpoint_path=checkpoint,
+            source=source,
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"import_id": import_id, **summary}
+
+
 @router.put("/studies/{study_id}/data_entries/{entry_id}", response_model=schemas.StudyDataEntryOut)
 def update_study_data_entry(
     study_id: int,
@@ -1293,15 +1436,7 @@ def update_study_data_entry(
     if (meta.status or "PUBLISHED").upper().strip() != "PUBLISHED":
         raise HTTPException(status_code=400, detail="Data entry is only allowed for published studies")
 
-    target_entry = None
-    for e in repo.list_entries(study_id, meta.study_name):
-        try:
-            if int(e.get("id")) == int(entry_id):
-                target_entry = e
-                break
-        except Exception:
-            continue
-
+    target_entry = repo.get_entry(study_id, meta.study_name, entry_id)
     if not target_entry:
         raise HTTPException(status_code=404, detail="Entry not found")
 
@@ -1375,13 +1510,41 @@ def update_study_data_entry(
         )
 
 
+def _entry_query_filters(
+    *,
+    subject_indexes: Optional[str],
+    visit_indexes: Optional[str],
+    group_indexes: Optional[str],
+    form_versions: Optional[str],
+    progress_status: Optional[str],
+    updated_from: Optional[datetime],
+    updated_to: Optional[datetime],
+) -> Dict[str, Any]:
+    return {
+        "subject_indexes": parse_int_csv(subject_indexes),
+        "visit_indexes": parse_int_csv(visit_indexes),
+        "group_indexes": parse_int_csv(group_indexes),
+        "form_versions": parse_int_csv(form_versions),
+        "progress_statuses": parse_str_csv(progress_status),
+        "updated_from": utc_iso(updated_from),
+        "updated_to": utc_iso(updated_to),
+    }
+
+
 @router.get("/studies/{study_id}/data_entries", response_model=schemas.PaginatedStudyDataEntries)
 def list_study_data_entries(
     study_id: int,
     subject_indexes: Optional[str] = Query(None),
     visit_indexes: Optional[str] = Query(None),
+    group_indexes: Optional[str] = Query(None),
+    form_versions: Optional[str] = Query(None),
+    progress_status: Optional[str] = Query(None),
+    updated_from: Optional[datetime] = Query(None),
+    updated_to: Optional[datetime] = Query(None),
     all: bool = Query(False),
     current_only: bool = Query(False),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
     db: Session = Depends(get_db),
     user=Depends(get_current_user),
 ):
@@ -1391,20 +1554,79 @@ def list_study_data_entries(
 
     _assert_has_study_permission(db, meta, user, required="view")
 
-    entries = repo.list_latest_entries_by_slot(study_id, meta.study_name) if current_only else repo.list_entries(study_id, meta.study_name)
-
+    filters: Dict[str, Any] = {}
     if not all:
-        if subject_indexes:
-            subj_idx_list = [int(s) for s in subject_indexes.split(",") if s.strip().isdigit()]
-            if subj_idx_list:
-                entries = [e for e in entries if int(e.get("subject_index", -1)) in subj_idx_list]
+        filters = _entry_query_filters(
+            subject_indexes=subject_indexes,
+            visit_indexes=visit_indexes,
+            group_indexes=group_indexes,
+            form_versions=form_versions,
+            progress_status=progress_status,
+            updated_from=updated_from,
+            updated_to=updated_to,
+        )
+
+    try:
+        result = repo.query_entries(
+            study_id,
+            meta.study_name,
+            current_only=current_only,
+            cursor=cursor,
+            limit=limit,
+            **filters,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return result
+
+
+@router.get("/studies/{study_id}/data_entries/export")
+def export_study_data_entries(
+    study_id: int,
+    subject_indexes: Optional[str] = Query(None),
+    visit_indexes: Optional[str] = Query(None),
+    group_indexes: Optional[str] = Query(None),
+    form_versions: Optional[str] = Query(None),
+    progress_status: Optional[str] = Query(None),
+    updated_from: Optional[datetime] = Query(None),
+    updated_to: Optional[datetime] = Query(None),
+    latest_only: bool = Query(False),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """
+    Stream matching entries as newline-delimited JSON, one entry per line.
+    Entries are read page by page from the entry catalog, so memory use does
+    not grow with the study size.
+    """
+    meta = db.query(models.StudyMetadata).filter(models.StudyMetadata.id == study_id).first()
+    if not meta:
+        raise HTTPException(status_code=404, detail="Study not found")
 
-        if visit_indexes:
-            visit_idx_list = [int(s) for s in visit_indexes.split(",") if s.strip().isdigit()]
-            if visit_idx_list:
-                entries = [e for e in entries if int(e.get("visit_index", -1)) in visit_idx_list]
+    _assert_has_study_permission(db, meta, user, required="view")
 
-    return {"total": len(entries), "entries": entries}
+    filters = _entry_query_filters(
+        subject_indexes=subject_indexes,
+        visit_indexes=visit_indexes,
+        group_indexes=group_indexes,
+        form_versions=form_versions,
+        progress_status=progress_status,
+        updated_from=updated_from,
+        updated_to=updated_to,
+    )
+    study_name = meta.study_name
+
+    def _lines():
+        for row in repo.iter_query_entries(study_id, study_name, current_only=latest_only, **filters):
+            yield json.dumps(row, ensure_ascii=False, default=str) + "\n"
+
+    safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in study_name) or f"study_{study_id}"
+    return StreamingResponse(
+        _lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{safe_name}_entries.ndjson"'},
+    )
 
 
 @router.post("/studies/{study_id}/access", response_model=schemas.StudyAccessGrantOut, status_code=201)
@@ -318,6 +318,28 @@ class StudyDataConflictDetail(BaseModel):
     class Config:
         from_attributes = True
 
+
+class StudyDataBatchItem(StudyDataEntryCreate):
+    expected_revision_token: str
+
+
+class StudyDataBatchSave(BaseModel):
+    items: List[StudyDataBatchItem] = Field(..., min_length=1, max_length=500)
+    atomic: bool = False
+
+
+class StudyDataBatchItemResult(BaseModel):
+    index: int
+    status: Literal["saved", "conflict", "not_saved"]
+    entry: Optional[StudyDataEntryOut] = None
+    latest: Optional[StudyDataSlotStateOut] = None
+
+
+class StudyDataBatchSaveOut(BaseModel):
+    saved_count: int
+    conflict_count: int
+    results: List[StudyDataBatchItemResult]
+
 class StudyDataEntryUpdate(BaseModel):
     data: Optional[Dict[str, Any]] = None
     skipped_required_flags: Optional[List[List[bool]]] = None
@@ -326,6 +348,7 @@ class StudyDataEntryUpdate(BaseModel):
 class PaginatedStudyDataEntries(BaseModel):
     total: int
     entries: List[StudyDataEntryOut]
+    next_cursor: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,137 @@
+# scripts/bench_commit_backends.py
+"""
+Compare per-commit latency of ``datalad save(path=...)`` with the git
+plumbing backend for single-entry writes (one entry JSON plus the subject's
+audit JSONL, as save_entry produces).
+
+    python -m eCRF_backend.scripts.bench_commit_backends --commits 200 --prefill 20000
+
+Each backend gets a fresh text2git dataset under a temporary directory (or
+--root) prefilled with --prefill committed entries, so the status scan cost
+of a large dataset is included. The datalad backend is skipped when DataLad
+is not installed.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from eCRF_backend.datalad_git_commit import commit_paths
+
+try:
+    from datalad.api import Dataset  # type: ignore
+except Exception:  # pragma: no cover
+    Dataset = None  # type: ignore
+
+TEXT2GIT = "* annex.largefiles=((mimeencoding=binary)and(largerthan=0))\n"
+
+
+def _entry_rel(entry_id: int) -> str:
+    subject = entry_id % 500
+    return (
+        f"canonical/entries/v001/subject_{subject:05d}_S{subject:05d}"
+        f"/visit_00000_baseline/group_00000_control/entry_{entry_id:09d}.json"
+    )
+
+
+def _audit_rel(entry_id: int) -> str:
+    subject = entry_id % 500
+    return f"canonical/audit/subject/subject_{subject:05d}_S{subject:05d}/events.jsonl"
+
+
+def _write_entry(ds: Path, entry_id: int) -> List[str]:
+    entry_rel, audit_rel = _entry_rel(entry_id), _audit_rel(entry_id)
+    for rel in (entry_rel, audit_rel):
+        (ds / rel).parent.mkdir(parents=True, exist_ok=True)
+    (ds / entry_rel).write_text(
+        json.dumps({"id": entry_id, "data": {"Vitals": {"pulse": entry_id % 90}}}, indent=2),
+        encoding="utf-8",
+    )
+    with (ds / audit_rel).open("a", encoding="utf-8") as f:
+        f.write(json.dumps({"id": f"e{entry_id}", "action": "entry_upserted"}) + "\n")
+    return [entry_rel, audit_rel]
+
+
+def _create(ds: Path, prefill: int, use_datalad: bool) -> None:
+    if use_datalad:
+        Dataset(str(ds)).create(cfg_proc="text2git")
+    else:
+        ds.mkdir(parents=True)
+        subprocess.run(["git", "-C", str(ds), "init", "-q"], check=True)
+        (ds / ".gitattributes").write_text(TEXT2GIT, encoding="utf-8")
+    for entry_id in range(1, prefill + 1):
+        _write_entry(ds, entry_id)
+    subprocess.run(["git", "-C", str(ds), "add", "-A"], check=True)
+    subprocess.run(
+        ["git", "-C", str(ds), "-c", "user.name=bench", "-c", "user.email=bench@localhost",
+         "-c", "commit.gpgsign=false", "commit", "-qm", "prefill"],
+        check=True,
+    )
+
+
+def _bench(label: str, ds: Path, start_id: int, commits: int, commit: Callable[[List[str], str], None]) -> str:
+    latencies: List[float] = []
+    for entry_id in range(start_id, start_id + commits):
+        paths = _write_entry(ds, entry_id)
+        t0 = time.perf_counter()
+        commit(paths, f"case-e: upsert_entry study=1 entry={entry_id}")
+        latencies.append(time.perf_counter() - t0)
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    return (
+        f"  {label:<28} median {statistics.median(latencies) * 1000:8.1f} ms"
+        f"   p95 {p95 * 1000:8.1f} ms   {commits / sum(latencies):8.1f} commits/s"
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--commits", type=int, default=100)
+    ap.add_argument("--prefill", type=int, nargs="+", default=[1000, 20000])
+    ap.add_argument("--root", type=Path, default=None, help="Directory to create datasets in")
+    args = ap.parse_args()
+
+    if Dataset is None:
+        print("DataLad not installed: only the git plumbing backend is measured")
+
+    for prefill in args.prefill:
+        base = Path(tempfile.mkdtemp(prefix=f"casee_commit_bench_{prefill}_", dir=args.root))
+        results: List[str] = []
+        try:
+            if Dataset is not None:
+                ds_path = base / "datalad"
+                _create(ds_path, prefill, use_datalad=True)
+                ds = Dataset(str(ds_path))
+                results.append(_bench(
+                    "datalad save(path=...)",
+                    ds_path,
+                    prefill + 1,
+                    args.commits,
+                    lambda paths, msg: ds.save(path=paths, message=msg),
+                ))
+
+            git_path = base / "plumbing"
+            _create(git_path, prefill, use_datalad=Dataset is not None)
+            results.append(_bench(
+                "git plumbing",
+                git_path,
+                prefill + 1,
+                args.commits,
+                lambda paths, msg: commit_paths(git_path, paths, msg, name="bench", email="bench@localhost"),
+            ))
+
+            print(f"\n{prefill} prefilled entries, {args.commits} commits")
+            print("\n".join(results))
+        finally:
+            shutil.rmtree(base, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# scripts/bench_entry_loading.py
+"""
+Compare the serial entry loading loop with the bulk loader used by
+DataladStudyRepo full-study reads.
+
+    python -m eCRF_backend.scripts.bench_entry_loading --counts 10000 100000
+
+Entries are generated in the canonical/entries layout under a temporary
+directory (or --root). Use --root on the target filesystem (e.g. the NFS
+mount holding BIDS_ROOT) to measure I/O latency effects.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from eCRF_backend.datalad_bulk_load import iter_json_files, load_json_file, orjson
+from eCRF_backend.datalad_entry_cache import EntryCache
+
+
+def _generate(entries_dir: Path, count: int, fields: int) -> None:
+    rng = random.Random(count)
+    subjects = max(1, count // 20)
+    for entry_id in range(1, count + 1):
+        subject_index = rng.randrange(subjects)
+        visit_index = rng.randrange(5)
+        path = (
+            entries_dir
+            / "v001"
+            / f"subject_{subject_index:05d}_S{subject_index:05d}"
+            / f"visit_{visit_index:05d}_visit_{visit_index + 1:02d}"
+            / "group_00000_group_01"
+            / f"entry_{entry_id:09d}.json"
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "id": entry_id,
+            "study_id": 1,
+            "subject_index": subject_index,
+            "visit_index": visit_index,
+            "group_index": 0,
+            "form_version": 1,
+            "data": {
+                "Vitals": {f"field_{i}": rng.random() for i in range(fields)},
+                "Notes": {"text": "x" * rng.randrange(20, 200)},
+            },
+            "skipped_required_flags": [],
+            "created_at": "2026-01-01T00:00:00+00:00",
+            "updated_at": "2026-01-01T00:00:00+00:00",
+        }
+        path.write_text(json.dumps(entry, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def _serial_loop(entries_dir: Path) -> int:
+    count = 0
+    for f in sorted(entries_dir.rglob("entry_*.json")):
+        try:
+            row = json.loads(f.read_text(encoding="utf-8"))
+        except Exception:
+            continue
+        if row:
+            count += 1
+    return count
+
+
+def _bulk(entries_dir: Path, workers: int, loader: Callable) -> int:
+    paths = sorted(entries_dir.rglob("entry_*.json"))
+    return sum(1 for _ in iter_json_files(paths, loader=loader, workers=workers))
+
+
+def _timed(label: str, fn: Callable[[], int], results: List[str]) -> None:
+    start = time.perf_counter()
+    rows = fn()
+    elapsed = time.perf_counter() - start
+    results.append(f"  {label:<34} {elapsed:8.3f}s  {rows / elapsed if elapsed else 0:>10.0f} rows/s")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--counts", type=int, nargs="+", default=[10000, 100000])
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--fields", type=int, default=20, help="Fields per synthetic entry")
+    ap.add_argument("--root", type=Path, default=None, help="Directory to generate entries in")
+    args = ap.parse_args()
+
+    print(f"JSON decoder: {'orjson' if orjson is not None else 'json (stdlib)'}; workers={args.workers}")
+
+    for count in args.counts:
+        base = Path(tempfile.mkdtemp(prefix=f"casee_bench_{count}_", dir=args.root))
+        try:
+            entries_dir = base / "canonical" / "entries"
+            _generate(entries_dir, count, args.fields)
+
+            cache = EntryCache(max_bytes=1 << 34)
+            results: List[str] = []
+            _timed("serial open + json.loads", lambda: _serial_loop(entries_dir), results)
+            _timed("bulk loader (workers=1)", lambda: _bulk(entries_dir, 1, load_json_file), results)
+            _timed(f"bulk loader (workers={args.workers})", lambda: _bulk(entries_dir, args.workers, load_json_file), results)
+            _timed("bulk loader + cache, cold", lambda: _bulk(entries_dir, args.workers, cache.load), results)
+            _timed("bulk loader + cache, warm", lambda: _bulk(entries_dir, args.workers, cache.load), results)
+
+            print(f"\n{count} entries")
+            print("\n".join(results))
+        finally:
+            shutil.rmtree(base, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
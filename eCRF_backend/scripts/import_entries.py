@@ -0,0 +1,71 @@
+# scripts/import_entries.py
+"""
+Bulk import entries from CSV or NDJSON into a DataLad-primary study.
+
+    python -m eCRF_backend.scripts.import_entries --study-id 3 --input legacy.ndjson
+
+Rows go to the latest form version and are committed every --batch-size rows.
+Progress is recorded in --checkpoint (default: <input>.checkpoint.json);
+rerunning the same command after a failure continues after the last
+committed batch. A changed input file or form version is rejected. See eCRF_backend/datalad_bulk_import.py for the row format.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+from eCRF_backend import models
+from eCRF_backend.database import SessionLocal
+from eCRF_backend.datalad_bulk_import import DEFAULT_BATCH_SIZE, iter_import_rows, run_bulk_import, source_fingerprint
+from eCRF_backend.datalad_repo import DataladStudyRepo
+from eCRF_backend.versions import VersionManager
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--study-id", type=int, required=True)
+    ap.add_argument("--input", type=Path, required=True, help="CSV or NDJSON file")
+    ap.add_argument("--format", choices=["csv", "ndjson"], default=None, help="Defaults to the file extension")
+    ap.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    ap.add_argument("--checkpoint", type=Path, default=None)
+    ap.add_argument("--actor", default="bulk-import", help="Actor recorded in the audit trail")
+    ap.add_argument("--audit-label", default=None)
+    args = ap.parse_args()
+
+    db = SessionLocal()
+    try:
+        meta = db.query(models.StudyMetadata).filter(models.StudyMetadata.id == args.study_id).first()
+        if not meta:
+            raise SystemExit(f"Study not found: {args.study_id}")
+        form_version = VersionManager.assert_latest_is_used(db, args.study_id, None)
+        study_name = meta.study_name
+    finally:
+        db.close()
+
+    checkpoint = args.checkpoint or args.input.with_name(args.input.name + ".checkpoint.json")
+    fmt = args.format or args.input.suffix
+
+    with args.input.open("rb") as raw:
+        source = source_fingerprint(raw)
+
+    with args.input.open("r", encoding="utf-8", newline="") as fh:
+        summary = run_bulk_import(
+            DataladStudyRepo(),
+            study_id=args.study_id,
+            study_name=study_name,
+            rows=iter_import_rows(fh, fmt),
+            form_version=form_version,
+            actor=args.actor,
+            actor_name=args.actor,
+            audit_label=args.audit_label,
+            batch_size=args.batch_size,
+            checkpoint_path=checkpoint,
+            source=source,
+        )
+
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
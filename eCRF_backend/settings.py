@@ -88,6 +88,9 @@ class AppSettings:
 
     datalad_required_in_production: bool
     datalad_lock_timeout_seconds: float
+    datalad_lock_slow_seconds: float
+    entry_cache_max_bytes: int
+    entry_load_workers: int
 
     @property
     def is_production(self) -> bool:
@@ -174,6 +177,9 @@ def get_settings() -> AppSettings:
             os.getenv("ECRF_DATALAD_REQUIRED_IN_PRODUCTION"), default=True
         ),
         datalad_lock_timeout_seconds=float(os.getenv("ECRF_DATALAD_LOCK_TIMEOUT_SECONDS", "60")),
+        datalad_lock_slow_seconds=float(os.getenv("ECRF_DATALAD_LOCK_SLOW_SECONDS", "1.0")),
+        entry_cache_max_bytes=int(os.getenv("ECRF_ENTRY_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+        entry_load_workers=int(os.getenv("ECRF_ENTRY_LOAD_WORKERS", "8")),
     )
 
     settings.data_dir.mkdir(parents=True, exist_ok=True)
@@ -1,4 +1,29 @@
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import List, Optional
+
+
 def local_now():
     # Local system time with tzinfo
-    return datetime.now().astimezone()
\ No newline at end of file
+    return datetime.now().astimezone()
+
+
+def parse_int_csv(value: Optional[str]) -> List[int]:
+    # "1,2,x" query parameters; non-numeric items are ignored.
+    if not value:
+        return []
+    return [int(s) for s in value.split(",") if s.strip().isdigit()]
+
+
+def parse_str_csv(value: Optional[str]) -> List[str]:
+    if not value:
+        return []
+    return [s.strip() for s in value.split(",") if s.strip()]
+
+
+def utc_iso(value: Optional[datetime]) -> Optional[str]:
+    # Stored timestamps are UTC ISO strings; naive bounds are taken as UTC.
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
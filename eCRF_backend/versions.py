@@ -1081,10 +1081,11 @@ class VersionManager:
             return
 
         repo = DataladStudyRepo()
-        all_rows = repo.list_entries(study_id, meta.study_name)
 
         rows = []
-        for r in all_rows:
+        # Entry files are replaced atomically, so a concurrent slot write
+        # never drops an entry from the listing.
+        for r in repo.list_entries(study_id, meta.study_name):
             try:
                 if int(r.get("form_version") or 0) == int(from_version):
                     rows.append(r)
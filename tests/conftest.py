@@ -0,0 +1,66 @@
+import copy
+
+import pytest
+
+from eCRF_backend.datalad_repo import DataladStudyRepo
+
+
+STUDY_ID = 1
+STUDY_NAME = "Test study"
+
+STUDY_DATA = {
+    "subjects": [{"id": f"SUBJ-{i:03d}"} for i in range(1, 5)],
+    "visits": [{"name": "Baseline"}, {"name": "Week 4"}, {"name": "Week 8"}],
+    "groups": [{"name": "Control"}],
+    "selectedModels": [
+        {
+            "title": "Vitals",
+            "fields": [
+                {"id": "pulse", "label": "Pulse", "type": "number", "constraints": {"required": True}},
+                {"id": "note", "label": "Note", "type": "text"},
+            ],
+        }
+    ],
+    "assignments": [[[True], [True], [True]]],
+}
+
+
+def save_entry(repo, subject_index=0, visit_index=0, value=60, **kwargs):
+    """Save one Vitals entry in group 0 of form version 1 of the test study."""
+    return repo.save_entry(
+        study_id=STUDY_ID,
+        study_name=STUDY_NAME,
+        subject_index=subject_index,
+        visit_index=visit_index,
+        group_index=kwargs.pop("group_index", 0),
+        form_version=kwargs.pop("form_version", 1),
+        data=kwargs.pop("data", {"Vitals": {"pulse": value}}),
+        skipped_required_flags=kwargs.pop("skipped_required_flags", []),
+        actor=kwargs.pop("actor", "tester"),
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def bare_repo(tmp_path, monkeypatch):
+    """A repository without studies, DataLad off."""
+    monkeypatch.setenv("ECRF_DATALAD_MODE", "off")
+    return DataladStudyRepo(root=str(tmp_path))
+
+
+@pytest.fixture
+def study_data():
+    # Override in a test module to create the study with other data.
+    return copy.deepcopy(STUDY_DATA)
+
+
+@pytest.fixture
+def repo(bare_repo, study_data):
+    bare_repo.create_study(
+        study_id=STUDY_ID,
+        created_by=1,
+        study_name=STUDY_NAME,
+        study_description="",
+        study_data=study_data,
+    )
+    return bare_repo
@@ -0,0 +1,123 @@
+import json
+from dataclasses import replace
+
+import pytest
+
+from eCRF_backend import datalad_repo
+from eCRF_backend.datalad_audit_blobs import (
+    apply_patch,
+    blob_rel_path,
+    load_blob,
+    make_patch,
+    write_blob,
+)
+from eCRF_backend.datalad_config import get_datalad_config
+
+from conftest import STUDY_DATA as BASE_STUDY_DATA, STUDY_NAME
+
+
+@pytest.mark.parametrize(
+    "old,new",
+    [
+        ({"a": 1, "b": [1, 2, 3]}, {"a": 2, "b": [1, 2, 3], "c": None}),
+        ({"a/b": {"~x": 1}}, {"a/b": {"~x": 2}}),
+        ([1, 2, 3, 4, 5], [1, 9, 9, 5]),
+        ([{"id": 1}, {"id": 2}], [{"id": 0}, {"id": 1}, {"id": 2, "x": [1]}]),
+        ({"a": [1]}, {"a": {"b": 1}}),
+        ("x", {"y": 1}),
+    ],
+)
+def test_patch_round_trips(old, new):
+    assert apply_patch(old, make_patch(old, new)) == new
+
+
+def _schema(n_fields):
+    fields = [{"name": f"Field {i}", "type": "text"} for i in range(n_fields)]
+    return {"old_template_schema": {"forms": [{"sections": [{"title": f"S{s}", "fields": fields}]} for s in range(10)]}}
+
+
+def test_identical_payloads_are_stored_once(tmp_path):
+    first = write_blob(tmp_path, {"old_content": {"x": 1}})
+    second = write_blob(tmp_path, {"old_content": {"x": 1}})
+
+    assert first[0] == second[0] and first[1] == second[1] == blob_rel_path(first[0])
+    assert first[2] is True and second[2] is False
+
+
+def test_large_payloads_are_stored_as_deltas(tmp_path):
+    shas = []
+    for n in range(20, 24):
+        base = shas[-1] if shas else None
+        sha, rel, _ = write_blob(tmp_path, _schema(n), base=base, delta_min_bytes=1024)
+        shas.append(sha)
+
+    full = (tmp_path / blob_rel_path(shas[0])).stat().st_size
+    delta = json.loads((tmp_path / blob_rel_path(shas[-1])).read_text(encoding="utf-8"))
+    assert delta["casee_delta"] == 1 and delta["base"] == shas[-2] and delta["depth"] == 3
+    assert (tmp_path / blob_rel_path(shas[-1])).stat().st_size * 5 < full
+
+    for n, sha in zip(range(20, 24), shas):
+        assert load_blob(tmp_path, blob_rel_path(sha)) == _schema(n)
+
+    # Small payloads and disabled deltas are stored in full.
+    sha, rel, _ = write_blob(tmp_path, _schema(30), base=shas[-1], delta_min_bytes=0)
+    assert "casee_delta" not in json.loads((tmp_path / rel).read_text(encoding="utf-8"))
+
+
+STUDY_DATA = {
+    **BASE_STUDY_DATA,
+    "forms": [
+        {"sections": [{"title": f"S{s}", "fields": [{"name": f"F{s}.{i}"} for i in range(40)]}]}
+        for s in range(10)
+    ],
+}
+
+
+@pytest.fixture
+def study_data():
+    return json.loads(json.dumps(STUDY_DATA))
+
+
+@pytest.fixture
+def bare_repo(bare_repo, monkeypatch):
+    cfg = replace(get_datalad_config(), audit_delta_min_bytes=1024)
+    monkeypatch.setattr(datalad_repo, "get_datalad_config", lambda: cfg)
+    return bare_repo
+
+
+def test_study_edits_store_schema_snapshots_as_deltas(repo):
+    p = repo.paths(1, STUDY_NAME)
+    schema_path = p.templates_dir / "v001" / "schema.json"
+    snapshots = []
+    data = json.loads(json.dumps(STUDY_DATA))
+    for i in range(4):
+        snapshots.append(json.loads(schema_path.read_text(encoding="utf-8")))
+        data["forms"][i]["sections"][0]["fields"].append({"name": f"extra {i}"})
+        repo.update_study(
+            study_id=1,
+            current_study_name=STUDY_NAME,
+            study_name=None,
+            study_description=None,
+            study_data=data,
+        )
+
+    edits = [
+        json.loads(line)
+        for line in (p.audit_system_study_dir / "events.jsonl").read_text(encoding="utf-8").splitlines()
+        if '"study_edited"' in line
+    ]
+    assert len(edits) == 4
+    for event, snapshot in zip(edits, snapshots):
+        payload = event["payload"]
+        assert "old_template_schema" not in payload
+        assert load_blob(p.canonical_dir, payload["old_template_schema_path"]) == {"old_template_schema": snapshot}
+        # The diff itself is still the list of changes the UI renders.
+        diff = load_blob(p.canonical_dir, event["diff_path"])
+        assert isinstance(diff, list) and diff
+
+    stored = [
+        json.loads((p.canonical_dir / e["payload"]["old_template_schema_path"]).read_text(encoding="utf-8"))
+        for e in edits
+    ]
+    assert "casee_delta" not in stored[0]
+    assert all(s.get("casee_delta") == 1 for s in stored[1:])
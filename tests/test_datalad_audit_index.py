@@ -0,0 +1,193 @@
+import json
+
+import pytest
+
+from eCRF_backend import datalad_audit_index
+
+from conftest import STUDY_NAME, save_entry
+
+
+def _events(repo):
+    p = repo.paths(1, STUDY_NAME)
+    rows = []
+    for path in sorted(p.audit_dir.rglob("events.jsonl")):
+        rows += [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    return rows
+
+
+def test_find_audit_event_seeks_to_indexed_record(repo, monkeypatch):
+    save_entry(repo, 0, 0, 60)
+    save_entry(repo, 1, 0, 70)
+    events = _events(repo)
+    assert len(events) >= 3
+
+    def no_scan(*_a, **_k):
+        raise AssertionError("lookup of an indexed event must not scan")
+
+    monkeypatch.setattr(datalad_audit_index, "scan_jsonl_offsets", no_scan)
+    for event in events:
+        assert repo.find_audit_event(1, STUDY_NAME, event["id"]) == event
+
+
+def test_missing_index_is_rebuilt_from_jsonl(repo):
+    save_entry(repo, 0, 0, 60)
+    save_entry(repo, 1, 0, 70)
+    events = _events(repo)
+    p = repo.paths(1, STUDY_NAME)
+    (p.dataset_path / ".casee" / "audit.sqlite").unlink()
+
+    assert repo.find_audit_event(1, STUDY_NAME, events[-1]["id"]) == events[-1]
+    assert repo.find_audit_event(1, STUDY_NAME, "no-such-event") is None
+    assert repo.rebuild_audit_index(1, STUDY_NAME) == {"event_count": len(events)}
+
+
+def test_appends_outside_the_index_and_rewrites_are_picked_up(repo):
+    save_entry(repo, 0, 0, 60)
+    p = repo.paths(1, STUDY_NAME)
+    events_file = p.audit_system_study_dir / "events.jsonl"
+
+    # An event appended without the index (e.g. pulled from another clone).
+    with events_file.open("a", encoding="utf-8") as f:
+        f.write(json.dumps({"id": "external_1", "action": "study_edited"}) + "\n")
+    assert repo.find_audit_event(1, STUDY_NAME, "external_1")["action"] == "study_edited"
+
+    # The file is rewritten so indexed offsets no longer match.
+    rows = [json.loads(line) for line in events_file.read_text(encoding="utf-8").splitlines()]
+    events_file.write_text(
+        "".join(json.dumps(r, indent=None, separators=(", ", ": ")) + "\n" for r in reversed(rows)),
+        encoding="utf-8",
+    )
+    for row in rows:
+        assert repo.find_audit_event(1, STUDY_NAME, row["id"]) == row
+
+
+def test_partial_trailing_line_is_not_indexed(tmp_path):
+    path = tmp_path / "events.jsonl"
+    path.write_bytes(b'{"id": "a"}\n{"id": "b"}\n{"id": "c"')
+
+    scan = datalad_audit_index.scan_jsonl_offsets(path)
+
+    assert [r[0] for r in scan.refs] == ["a", "b"]
+    assert scan.end == len(b'{"id": "a"}\n{"id": "b"}\n')
+
+
+def _expected_summary(repo):
+    p = repo.paths(1, STUDY_NAME)
+    study = [e for e in _events(repo) if e["scope"] == "study"]
+    subjects = {}
+    for path in sorted(p.audit_subject_dir.glob("*/events.jsonl")):
+        rows = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+        subjects[path.parent.name] = (len(rows), rows[-1])
+    return study, subjects
+
+
+def test_audit_summary_is_maintained_on_append(repo, monkeypatch):
+    save_entry(repo, 0, 0, 60)
+    save_entry(repo, 1, 0, 70)
+    save_entry(repo, 0, 0, 65)
+
+    def no_scan(*_a, **_k):
+        raise AssertionError("the summary must be served from the index")
+
+    monkeypatch.setattr(datalad_audit_index, "scan_jsonl_offsets", no_scan)
+    summary = repo.audit_summary(1, STUDY_NAME, subject_limit=10)
+    study, subjects = _expected_summary(repo)
+
+    assert summary["study_events_count"] == len(study)
+    assert summary["subjects_count"] == 2
+    assert summary["subject_events_count"] == sum(n for n, _ in subjects.values())
+    assert summary["action_counts"]["entry_upserted"] == 3
+    assert sum(summary["action_counts"].values()) == len(_events(repo))
+    # Most recently active subject first.
+    assert [row["latest_event"] for row in summary["subjects"]] == [
+        subjects[name][1] for name in sorted(subjects, key=lambda n: subjects[n][1]["timestamp"], reverse=True)
+    ]
+    assert repo.audit_summary(1, STUDY_NAME, subject_limit=1)["subjects"][0]["events_count"] == 2
+
+
+def test_audit_summary_repair_recomputes_from_logs(repo):
+    save_entry(repo, 0, 0, 60)
+    p = repo.paths(1, STUDY_NAME)
+    subject_log = next(p.audit_subject_dir.glob("*/events.jsonl"))
+    with subject_log.open("a", encoding="utf-8") as f:
+        f.write(json.dumps({"id": "external_1", "action": "file_added", "timestamp": "2099-01-01T00:00:00+00:00"}) + "\n")
+
+    stale = repo.audit_summary(1, STUDY_NAME)
+    assert "file_added" not in stale["action_counts"]
+
+    repo.rebuild_audit_index(1, STUDY_NAME)
+    repaired = repo.audit_summary(1, STUDY_NAME)
+    assert repaired["action_counts"]["file_added"] == 1
+    assert repaired["subjects"][0]["latest_event"]["id"] == "external_1"
+    assert repaired["subjects"][0]["events_count"] == 2
+
+    # A missing index is rebuilt on first use.
+    (p.dataset_path / ".casee" / "audit.sqlite").unlink()
+    assert repo.audit_summary(1, STUDY_NAME) == repaired
+
+
+def test_audit_summary_of_a_study_without_audit_logs_is_empty(bare_repo):
+    p = bare_repo.paths(1, STUDY_NAME)
+
+    summary = bare_repo.audit_summary(1, STUDY_NAME)
+
+    assert summary == {
+        "study_events_count": 0,
+        "subject_events_count": 0,
+        "subjects_count": 0,
+        "subjects": [],
+        "action_counts": {},
+    }
+    assert not (p.dataset_path / ".casee" / "audit.sqlite").exists()
+
+
+def test_query_audit_events_filters_and_paginates(repo, monkeypatch):
+    for i in range(6):
+        repo.save_entry(
+            study_id=1,
+            study_name=STUDY_NAME,
+            subject_index=i % 2,
+            visit_index=0,
+            group_index=0,
+            form_version=1,
+            data={"Vitals": {"pulse": 60 + i}},
+            skipped_required_flags=[],
+            actor="tester",
+            user_id=7 if i < 4 else 8,
+            actor_name="Alice" if i < 4 else "Bob",
+        )
+    upserts = [e for e in _events(repo) if e["action"] == "entry_upserted"]
+
+    def no_scan(*_a, **_k):
+        raise AssertionError("queries must not scan the logs")
+
+    monkeypatch.setattr(datalad_audit_index, "scan_jsonl_offsets", no_scan)
+
+    def query(**kw):
+        return repo.query_audit_events(1, STUDY_NAME, **kw)
+
+    result = query(actions=["entry_upserted"], user_ids=[7], subject_from=1, subject_to=1)
+    assert result["total"] == 2
+    assert {e["payload"]["subject_index"] for e in result["events"]} == {1}
+    assert {e["payload"]["user_id"] for e in result["events"]} == {7}
+
+    assert query(actor="bob")["total"] == 2
+    entry_id = upserts[0]["payload"]["entry_id"]
+    assert [e["id"] for e in query(entry_ids=[entry_id])["events"]] == [upserts[0]["id"]]
+    assert query(time_from="2000-01-01T00:00:00+00:00", time_to="2000-12-31T00:00:00+00:00")["total"] == 0
+
+    # Keyset pages cover every event exactly once, newest first.
+    seen, cursor = [], None
+    while True:
+        page = query(actions=["entry_upserted"], limit=4, cursor=cursor, with_total=False)
+        seen += [e["id"] for e in page["events"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    expected = sorted(upserts, key=lambda e: (e["timestamp"], e["id"]), reverse=True)
+    assert seen == [e["id"] for e in expected]
+    oldest_first = query(actions=["entry_upserted"], ascending=True, limit=100)["events"]
+    assert [e["id"] for e in oldest_first] == seen[::-1]
+
+    with pytest.raises(ValueError):
+        query(cursor="not-a-cursor")
@@ -0,0 +1,142 @@
+import gzip
+import json
+from dataclasses import replace
+from datetime import datetime, timezone
+
+import pytest
+
+from eCRF_backend import datalad_repo
+from eCRF_backend.audit_datalad import _tail_lines
+from eCRF_backend import datalad_audit_log
+from eCRF_backend.datalad_audit_index import read_events_at, scan_jsonl_offsets
+from eCRF_backend.datalad_audit_log import LogReader, iter_lines, seal_if_due, sealed_segments, segment_members
+from eCRF_backend.datalad_config import get_datalad_config
+
+from conftest import STUDY_NAME, save_entry
+
+
+NOW = datetime(2026, 3, 15, tzinfo=timezone.utc)
+
+
+def _write_events(path, ids, month="2026-03"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as f:
+        for i in ids:
+            f.write(json.dumps({"id": f"e{i}", "timestamp": f"{month}-01T00:00:{i % 60:02d}+00:00"}) + "\n")
+
+
+def test_seal_by_size_and_month(tmp_path):
+    events = tmp_path / "audit" / "events.jsonl"
+    _write_events(events, range(3))
+    assert seal_if_due(events, max_bytes=10_000, now=NOW) is None
+
+    segment = seal_if_due(events, max_bytes=50, now=NOW)
+    assert segment.name == "events-000001-202603.jsonl.gz"
+    assert events.read_bytes() == b""
+    assert [json.loads(ln)["id"] for ln in gzip.decompress(segment.read_bytes()).splitlines()] == ["e0", "e1", "e2"]
+
+    _write_events(events, range(3, 5), month="2026-02")
+    segment = seal_if_due(events, max_bytes=10_000, now=NOW)
+    assert segment.name == "events-000002-202602.jsonl.gz"
+    assert sealed_segments(events) == [segment.parent / "events-000001-202603.jsonl.gz", segment]
+
+    # Disabled: the active file just grows.
+    _write_events(events, range(5, 50), month="2026-01")
+    assert seal_if_due(events, max_bytes=0, now=NOW) is None
+
+
+def test_reads_span_sealed_segments_and_active_file(tmp_path):
+    events = tmp_path / "audit" / "events.jsonl"
+    for batch in (range(0, 4), range(4, 8)):
+        _write_events(events, batch)
+        seal_if_due(events, max_bytes=1, now=NOW)
+    _write_events(events, range(8, 10))
+
+    assert [json.loads(ln)["id"] for ln in iter_lines(events)] == [f"e{i}" for i in range(10)]
+    assert [json.loads(ln)["id"] for ln in _tail_lines(events, 7)] == [f"e{i}" for i in range(3, 10)]
+    assert len(_tail_lines(events, 100)) == 10
+
+
+def test_sealed_segment_reads_only_the_member_holding_an_event(tmp_path, monkeypatch):
+    monkeypatch.setattr(datalad_audit_log, "SEGMENT_MEMBER_BYTES", 1024)
+    events = tmp_path / "audit" / "events.jsonl"
+    _write_events(events, range(500))
+    original = events.read_bytes()
+    segment = seal_if_due(events, max_bytes=1, now=NOW)
+
+    # Still one ordinary gzip stream.
+    assert gzip.decompress(segment.read_bytes()) == original
+    members = segment_members(segment)
+    assert len(members) > 20
+
+    spans = [(ref[1], ref[2]) for ref in scan_jsonl_offsets(segment).refs]
+    inflated = []
+    real_decompressobj = datalad_audit_log.zlib.decompressobj
+
+    class Counting:
+        def __init__(self, wbits):
+            self._d = real_decompressobj(wbits)
+
+        def decompress(self, data):
+            out = self._d.decompress(data)
+            inflated.append(len(out))
+            return out
+
+        def __getattr__(self, name):
+            return getattr(self._d, name)
+
+    monkeypatch.setattr(datalad_audit_log.zlib, "decompressobj", Counting)
+    with LogReader(segment) as reader:
+        offset, length = spans[400]
+        assert reader.read(offset, length) == original[offset:offset + length]
+    # Decompression started at the event's member, not the segment start.
+    assert sum(inflated) <= len(original) - offset
+
+    picked = [spans[i] for i in (450, 3, 200, 201, 3)]
+    rows = read_events_at(segment, picked)
+    assert [row["id"] for row in rows] == ["e450", "e3", "e200", "e201", "e3"]
+
+
+def test_segments_without_member_table_are_still_readable(tmp_path):
+    segment = tmp_path / "segments" / "events-000001-202603.jsonl.gz"
+    segment.parent.mkdir()
+    lines = b"".join(json.dumps({"id": f"e{i}"}).encode() + b"\n" for i in range(50))
+    segment.write_bytes(gzip.compress(lines, mtime=0))
+
+    assert segment_members(segment) == [(0, 0)]
+    offset = lines.index(b'{"id": "e40"}')
+    with LogReader(segment) as reader:
+        assert json.loads(reader.read(offset, 13)) == {"id": "e40"}
+
+
+@pytest.fixture
+def bare_repo(bare_repo, monkeypatch):
+    cfg = replace(get_datalad_config(), audit_segment_max_bytes=1500)
+    monkeypatch.setattr(datalad_repo, "get_datalad_config", lambda: cfg)
+    return bare_repo
+
+
+def test_audit_index_follows_events_into_segments(repo):
+    for i in range(8):
+        save_entry(repo, 0, 0, 60 + i)
+    p = repo.paths(1, STUDY_NAME)
+    subject_log = next(p.audit_subject_dir.glob("*/events.jsonl"))
+    assert sealed_segments(subject_log)
+    assert (p.audit_dir / ".gitattributes").exists()
+    events = [json.loads(ln) for ln in iter_lines(subject_log)]
+    assert len(events) == 8
+
+    def check():
+        for event in events:
+            assert repo.find_audit_event(1, STUDY_NAME, event["id"]) == event
+        summary = repo.audit_summary(1, STUDY_NAME)
+        assert summary["subjects_count"] == 1
+        assert summary["subjects"][0]["events_count"] == 8
+        assert summary["subjects"][0]["latest_event"] == events[-1]
+        assert summary["action_counts"]["entry_upserted"] == 8
+        page = repo.query_audit_events(1, STUDY_NAME, actions=["entry_upserted"], ascending=True)
+        assert page["events"] == events
+
+    check()
+    repo.rebuild_audit_index(1, STUDY_NAME)
+    check()
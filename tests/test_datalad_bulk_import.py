@@ -0,0 +1,158 @@
+import io
+import json
+
+import pytest
+
+from eCRF_backend.datalad_bulk_import import iter_import_rows, run_bulk_import, source_fingerprint
+
+from conftest import STUDY_NAME
+
+
+def _ndjson(rows):
+    return io.StringIO("\n".join(json.dumps(row) for row in rows) + "\n")
+
+
+def _rows():
+    return [
+        {"subject_index": s, "visit_index": v, "group_index": 0, "data": {"Vitals": {"pulse": 60 + s}}}
+        for s in range(3)
+        for v in range(2)
+    ]
+
+
+def _import(repo, lines, fmt="ndjson", **kwargs):
+    return run_bulk_import(
+        repo,
+        study_id=1,
+        study_name=STUDY_NAME,
+        rows=iter_import_rows(lines, fmt),
+        form_version=1,
+        actor="importer",
+        **kwargs,
+    )
+
+
+def test_ndjson_import_validates_and_commits_per_batch(repo, monkeypatch):
+    saves = []
+    monkeypatch.setattr(repo, "save", lambda *args, **_kwargs: saves.append(args))
+    rows = _rows()
+    rows.insert(2, {"subject_index": 9, "visit_index": 0, "group_index": 0, "data": {}})
+    rows.insert(4, {"subject_index": 0, "visit_index": 0, "group_index": 0, "data": {"Labs": {"x": 1}}})
+
+    summary = _import(repo, _ndjson(rows), batch_size=4)
+
+    assert summary["saved"] == 6
+    assert summary["failed"] == 2
+    assert [e["line"] for e in summary["errors"]] == [3, 5]
+    assert summary["batches"] == 2
+    assert len(saves) == 2
+
+    entries = repo.list_entries(1, STUDY_NAME)
+    assert len(entries) == 6
+    assert {(e["progress_status"], e["progress_completed"], e["progress_total"]) for e in entries} == {
+        ("partial", 1, 2)
+    }
+
+
+def test_import_resumes_from_checkpoint(repo, tmp_path, monkeypatch):
+    checkpoint = tmp_path / "import.checkpoint.json"
+    real_batch = repo.save_entries_batch
+    calls = []
+
+    def failing_batch(**kwargs):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("disk full")
+        return real_batch(**kwargs)
+
+    monkeypatch.setattr(repo, "save_entries_batch", failing_batch)
+    with pytest.raises(RuntimeError):
+        _import(repo, _ndjson(_rows()), batch_size=2, checkpoint_path=checkpoint)
+    assert json.loads(checkpoint.read_text())["rows_done"] == 2
+
+    monkeypatch.setattr(repo, "save_entries_batch", real_batch)
+    summary = _import(repo, _ndjson(_rows()), batch_size=2, checkpoint_path=checkpoint)
+
+    assert summary["resumed_from"] == 2
+    assert summary["saved"] == 6
+    assert len(repo.list_entries(1, STUDY_NAME)) == 6
+
+
+def test_crash_after_a_batch_commit_does_not_duplicate_entries(repo, tmp_path, monkeypatch):
+    checkpoint = tmp_path / "import.checkpoint.json"
+    payload = _ndjson(_rows()).getvalue().encode("utf-8")
+    source = source_fingerprint(io.BytesIO(payload))
+    real_batch = repo.save_entries_batch
+    calls = []
+
+    def crash_after_commit(**kwargs):
+        calls.append(1)
+        result = real_batch(**kwargs)
+        if len(calls) == 2:
+            raise SystemExit("killed before the checkpoint update")
+        return result
+
+    monkeypatch.setattr(repo, "save_entries_batch", crash_after_commit)
+    with pytest.raises(SystemExit):
+        _import(repo, _ndjson(_rows()), batch_size=2, checkpoint_path=checkpoint, source=source)
+    state = json.loads(checkpoint.read_text())
+    assert state["rows_done"] == 2 and state["pending"] == {"rows_to": 4}
+
+    monkeypatch.setattr(repo, "save_entries_batch", real_batch)
+    summary = _import(repo, _ndjson(_rows()), batch_size=2, checkpoint_path=checkpoint, source=source)
+
+    assert summary["saved"] == 6
+    entries = repo.list_entries(1, STUDY_NAME)
+    assert len(entries) == 6
+    assert sorted(e["import"]["row"] for e in entries) == list(range(1, 7))
+
+
+def test_checkpoint_rejects_other_input_or_form_version(repo, tmp_path):
+    checkpoint = tmp_path / "import.checkpoint.json"
+    source = source_fingerprint(io.BytesIO(_ndjson(_rows()).getvalue().encode("utf-8")))
+    _import(repo, _ndjson(_rows()), batch_size=2, checkpoint_path=checkpoint, source=source)
+
+    other = source_fingerprint(io.BytesIO(b"{}\n"))
+    with pytest.raises(ValueError, match="different input file"):
+        _import(repo, _ndjson(_rows()), checkpoint_path=checkpoint, source=other)
+
+    with pytest.raises(ValueError, match="different form version"):
+        run_bulk_import(
+            repo,
+            study_id=1,
+            study_name=STUDY_NAME,
+            rows=iter_import_rows(_ndjson(_rows()), "ndjson"),
+            form_version=2,
+            actor="importer",
+            checkpoint_path=checkpoint,
+            source=source,
+        )
+
+
+def test_csv_columns_map_to_sections(repo):
+    lines = io.StringIO(
+        "subject_index,visit_index,group_index,Vitals.pulse,Vitals.note\n"
+        "0,0,0,72,\n"
+        "1,1,0,80.5,follow up\n"
+    )
+
+    summary = _import(repo, lines, fmt="csv")
+
+    assert summary["saved"] == 2
+    data = sorted((e["subject_index"], e["data"]) for e in repo.list_entries(1, STUDY_NAME))
+    assert data == [(0, {"Vitals": {"pulse": 72}}), (1, {"Vitals": {"pulse": 80.5, "note": "follow up"}})]
+
+
+def test_csv_values_that_do_not_fit_the_field_type_are_rejected(repo):
+    lines = io.StringIO(
+        "subject_index,visit_index,group_index,Vitals.pulse\n"
+        "0,0,0,fast\n"
+        "1,0,0,nan\n"
+        "2,0,0,61\n"
+    )
+
+    summary = _import(repo, lines, fmt="csv")
+
+    assert summary["saved"] == 1
+    assert [e["line"] for e in summary["errors"]] == [2, 3]
+    assert "Vitals.pulse must be a number" in summary["errors"][0]["error"]
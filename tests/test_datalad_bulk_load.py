@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from eCRF_backend.datalad_bulk_load import SERIAL_THRESHOLD, iter_json_files, loads_json
+
+
+def _entries(tmp_path, count):
+    paths = []
+    for index in range(count):
+        path = tmp_path / f"entry_{index:09d}.json"
+        path.write_text(json.dumps({"id": index}), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def test_parallel_loading_preserves_order_and_skips_bad_files(tmp_path):
+    paths = _entries(tmp_path, SERIAL_THRESHOLD * 3)
+    paths[5].write_text("{not json", encoding="utf-8")
+    paths[7].write_text("[1, 2]", encoding="utf-8")
+    paths.append(tmp_path / "missing.json")
+
+    ids = [row["id"] for _path, row in iter_json_files(paths, workers=4)]
+
+    expected = [i for i in range(SERIAL_THRESHOLD * 3) if i not in (5, 7)]
+    assert ids == expected
+
+
+def test_loader_is_consumed_lazily(tmp_path):
+    paths = _entries(tmp_path, SERIAL_THRESHOLD * 10)
+    calls = []
+
+    def loader(path):
+        calls.append(path)
+        return {"id": path.name}
+
+    stream = iter_json_files(paths, loader=loader, workers=2)
+    next(stream)
+    stream.close()
+
+    assert len(calls) < len(paths)
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"pulse": 123456789012345678901234567890},
+        {"pulse": -18446744073709551616, "note": "x"},
+        {"pulse": float("nan")},
+        {"pulse": float("inf"), "id": 1},
+        {"pulse": 18446744073709551615, "ratio": 0.1},
+    ],
+)
+def test_loads_json_round_trips_like_json(payload):
+    raw = json.dumps(payload).encode("utf-8")
+    assert repr(loads_json(raw)) == repr(json.loads(raw))
@@ -0,0 +1,61 @@
+import json
+import os
+
+from eCRF_backend import datalad_entry_cache
+from eCRF_backend.datalad_entry_cache import EntryCache
+
+
+def _write(path, payload, mtime_ns=None):
+    path.write_text(json.dumps(payload), encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_unchanged_files_are_served_without_parsing(tmp_path, monkeypatch):
+    cache = EntryCache(max_bytes=1024 * 1024)
+    path = tmp_path / "entry_000000001.json"
+    _write(path, {"id": 1, "data": {"a": 1}})
+
+    first = cache.load(path)
+
+    def fail_loads(*_args, **_kwargs):
+        raise AssertionError("unchanged entry must not be parsed again")
+
+    monkeypatch.setattr(datalad_entry_cache, "loads_json", fail_loads)
+    assert cache.load(path) is first
+    assert cache.stats()["hits"] == 1
+
+
+def test_changed_signature_triggers_reload(tmp_path):
+    cache = EntryCache(max_bytes=1024 * 1024)
+    path = tmp_path / "entry_000000001.json"
+    _write(path, {"id": 1, "data": {"a": 1}}, mtime_ns=1_000_000_000)
+    assert cache.load(path)["data"] == {"a": 1}
+
+    _write(path, {"id": 1, "data": {"a": 2}}, mtime_ns=2_000_000_000)
+    assert cache.load(path)["data"] == {"a": 2}
+
+    path.unlink()
+    assert cache.load(path) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_byte_budget_evicts_least_recently_used(tmp_path):
+    paths = []
+    for index in range(3):
+        path = tmp_path / f"entry_{index:09d}.json"
+        _write(path, {"id": index, "pad": "x" * 40})
+        paths.append(path)
+    size = paths[0].stat().st_size
+    cache = EntryCache(max_bytes=size * 2)
+
+    cache.load(paths[0])
+    cache.load(paths[1])
+    cache.load(paths[0])
+    cache.load(paths[2])
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["bytes"] <= size * 2
+    assert cache.load(paths[0]) is not None
+    assert cache.stats()["hits"] == 2
@@ -0,0 +1,102 @@
+import shutil
+
+import pytest
+
+from conftest import STUDY_NAME, save_entry
+
+
+def _query(repo, **kwargs):
+    return repo.query_entries(1, STUDY_NAME, **kwargs)
+
+
+def test_cursor_pages_cover_all_entries_once(repo):
+    saved = [save_entry(repo, i % 3, i % 2, i) for i in range(7)]
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        page = _query(repo, limit=3, cursor=cursor)
+        assert page["total"] == 7
+        seen.extend(row["id"] for row in page["entries"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert sorted(seen) == sorted(e["id"] for e in saved)
+    assert len(seen) == len(set(seen))
+
+
+def test_filters_and_current_only(repo):
+    save_entry(repo, 0, 0, 60, progress_status="in_progress")
+    latest = save_entry(repo, 0, 0, 61)
+    save_entry(repo, 1, 0, 70, progress_status="in_progress")
+    save_entry(repo, 2, 1, 80)
+
+    rows = _query(repo, subject_indexes=[0])["entries"]
+    assert [r["data"]["Vitals"]["pulse"] for r in rows] == [60, 61]
+
+    current = _query(repo, subject_indexes=[0], current_only=True)
+    assert current["total"] == 1
+    assert current["entries"][0]["id"] == latest["id"]
+
+    in_progress = _query(repo, progress_statuses=["in_progress"])["entries"]
+    assert sorted(r["subject_index"] for r in in_progress) == [0, 1]
+
+    assert _query(repo, visit_indexes=[1])["total"] == 1
+    assert _query(repo, updated_from="9999-01-01")["entries"] == []
+
+
+def test_update_moves_catalog_row_and_heads(repo, monkeypatch):
+    first = save_entry(repo, 0, 0, 60)
+    monkeypatch.setattr(
+        type(repo.paths(1, STUDY_NAME).entries_dir),
+        "rglob",
+        lambda *_a, **_k: pytest.fail("entries are located through the catalog"),
+    )
+    repo.update_entry(
+        study_id=1,
+        study_name=STUDY_NAME,
+        entry_id=first["id"],
+        payload={
+            "subject_index": 1,
+            "visit_index": 0,
+            "group_index": 0,
+            "data": {"Vitals": {"pulse": 99}},
+            "skipped_required_flags": [],
+        },
+        actor="tester",
+    )
+
+    assert _query(repo, subject_indexes=[0])["total"] == 0
+    moved = _query(repo, subject_indexes=[1], current_only=True)["entries"]
+    assert [r["data"]["Vitals"]["pulse"] for r in moved] == [99]
+    assert repo.get_entry(1, STUDY_NAME, first["id"]) == moved[0]
+    assert repo.get_entry(1, STUDY_NAME, first["id"] + 1) is None
+
+
+def test_catalog_is_rebuilt_when_missing(repo):
+    save_entry(repo, 0, 0, 60)
+    save_entry(repo, 1, 1, 70)
+    shutil.rmtree(repo.paths(1, STUDY_NAME).dataset_path / ".casee")
+
+    page = _query(repo, current_only=True)
+    assert page["total"] == 2
+
+
+def test_invalid_cursor_raises_value_error(repo):
+    save_entry(repo, 0, 0, 60)
+    with pytest.raises(ValueError):
+        _query(repo, cursor="not-a-cursor", limit=10)
+
+
+def test_iter_query_entries_walks_all_pages(repo):
+    saved = [save_entry(repo, i % 3, 0, i) for i in range(5)]
+
+    rows = list(repo.iter_query_entries(1, STUDY_NAME, batch_size=2))
+    assert [r["id"] for r in rows] == [e["id"] for e in saved]
+
+    latest = list(repo.iter_query_entries(1, STUDY_NAME, batch_size=2, current_only=True))
+    assert sorted(r["subject_index"] for r in latest) == [0, 1, 2]
@@ -0,0 +1,111 @@
+import subprocess
+from dataclasses import replace
+
+import pytest
+
+from eCRF_backend.datalad_config import get_datalad_config
+from eCRF_backend.datalad_git_commit import commit_paths, plumbing_eligible, try_plumbing_commit
+
+TEXT2GIT = "* annex.largefiles=((mimeencoding=binary)and(largerthan=0))\n"
+
+
+def _git(ds, *args):
+    return subprocess.check_output(["git", "-C", str(ds), *args], text=True).strip()
+
+
+@pytest.fixture
+def ds(tmp_path):
+    ds = tmp_path / "ds"
+    ds.mkdir()
+    _git(ds, "init", "-q")
+    (ds / ".gitattributes").write_text(TEXT2GIT, encoding="utf-8")
+    _git(ds, "add", ".gitattributes")
+    _git(ds, "-c", "user.name=t", "-c", "user.email=t@x", "-c", "commit.gpgsign=false", "commit", "-qm", "init")
+    return ds
+
+
+def _write(ds, rel, text):
+    path = ds / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def test_commit_paths_adds_modifies_and_removes(ds):
+    _write(ds, "canonical/entries/entry_1.json", '{"id": 1}')
+    _write(ds, "canonical/audit/events.jsonl", '{"a": 1}\n')
+    _write(ds, "canonical/untouched.json", "{}")
+
+    first = commit_paths(
+        ds,
+        ["canonical/entries/entry_1.json", "canonical/audit/events.jsonl"],
+        "case-e: upsert_entry study=1 entry=1",
+        name="case-e service",
+        email="case-e@localhost",
+    )
+    assert _git(ds, "rev-parse", "HEAD") == first
+    assert _git(ds, "log", "-1", "--format=%an <%ae>|%cn|%s") == (
+        "case-e service <case-e@localhost>|case-e service|case-e: upsert_entry study=1 entry=1"
+    )
+    assert _git(ds, "show", "HEAD:canonical/entries/entry_1.json") == '{"id": 1}'
+    # Only the listed paths are committed.
+    assert "canonical/untouched.json" not in _git(ds, "ls-tree", "-r", "--name-only", "HEAD")
+
+    (ds / "canonical/entries/entry_1.json").unlink()
+    _write(ds, "canonical/entries/entry_2.json", '{"id": 2}')
+    commit_paths(
+        ds,
+        ["canonical/entries/entry_1.json", "canonical/entries/entry_2.json"],
+        "case-e: update_entry",
+        name="n",
+        email="e@x",
+    )
+    files = _git(ds, "ls-tree", "-r", "--name-only", "HEAD").splitlines()
+    assert "canonical/entries/entry_2.json" in files
+    assert "canonical/entries/entry_1.json" not in files
+    assert _git(ds, "rev-parse", "HEAD~1") == first
+
+    # Nothing changed: no empty commit.
+    assert commit_paths(ds, ["canonical/entries/entry_2.json"], "noop", name="n", email="e@x") is None
+
+
+def test_commit_paths_ignores_other_staged_changes(ds):
+    _write(ds, "canonical/entries/entry_1.json", '{"id": 1}')
+    _write(ds, "notes/staged.txt", "work in progress")
+    _git(ds, "add", "notes/staged.txt")
+
+    commit_paths(ds, ["canonical/entries/entry_1.json"], "m", name="n", email="e@x")
+
+    assert _git(ds, "ls-tree", "-r", "--name-only", "HEAD").splitlines() == [
+        ".gitattributes",
+        "canonical/entries/entry_1.json",
+    ]
+    # The unrelated change is still staged; the committed path is clean.
+    assert _git(ds, "status", "--porcelain") == "A  notes/staged.txt"
+
+
+def test_only_canonical_text_in_git_is_eligible(ds, tmp_path):
+    _write(ds, "canonical/entries/entry_1.json", "{}")
+    _write(ds, "canonical/files/scan.json", "{}")
+    _write(ds, "canonical/notes.txt", "x")
+    assert plumbing_eligible(ds, ["canonical/entries/entry_1.json"])
+    assert not plumbing_eligible(ds, ["canonical/files/scan.json"])
+    assert not plumbing_eligible(ds, ["canonical/notes.txt"])
+    assert not plumbing_eligible(ds, [])
+
+    # Without text2git rules, datalad would annex the file.
+    (ds / ".gitattributes").write_text("", encoding="utf-8")
+    assert not plumbing_eligible(ds, ["canonical/entries/entry_1.json"])
+
+
+def test_backend_setting_selects_plumbing(ds, monkeypatch):
+    monkeypatch.setenv("ECRF_DATALAD_MODE", "shadow")
+    cfg = get_datalad_config()
+    _write(ds, "canonical/entries/entry_1.json", "{}")
+    head = _git(ds, "rev-parse", "HEAD")
+
+    assert not try_plumbing_commit(cfg, ds, ["canonical/entries/entry_1.json"], "m")
+    assert not try_plumbing_commit(replace(cfg, commit_backend="git"), ds, None, "m")
+    assert _git(ds, "rev-parse", "HEAD") == head
+
+    assert try_plumbing_commit(replace(cfg, commit_backend="git"), ds, ["canonical/entries/entry_1.json"], "m")
+    assert _git(ds, "rev-parse", "HEAD~1") == head
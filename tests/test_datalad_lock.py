@@ -1,9 +1,15 @@
 # tests/test_datalad_lock.py
 from pathlib import Path
+import subprocess
+import sys
 import threading
 import time
 
-from eCRF_backend.datalad_lock import LockSpec, dataset_lock
+import pytest
+from filelock import FileLock, Timeout
+
+from eCRF_backend.datalad_lock import LockSpec, dataset_lock, lock_stats_snapshot, reset_lock_stats
+from eCRF_backend.settings import get_settings
 
 
 def test_dataset_lock_serialises(tmp_path: Path):
@@ -22,3 +28,144 @@ def test_dataset_lock_serialises(tmp_path: Path):
 
     assert order == ["a", "b"] or order == ["b", "a"]
     assert len(order) == 2
+
+
+def test_shared_holders_run_concurrently(tmp_path: Path):
+    ds = tmp_path / "ds"
+    inside = threading.Barrier(3, timeout=2)
+
+    def reader():
+        with dataset_lock(LockSpec(dataset_path=ds, timeout_s=2, shared=True)):
+            # All three readers must be inside at once to pass the barrier.
+            inside.wait()
+
+    threads = [threading.Thread(target=reader) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not inside.broken
+
+
+def test_exclusive_waits_for_shared_holders(tmp_path: Path):
+    ds = tmp_path / "ds"
+    events = []
+    reading = threading.Event()
+
+    def reader():
+        with dataset_lock(LockSpec(dataset_path=ds, timeout_s=2, shared=True)):
+            reading.set()
+            time.sleep(0.3)
+            events.append("read done")
+
+    t = threading.Thread(target=reader)
+    t.start()
+    reading.wait(2)
+    with dataset_lock(LockSpec(dataset_path=ds, timeout_s=2)):
+        events.append("write")
+    t.join()
+
+    assert events == ["read done", "write"]
+
+
+def test_shared_lock_excludes_writers_in_other_processes(tmp_path: Path):
+    ds = tmp_path / "ds"
+    holder = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "import sys, time\n"
+            "from pathlib import Path\n"
+            "from eCRF_backend.datalad_lock import LockSpec, dataset_lock\n"
+            "with dataset_lock(LockSpec(dataset_path=Path(sys.argv[1]), timeout_s=5, shared=True)):\n"
+            "    print('held', flush=True)\n"
+            "    time.sleep(1.0)\n",
+            str(ds),
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        assert holder.stdout.readline().strip() == "held"
+        with dataset_lock(LockSpec(dataset_path=ds, timeout_s=1, shared=True)):
+            pass
+        with pytest.raises(RuntimeError, match="exclusive lock"):
+            with dataset_lock(LockSpec(dataset_path=ds, timeout_s=0.2)):
+                pass
+    finally:
+        holder.wait(timeout=10)
+
+
+def test_exclusive_lock_excludes_legacy_lock_holders(tmp_path: Path):
+    # Releases before the shared/exclusive lock used a plain FileLock on
+    # .casee.dataset.lock; exclusive writers still take it.
+    ds = tmp_path / "ds"
+    ds.mkdir()
+    legacy = FileLock(str(ds / ".casee.dataset.lock"))
+    with legacy.acquire(timeout=1):
+        with pytest.raises(RuntimeError, match="exclusive lock"):
+            with dataset_lock(LockSpec(dataset_path=ds, timeout_s=0.2)):
+                pass
+        with dataset_lock(LockSpec(dataset_path=ds, timeout_s=1, shared=True)):
+            pass
+
+    with dataset_lock(LockSpec(dataset_path=ds, timeout_s=1)):
+        with pytest.raises(Timeout):
+            FileLock(str(ds / ".casee.dataset.lock")).acquire(timeout=0.1)
+
+
+@pytest.fixture
+def slow_threshold(monkeypatch):
+    monkeypatch.setenv("ECRF_DATALAD_LOCK_SLOW_SECONDS", "0.15")
+    get_settings.cache_clear()
+    reset_lock_stats()
+    yield
+    get_settings.cache_clear()
+    reset_lock_stats()
+
+
+def test_lock_stats_record_wait_hold_contention_and_timeouts(tmp_path: Path, slow_threshold):
+    ds = tmp_path / "ds"
+    holding = threading.Event()
+
+    def holder():
+        with dataset_lock(LockSpec(dataset_path=ds, timeout_s=2)):
+            holding.set()
+            time.sleep(0.3)
+
+    t = threading.Thread(target=holder)
+    t.start()
+    holding.wait(2)
+    with pytest.raises(RuntimeError):
+        with dataset_lock(LockSpec(dataset_path=ds, timeout_s=0.05)):
+            pass
+    with dataset_lock(LockSpec(dataset_path=ds, timeout_s=2, shared=True)):
+        pass
+    t.join()
+    with dataset_lock(LockSpec(dataset_path=ds, name="slot_017", timeout_s=2)):
+        pass
+
+    snapshot = lock_stats_snapshot()
+    by_name = {row["name"]: row for row in snapshot["locks"]}
+    assert set(by_name) == {"dataset", "slot"}
+
+    dataset = by_name["dataset"]
+    assert dataset["dataset_path"] == str(ds.resolve())
+    assert dataset["acquisitions"] == 2
+    assert dataset["shared"] == 1
+    assert dataset["timeouts"] == 1
+    assert dataset["contended"] >= 2
+    assert dataset["hold_max_s"] >= 0.25
+    assert sum(dataset["wait_histogram"]) == 3
+    assert sum(dataset["hold_histogram"]) == 2
+    assert len(dataset["wait_histogram"]) == len(snapshot["histogram_bounds_s"])
+    assert by_name["slot"]["acquisitions"] == 1
+
+    # The holder and the blocked reader are slow; the timeout is always recorded.
+    slowest = snapshot["slowest"]
+    assert any(r["timed_out"] for r in slowest)
+    assert all("test_datalad_lock.py" in r["call_site"] for r in slowest)
+    assert {r["mode"] for r in slowest if not r["timed_out"]} == {"shared", "exclusive"}
+
+    reset_lock_stats()
+    assert lock_stats_snapshot()["locks"] == []
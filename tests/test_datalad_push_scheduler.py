@@ -0,0 +1,148 @@
+import threading
+import time
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+from eCRF_backend import datalad_push_scheduler
+from eCRF_backend.datalad_config import get_datalad_config
+from eCRF_backend.datalad_lock import LockSpec, dataset_lock
+from eCRF_backend.datalad_push_scheduler import PushScheduler
+
+
+@pytest.fixture
+def make_scheduler(monkeypatch):
+    monkeypatch.setenv("ECRF_DATALAD_MODE", "shadow")
+    created = []
+
+    def make(push, interval_s=60.0, concurrency=4):
+        cfg = replace(get_datalad_config(), push_interval_s=interval_s, push_concurrency=concurrency)
+        scheduler = PushScheduler(cfg, log=lambda _msg: None, push=push)
+        scheduler.start()
+        created.append(scheduler)
+        return scheduler
+
+    yield make
+    for scheduler in created:
+        scheduler.stop()
+
+
+def _wait_for(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_many_saves_push_once_per_interval(make_scheduler):
+    pushed = []
+    scheduler = make_scheduler(lambda path, to: pushed.append((str(path), to)), interval_s=60.0)
+    ds = Path("/data/study_7_Trial")
+
+    for _ in range(20):
+        scheduler.mark_dirty(ds, to="ria")
+    assert _wait_for(lambda: len(pushed) == 1)
+
+    for _ in range(5):
+        scheduler.mark_dirty(ds, to="ria")
+    time.sleep(0.2)
+    # The next push waits for the interval.
+    assert pushed == [("/data/study_7_Trial", "ria")]
+    (status,) = scheduler.status()
+    assert status["study_id"] == 7
+    assert status["dirty"] and status["lag_s"] > 0
+
+    result = scheduler.flush()
+    assert result["flushed"] == ["/data/study_7_Trial"]
+    assert result["pending"] == []
+    assert len(pushed) == 2
+    (status,) = scheduler.status()
+    assert not status["dirty"] and status["lag_s"] == 0.0 and status["pushes"] == 2
+
+
+def test_datasets_push_concurrently(make_scheduler):
+    running, peak = [0], [0]
+    lock = threading.Lock()
+    release = threading.Event()
+
+    def push(path, to):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        release.wait(2)
+        with lock:
+            running[0] -= 1
+
+    scheduler = make_scheduler(push, interval_s=0.0, concurrency=3)
+    for i in range(3):
+        scheduler.mark_dirty(Path(f"/data/study_{i}"), to="ria")
+
+    assert _wait_for(lambda: peak[0] == 3)
+    release.set()
+    scheduler.flush(timeout_s=3)
+    assert all(not s["dirty"] for s in scheduler.status())
+
+
+def test_failed_push_stays_dirty_and_reports_error(make_scheduler):
+    def push(path, to):
+        raise RuntimeError("ssh: connection refused")
+
+    scheduler = make_scheduler(push)
+    scheduler.mark_dirty(Path("/data/study_3"), to="ria")
+
+    result = scheduler.flush(timeout_s=3)
+
+    assert result["pending"] == ["/data/study_3"]
+    assert result["errors"] == {"/data/study_3": "ssh: connection refused"}
+    (status,) = scheduler.status()
+    assert status["dirty"] and status["pushes"] == 0
+
+
+def test_push_runs_without_the_dataset_lock(tmp_path, monkeypatch):
+    ds = tmp_path / "study_1"
+    pushing, release = threading.Event(), threading.Event()
+
+    class FakeDataset:
+        def __init__(self, path):
+            pass
+
+        def push(self, **_kwargs):
+            pushing.set()
+            release.wait(3)
+
+    monkeypatch.setattr(datalad_push_scheduler, "Dataset", FakeDataset)
+    scheduler = PushScheduler(get_datalad_config(), log=lambda _msg: None)
+    t = threading.Thread(target=scheduler._push_dataset, args=(ds, "ria"))
+    t.start()
+    try:
+        assert pushing.wait(3)
+        # Study-level writers do not wait for the network.
+        with dataset_lock(LockSpec(dataset_path=ds, timeout_s=0.2)):
+            pass
+    finally:
+        release.set()
+        t.join()
+
+
+def test_push_waits_for_a_save_in_progress(tmp_path, monkeypatch):
+    ds = tmp_path / "study_1"
+    pushed = threading.Event()
+
+    class FakeDataset:
+        def __init__(self, path):
+            pass
+
+        def push(self, **_kwargs):
+            pushed.set()
+
+    monkeypatch.setattr(datalad_push_scheduler, "Dataset", FakeDataset)
+    scheduler = PushScheduler(get_datalad_config(), log=lambda _msg: None)
+    with dataset_lock(LockSpec(dataset_path=ds)):
+        t = threading.Thread(target=scheduler._push_dataset, args=(ds, "ria"))
+        t.start()
+        assert not pushed.wait(0.2)
+    t.join(3)
+    assert pushed.is_set()
@@ -0,0 +1,65 @@
+from conftest import STUDY_NAME
+
+
+def _item(repo, subject_index, visit_index, value, token=None):
+    return {
+        "subject_index": subject_index,
+        "visit_index": visit_index,
+        "group_index": 0,
+        "form_version": 1,
+        "data": {"Vitals": {"pulse": value}},
+        "skipped_required_flags": [],
+        "expected_revision_token": token if token is not None else repo.compute_entry_revision_token(None),
+    }
+
+
+def _batch(repo, items, **kwargs):
+    return repo.save_entries_batch(
+        study_id=1,
+        study_name=STUDY_NAME,
+        items=items,
+        actor="tester",
+        **kwargs,
+    )
+
+
+def test_batch_writes_all_slots_with_one_save(repo, monkeypatch):
+    saves = []
+    monkeypatch.setattr(repo, "save", lambda *args, **_kwargs: saves.append(args))
+
+    result = _batch(repo, [_item(repo, s, v, 60 + v) for s in range(2) for v in range(3)])
+
+    assert result["saved_count"] == 6
+    assert result["conflict_count"] == 0
+    assert len(saves) == 1
+    ids = [r["entry"]["id"] for r in result["results"]]
+    assert ids == sorted(ids) and len(set(ids)) == 6
+    assert repo.query_entries(1, STUDY_NAME, current_only=True)["total"] == 6
+
+
+def test_stale_and_duplicate_slots_are_reported_per_item(repo):
+    first = _batch(repo, [_item(repo, 0, 0, 60)])["results"][0]["entry"]
+
+    result = _batch(
+        repo,
+        [
+            _item(repo, 0, 0, 61, token="stale"),
+            _item(repo, 0, 1, 70),
+            _item(repo, 0, 1, 71),
+            _item(repo, 1, 0, 80, token=first["revision_token"]),
+        ],
+    )
+
+    assert [r["status"] for r in result["results"]] == ["conflict", "saved", "conflict", "conflict"]
+    assert result["saved_count"] == 1
+
+
+def test_atomic_batch_writes_nothing_on_conflict(repo, monkeypatch):
+    saves = []
+    monkeypatch.setattr(repo, "save", lambda *args, **_kwargs: saves.append(args))
+
+    result = _batch(repo, [_item(repo, 0, 0, 60), _item(repo, 1, 0, 70, token="stale")], atomic=True)
+
+    assert [r["status"] for r in result["results"]] == ["not_saved", "conflict"]
+    assert saves == []
+    assert repo.list_entries(1, STUDY_NAME) == []
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from eCRF_backend.datalad_entry_catalog import EntryCatalog, catalog_row
+
+from conftest import STUDY_NAME, save_entry
+
+
+def test_entry_ids_come_from_counter_without_rescanning(repo, monkeypatch):
+    assert save_entry(repo)["id"] == 1
+
+    monkeypatch.setattr(
+        repo,
+        "_scan_max_entry_id",
+        lambda _p: pytest.fail("allocation must not rescan once the counter exists"),
+    )
+    assert [save_entry(repo)["id"] for _ in range(3)] == [2, 3, 4]
+
+
+def test_missing_entry_counter_is_seeded_from_existing_entries(repo):
+    for _ in range(3):
+        save_entry(repo)
+    p = repo.paths(1, STUDY_NAME)
+    repo._counters_path(p).unlink()
+
+    assert save_entry(repo)["id"] == 4
+    assert json.loads(repo._counters_path(p).read_text(encoding="utf-8"))["entry_id"] == 4
+
+
+def test_entry_counter_that_fell_behind_skips_indexed_ids(repo):
+    for _ in range(3):
+        save_entry(repo)
+    p = repo.paths(1, STUDY_NAME)
+
+    # An entry with a higher id written without the counter (merged from
+    # another clone), followed by an older counters.json.
+    entry = dict(save_entry(repo), id=9)
+    path = repo._entry_path(p, form_version=1, subject_index=0, visit_index=0, group_index=0, entry_id=9)
+    path.write_text(json.dumps(entry), encoding="utf-8")
+    EntryCatalog(repo._entry_catalog_path(p)).apply([catalog_row(entry, repo._logical_path(p.dataset_path, path))], {})
+    repo._counters_path(p).write_text(json.dumps({"entry_id": 1}), encoding="utf-8")
+
+    assert save_entry(repo)["id"] == 10
+    assert json.loads(repo._counters_path(p).read_text(encoding="utf-8"))["entry_id"] == 10
+
+
+def test_file_counter_that_fell_behind_skips_taken_ids(repo, tmp_path):
+    source = tmp_path / "upload.txt"
+    source.write_text("payload", encoding="utf-8")
+
+    def upload():
+        return repo.save_uploaded_file(
+            study_id=1,
+            study_name=STUDY_NAME,
+            filename="upload.txt",
+            source_path=str(source),
+            actor="tester",
+        )
+
+    assert upload()["id"] == 1
+    p = repo.paths(1, STUDY_NAME)
+    repo._counters_path(p).write_text(json.dumps({"file_id": 0}), encoding="utf-8")
+
+    assert upload()["id"] == 2
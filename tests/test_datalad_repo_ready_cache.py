@@ -0,0 +1,61 @@
+import shutil
+
+import pytest
+
+from eCRF_backend.datalad_repo import invalidate_dataset_ready
+
+
+@pytest.fixture
+def prepares(bare_repo, monkeypatch):
+    calls = []
+    real = bare_repo._prepare_dataset
+
+    def counting(p, cfg, study_id, study_name):
+        calls.append(study_id)
+        return real(p, cfg, study_id, study_name)
+
+    monkeypatch.setattr(bare_repo, "_prepare_dataset", counting)
+    return calls
+
+
+def test_ready_dataset_skips_setup(bare_repo, prepares):
+    p = bare_repo.ensure_dataset(1, "Ready study")
+    assert p.entries_dir.is_dir() and p.access_dir.is_dir()
+
+    for _ in range(5):
+        assert bare_repo.ensure_dataset(1, "Ready study") == p
+    assert prepares == [1]
+
+    bare_repo.ensure_dataset(2, "Other study")
+    assert prepares == [1, 2]
+
+
+def test_layout_or_config_change_reruns_setup(bare_repo, prepares, monkeypatch):
+    p = bare_repo.ensure_dataset(1, "Ready study")
+
+    shutil.rmtree(p.canonical_dir)
+    bare_repo.ensure_dataset(1, "Ready study")
+    assert p.entries_dir.is_dir()
+    assert prepares == [1, 1]
+
+    monkeypatch.setenv("ECRF_DATALAD_GIT_NAME", "someone else")
+    bare_repo.ensure_dataset(1, "Ready study")
+    assert prepares == [1, 1, 1]
+
+    invalidate_dataset_ready(p.dataset_path)
+    bare_repo.ensure_dataset(1, "Ready study")
+    assert prepares == [1, 1, 1, 1]
+
+
+def test_failed_setup_is_not_cached(bare_repo, monkeypatch):
+    calls = []
+
+    def failing(p, cfg, study_id, study_name):
+        calls.append(study_id)
+        raise RuntimeError("lock timeout")
+
+    monkeypatch.setattr(bare_repo, "_prepare_dataset", failing)
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            bare_repo.ensure_dataset(1, "Ready study")
+    assert calls == [1, 1]
@@ -11,7 +11,7 @@ from eCRF_backend.forms_hybrid import _merge_submitted_entry_sections
 
 def test_save_entry_rechecks_revision_inside_dataset_lock(tmp_path, monkeypatch):
     repo = DataladStudyRepo()
-    paths = SimpleNamespace(dataset_path=tmp_path)
+    paths = SimpleNamespace(dataset_path=tmp_path, entries_dir=tmp_path / "entries")
     latest = {
         "id": 7,
         "study_id": 1,
@@ -28,8 +28,8 @@ def test_save_entry_rechecks_revision_inside_dataset_lock(tmp_path, monkeypatch)
     monkeypatch.setattr(repo, "ensure_dataset", lambda *_args, **_kwargs: paths)
     monkeypatch.setattr(
         repo,
-        "get_latest_entry_for_slot",
-        lambda **_kwargs: latest,
+        "_slot_revision_token",
+        lambda *_args: repo.compute_entry_revision_token(latest),
     )
 
     with pytest.raises(ValueError, match="Slot state changed"):
@@ -49,7 +49,7 @@ def test_save_entry_rechecks_revision_inside_dataset_lock(tmp_path, monkeypatch)
 
 def test_eight_simultaneous_saves_with_same_token_only_write_once(tmp_path, monkeypatch):
     repo = DataladStudyRepo()
-    paths = SimpleNamespace(dataset_path=tmp_path)
+    paths = SimpleNamespace(dataset_path=tmp_path, entries_dir=tmp_path / "entries")
 
     def stored_entries():
         rows = []
@@ -58,11 +58,6 @@ def test_eight_simultaneous_saves_with_same_token_only_write_once(tmp_path, monk
         return sorted(rows, key=lambda row: int(row["id"]))
 
     monkeypatch.setattr(repo, "ensure_dataset", lambda *_args, **_kwargs: paths)
-    monkeypatch.setattr(
-        repo,
-        "get_latest_entry_for_slot",
-        lambda **_kwargs: stored_entries()[-1] if stored_entries() else None,
-    )
     monkeypatch.setattr(
         repo,
         "_next_entry_id",
@@ -79,7 +74,7 @@ def test_eight_simultaneous_saves_with_same_token_only_write_once(tmp_path, monk
         lambda *_args, **_kwargs: {},
     )
     monkeypatch.setattr(repo, "_build_actor_payload", lambda **_kwargs: {})
-    monkeypatch.setattr(repo, "_append_audit", lambda *_args, **_kwargs: None)
+    monkeypatch.setattr(repo, "_append_audit", lambda *_args, **_kwargs: [])
     monkeypatch.setattr(repo, "save", lambda *_args, **_kwargs: None)
 
     starting_token = repo.compute_entry_revision_token(None)
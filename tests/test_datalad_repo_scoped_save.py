@@ -0,0 +1,57 @@
+import pytest
+
+from eCRF_backend.datalad_repo import _scoped_save_paths
+
+from conftest import STUDY_NAME, save_entry
+
+
+@pytest.fixture
+def saves(repo, monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        repo, "save", lambda ds_path, message, paths=None: calls.append((ds_path, message, paths))
+    )
+    return calls
+
+
+def _rel(ds_path, paths):
+    return _scoped_save_paths(ds_path.resolve(), paths)
+
+
+def test_save_entry_scopes_save_to_entry_and_audit_log(repo, saves):
+    entry = save_entry(repo)
+
+    ds_path, _msg, paths = saves[-1]
+    rel = _rel(ds_path, paths)
+    assert len(rel) == 2
+    assert any(r.startswith("canonical/entries/") and r.endswith(f"entry_{entry['id']:09d}.json") for r in rel)
+    assert any(r.startswith("canonical/audit/subject/") and r.endswith("events.jsonl") for r in rel)
+
+
+def test_update_entry_includes_old_path_and_diff_blob(repo, saves):
+    entry = save_entry(repo)
+    repo.update_entry(
+        study_id=1,
+        study_name=STUDY_NAME,
+        entry_id=entry["id"],
+        payload={"subject_index": 0, "visit_index": 1, "group_index": 0, "data": {"Vitals": {"pulse": 72}}},
+        actor="tester",
+    )
+
+    ds_path, _msg, paths = saves[-1]
+    rel = _rel(ds_path, paths)
+    entry_files = [r for r in rel if r.startswith("canonical/entries/")]
+    assert len(entry_files) == 2
+    assert any(r.startswith("canonical/audit/blobs/") for r in rel)
+
+
+def test_unknown_or_outside_paths_fall_back_to_full_save(tmp_path):
+    ds = tmp_path / "ds"
+    ds.mkdir()
+    assert _scoped_save_paths(ds, None) is None
+    assert _scoped_save_paths(ds, []) is None
+    assert _scoped_save_paths(ds, [tmp_path / "elsewhere.json"]) is None
+    assert _scoped_save_paths(ds, [ds / "a.json", ds / "a.json", ds / "gone" / "b.json"]) == [
+        "a.json",
+        "gone/b.json",
+    ]
@@ -0,0 +1,254 @@
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from eCRF_backend.datalad_git_commit import commit_paths, read_head
+from eCRF_backend.datalad_repo import note_own_commit
+
+from conftest import STUDY_NAME, save_entry
+
+
+def _slot_rows(repo, subject_index, visit_index):
+    return repo.find_entries_for_slot(
+        study_id=1,
+        study_name=STUDY_NAME,
+        subject_index=subject_index,
+        visit_index=visit_index,
+        group_index=0,
+        form_version=1,
+    )
+
+
+def test_slot_lookup_only_reads_indexed_entries(repo, monkeypatch):
+    first = save_entry(repo, 0, 0, 60)
+    second = save_entry(repo, 0, 0, 61)
+    save_entry(repo, 1, 0, 70)
+    save_entry(repo, 0, 1, 80)
+
+    def no_scan(*_args, **_kwargs):
+        raise AssertionError("slot lookup must not walk the entries tree")
+
+    monkeypatch.setattr(type(repo.paths(1, STUDY_NAME).entries_dir), "rglob", no_scan)
+
+    rows = _slot_rows(repo, 0, 0)
+    assert [row["id"] for row in rows] == [first["id"], second["id"]]
+
+    latest = repo.get_latest_entry_for_slot(
+        study_id=1,
+        study_name=STUDY_NAME,
+        subject_index=0,
+        visit_index=0,
+        group_index=0,
+        form_version=1,
+    )
+    assert latest["id"] == second["id"]
+    assert _slot_rows(repo, 1, 1) == []
+
+
+def test_update_entry_moves_entry_between_slot_indexes(repo):
+    saved = save_entry(repo, 0, 0, 60)
+    # The revision guard applies to the destination slot, which is empty.
+    token = repo.compute_entry_revision_token(None)
+
+    repo.update_entry(
+        study_id=1,
+        study_name=STUDY_NAME,
+        entry_id=saved["id"],
+        payload={
+            "subject_index": 1,
+            "visit_index": 1,
+            "group_index": 0,
+            "data": {"Vitals": {"pulse": 65}},
+        },
+        actor="tester",
+        expected_revision_token=token,
+    )
+
+    assert _slot_rows(repo, 0, 0) == []
+    moved = _slot_rows(repo, 1, 1)
+    assert [row["id"] for row in moved] == [saved["id"]]
+    assert moved[0]["data"] == {"Vitals": {"pulse": 65}}
+
+
+def test_slot_index_is_rebuilt_from_entry_files(repo):
+    first = save_entry(repo, 0, 0, 60)
+    second = save_entry(repo, 0, 0, 61)
+    p = repo.paths(1, STUDY_NAME)
+
+    shutil.rmtree(repo._slot_index_dir(p))
+
+    rows = _slot_rows(repo, 0, 0)
+    assert [row["id"] for row in rows] == [first["id"], second["id"]]
+    assert repo._slot_index_meta_path(p).exists()
+
+    assert repo.rebuild_slot_index(1, STUDY_NAME) == {"slot_count": 1}
+
+
+def _commit(path, message):
+    for args in (["add", "canonical"], ["commit", "-q", "-m", message]):
+        subprocess.run(
+            ["git", "-C", str(path), "-c", "user.name=t", "-c", "user.email=t@example.org", *args],
+            check=True,
+            capture_output=True,
+        )
+
+
+def test_slot_index_is_rebuilt_after_entries_change_in_git(repo, monkeypatch):
+    p = repo.paths(1, STUDY_NAME)
+    save_entry(repo, 0, 0, 60)
+    subprocess.run(["git", "init", "-q", str(p.dataset_path)], check=True)
+    _commit(p.dataset_path, "initial")
+    own = save_entry(repo, 0, 0, 61)
+    _commit(p.dataset_path, "own save")
+
+    rebuilds = []
+    real_rebuild = repo._rebuild_slot_index
+    monkeypatch.setattr(repo, "_rebuild_slot_index", lambda p: rebuilds.append(p) or real_rebuild(p))
+
+    def latest():
+        return repo.get_latest_entry_for_slot(
+            study_id=1, study_name=STUDY_NAME, subject_index=0, visit_index=0, group_index=0, form_version=1
+        )
+
+    # Our own commits are already indexed.
+    assert latest()["id"] == own["id"]
+    assert rebuilds == []
+
+    # An entry arriving through a pull or merge.
+    pulled = dict(own, id=own["id"] + 5, data={"Vitals": {"pulse": 99}}, updated_at="2999-01-01T00:00:00+00:00")
+    path = repo._entry_path(p, form_version=1, subject_index=0, visit_index=0, group_index=0, entry_id=pulled["id"])
+    path.write_text(json.dumps(pulled), encoding="utf-8")
+    _commit(p.dataset_path, "pulled")
+
+    assert latest()["id"] == pulled["id"]
+    assert len(rebuilds) == 1
+    assert repo.query_entries(1, STUDY_NAME, current_only=True)["entries"][0]["id"] == pulled["id"]
+
+
+def test_own_scoped_commits_advance_the_indexed_head(repo, monkeypatch):
+    p = repo.paths(1, STUDY_NAME)
+    save_entry(repo, 0, 0, 60)
+    subprocess.run(["git", "init", "-q", str(p.dataset_path)], check=True)
+    _commit(p.dataset_path, "initial")
+    repo.rebuild_slot_index(1, STUDY_NAME)
+
+    monkeypatch.setattr(
+        repo, "_entry_commits_indexed", lambda *_args: pytest.fail("own commits must not be diffed")
+    )
+    for value in range(61, 66):
+        entry = save_entry(repo, 0, 0, value)
+        path = next(p.entries_dir.rglob(f"entry_{entry['id']:09d}.json"))
+        before = read_head(p.dataset_path)
+        commit_paths(p.dataset_path, [str(path.relative_to(p.dataset_path))], "own save", name="t", email="t@x")
+        note_own_commit(p.dataset_path, before, read_head(p.dataset_path))
+        assert repo._slot_index_ready(p)
+
+    # A commit the repo did not record still goes through the diff.
+    _commit(p.dataset_path, "external")
+    assert repo._slot_index_ready(p) is False
+
+
+def test_current_only_listing_reads_heads_without_revision_history(repo, monkeypatch):
+    save_entry(repo, 0, 0, 60)
+    latest_first_slot = save_entry(repo, 0, 0, 61)
+    moved = save_entry(repo, 1, 0, 70)
+    repo.update_entry(
+        study_id=1,
+        study_name=STUDY_NAME,
+        entry_id=moved["id"],
+        payload={
+            "subject_index": 1,
+            "visit_index": 1,
+            "group_index": 0,
+            "data": {"Vitals": {"pulse": 71}},
+        },
+        actor="tester",
+        expected_revision_token=repo.compute_entry_revision_token(None),
+    )
+
+    monkeypatch.setattr(
+        repo,
+        "list_entries",
+        lambda *_args, **_kwargs: pytest.fail("current-only listing must not load every revision"),
+    )
+
+    heads = repo.query_entries(1, STUDY_NAME, current_only=True)["entries"]
+    assert [(row["id"], row["subject_index"], row["visit_index"]) for row in heads] == [
+        (latest_first_slot["id"], 0, 0),
+        (moved["id"], 1, 1),
+    ]
+    assert heads[1]["data"] == {"Vitals": {"pulse": 71}}
+
+    shutil.rmtree(repo._index_dir(repo.paths(1, STUDY_NAME)))
+    assert repo.query_entries(1, STUDY_NAME, current_only=True)["entries"] == heads
+
+
+def test_entry_write_only_rewrites_its_own_slot_index(repo):
+    for subject_index in range(2):
+        for visit_index in range(2):
+            save_entry(repo, subject_index, visit_index, 60)
+    p = repo.paths(1, STUDY_NAME)
+    before = {path: path.stat().st_mtime_ns for path in repo._slot_index_dir(p).rglob("slot_*.json")}
+
+    save_entry(repo, 1, 0, 61)
+
+    changed = [path for path, mtime in before.items() if path.stat().st_mtime_ns != mtime]
+    assert changed == [repo._slot_index_path(p, (1, 0, 0, 1))]
+
+
+def test_revision_tokens_are_stamped_at_write_time(repo, monkeypatch):
+    saved = save_entry(repo, 0, 0, 60)
+    assert saved["revision_token"] == repo._hash_entry_revision(saved)
+
+    def no_hash(*_args, **_kwargs):
+        raise AssertionError("stamped tokens must not be recomputed")
+
+    monkeypatch.setattr(repo, "_hash_entry_revision", no_hash)
+    token = repo.get_slot_revision_token(
+        study_id=1,
+        study_name=STUDY_NAME,
+        subject_index=0,
+        visit_index=0,
+        group_index=0,
+        form_version=1,
+    )
+    assert token == saved["revision_token"]
+    monkeypatch.undo()
+
+    updated = repo.update_entry(
+        study_id=1,
+        study_name=STUDY_NAME,
+        entry_id=saved["id"],
+        payload={
+            "subject_index": 0,
+            "visit_index": 0,
+            "group_index": 0,
+            "data": {"Vitals": {"pulse": 61}},
+        },
+        actor="tester",
+        expected_revision_token=token,
+    )
+    assert updated["revision_token"] != token
+    assert updated["revision_token"] == repo._hash_entry_revision(updated)
+
+
+def test_legacy_entries_without_token_fall_back_to_hashing(repo):
+    saved = save_entry(repo, 0, 0, 60)
+    p = repo.paths(1, STUDY_NAME)
+    entry_path = next(p.entries_dir.rglob(f"entry_{saved['id']:09d}.json"))
+    legacy = json.loads(entry_path.read_text(encoding="utf-8"))
+    legacy.pop("revision_token")
+    entry_path.write_text(json.dumps(legacy), encoding="utf-8")
+    repo.rebuild_slot_index(1, STUDY_NAME)
+
+    state = repo.get_current_slot_state(
+        study_id=1,
+        study_name=STUDY_NAME,
+        subject_index=0,
+        visit_index=0,
+        group_index=0,
+        form_version=1,
+    )
+    assert state["revision_token"] == saved["revision_token"]
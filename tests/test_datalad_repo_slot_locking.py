@@ -0,0 +1,109 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from eCRF_backend import datalad_repo
+from eCRF_backend.datalad_lock import LockSpec, dataset_lock
+from eCRF_backend.datalad_repo import SLOT_LOCK_STRIPES
+
+from conftest import STUDY_NAME, save_entry
+
+
+@pytest.fixture
+def repo(repo, monkeypatch):
+    monkeypatch.setattr(repo, "save", lambda *_args, **_kwargs: None)
+    # Building the index takes the dataset lock exclusively; do it up front.
+    repo.rebuild_slot_index(1, STUDY_NAME)
+    return repo
+
+
+def _save(repo, subject_index, value, token=None):
+    return save_entry(repo, subject_index, 0, value, expected_revision_token=token)
+
+
+def test_writers_for_different_subjects_overlap(repo, monkeypatch):
+    # Both writers must be inside their slot critical section at once.
+    inside = threading.Barrier(2, timeout=5)
+    real_add = repo._slot_index_add
+
+    def add(p, entry, path):
+        inside.wait()
+        return real_add(p, entry, path)
+
+    monkeypatch.setattr(repo, "_slot_index_add", add)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        entries = list(pool.map(lambda s: _save(repo, s, 60 + s), [0, 1]))
+
+    assert {e["id"] for e in entries} == {1, 2}
+    latest = repo.query_entries(1, STUDY_NAME, current_only=True)["entries"]
+    assert sorted((e["subject_index"], e["id"]) for e in latest) == sorted(
+        (e["subject_index"], e["id"]) for e in entries
+    )
+    assert repo.query_entries(1, STUDY_NAME)["total"] == 2
+
+
+def test_many_parallel_writers_keep_ids_and_heads_consistent(repo):
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        entries = list(pool.map(lambda i: _save(repo, i % 4, i), range(24)))
+
+    assert sorted(e["id"] for e in entries) == list(range(1, 25))
+    latest = {e["subject_index"]: e["id"] for e in repo.query_entries(1, STUDY_NAME, current_only=True)["entries"]}
+    expected = {}
+    for e in sorted(entries, key=lambda e: (e["updated_at"], e["created_at"], e["id"])):
+        expected[e["subject_index"]] = e["id"]
+    assert latest == expected
+
+
+def test_study_level_writer_excludes_slot_writers(repo):
+    p = repo.paths(1, STUDY_NAME)
+    with dataset_lock(LockSpec(dataset_path=p.dataset_path)):
+        with pytest.raises(RuntimeError, match="Timeout"):
+            with repo._slot_write_lock(p, [(0, 0, 0, 1)], timeout_s=0.2):
+                pass
+
+
+def test_slot_lock_files_are_bounded_by_stripe_count(repo):
+    p = repo.paths(1, STUDY_NAME)
+    slots = [(s, v, 0, 1) for s in range(40) for v in range(20)]
+    for i in range(0, len(slots), 100):
+        with repo._slot_write_lock(p, slots[i:i + 100]):
+            pass
+
+    lock_files = list((p.dataset_path / ".casee" / "locks").glob("slot_*.rw.lock"))
+    assert 0 < len(lock_files) <= SLOT_LOCK_STRIPES
+
+
+def test_revision_tokens_still_guard_each_slot(repo):
+    first = _save(repo, 0, 60)
+
+    _save(repo, 0, 61, token=first["revision_token"])
+    with pytest.raises(ValueError, match="Slot state changed"):
+        _save(repo, 0, 62, token=first["revision_token"])
+    # Another subject's slot is unaffected.
+    _save(repo, 1, 70, token=repo.compute_entry_revision_token(None))
+
+
+def test_readers_never_see_a_half_written_entry(repo, monkeypatch):
+    saved = _save(repo, 0, 60)
+    seen = []
+    real_replace = datalad_repo.os.replace
+
+    def replace_after_listing(src, dst):
+        # The new revision is fully written to a temporary file; the entry
+        # file itself still holds the old one.
+        seen.append([(e["id"], e["data"]) for e in repo.list_entries(1, STUDY_NAME)])
+        real_replace(src, dst)
+
+    monkeypatch.setattr(datalad_repo.os, "replace", replace_after_listing)
+    repo.update_entry(
+        study_id=1,
+        study_name=STUDY_NAME,
+        entry_id=saved["id"],
+        payload={"subject_index": 0, "visit_index": 0, "group_index": 0, "data": {"Vitals": {"pulse": 61}}},
+        actor="tester",
+        expected_revision_token=saved["revision_token"],
+    )
+
+    assert [(saved["id"], {"Vitals": {"pulse": 60}})] in seen
+    assert [e["data"] for e in repo.list_entries(1, STUDY_NAME)] == [{"Vitals": {"pulse": 61}}]
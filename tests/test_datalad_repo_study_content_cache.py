@@ -0,0 +1,41 @@
+from eCRF_backend import datalad_repo
+
+from conftest import STUDY_DATA, STUDY_NAME, save_entry
+
+
+def test_study_content_is_parsed_once_per_file_version(repo, monkeypatch):
+    p = repo.paths(1, STUDY_NAME)
+    parsed = []
+    real_load = datalad_repo._json_load
+
+    def counting_load(path, default=None):
+        if path == p.content_json:
+            parsed.append(path)
+        return real_load(path, default)
+
+    monkeypatch.setattr(datalad_repo, "_json_load", counting_load)
+    datalad_repo._study_content_cache.clear()
+
+    save_entry(repo, 0, 1)
+    save_entry(repo, 1, 1)
+
+    assert len(parsed) == 1
+    entry_dirs = sorted(f.parent.parent.parent.name for f in p.entries_dir.rglob("entry_*.json"))
+    assert entry_dirs == ["subject_00000_SUBJ-001", "subject_00001_SUBJ-002"]
+
+
+def test_study_content_write_refreshes_labels(repo):
+    p = repo.paths(1, STUDY_NAME)
+    assert repo._subject_label(p, 0) == "SUBJ-001"
+    assert repo._visit_label(p, 5) == "visit_06"
+
+    repo.update_study(
+        study_id=1,
+        current_study_name=STUDY_NAME,
+        study_name=STUDY_NAME,
+        study_description="",
+        study_data={**STUDY_DATA, "subjects": [{"id": "RENAMED"}]},
+    )
+
+    assert repo._subject_label(p, 0) == "RENAMED"
+    assert repo._subject_label(p, 1) == "subject_002"
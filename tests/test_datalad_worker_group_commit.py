@@ -0,0 +1,73 @@
+from dataclasses import replace
+from pathlib import Path
+
+from eCRF_backend.datalad_config import get_datalad_config
+from eCRF_backend.datalad_worker import DataladJob, DataladWorker
+
+
+def _worker(monkeypatch, window_s=0.05, max_batch=50, workers=1):
+    monkeypatch.setenv("ECRF_DATALAD_MODE", "shadow")
+    cfg = replace(
+        get_datalad_config(), commit_window_s=window_s, commit_max_batch=max_batch, workers=workers
+    )
+    worker = DataladWorker(cfg, log=lambda _msg: None)
+    executed = []
+    worker._execute = executed.append
+    return worker, executed
+
+
+def test_saves_for_one_dataset_are_merged_into_one_commit(monkeypatch):
+    worker, executed = _worker(monkeypatch)
+    for i in range(10):
+        worker.enqueue_save(Path("/ds/a"), f"case-e: upsert_entry study=1 entry={i}")
+    worker.enqueue_save(Path("/ds/b"), "case-e: update_study study=2")
+    worker.enqueue_save(Path("/ds/a"), "case-e: update_entry study=1 entry=3")
+    worker.enqueue_push(Path("/ds/a"), to="ria")
+
+    worker.start()
+    worker.join()
+    worker.stop()
+
+    assert [(str(job.dataset_path), job.op, job.merged) for job in executed] == [
+        ("/ds/a", "save", 11),
+        ("/ds/b", "save", 1),
+        ("/ds/a", "push", 1),
+    ]
+    header, _, body = executed[0].message.partition("\n\n")
+    assert header == "case-e: batch of 11 saves (upsert_entry x10, update_entry x1)"
+    assert len(body.splitlines()) == 11
+
+    stats = worker.stats()
+    assert stats["commits"] == 2
+    assert stats["jobs"] == 12
+    assert stats["max_batch"] == 11
+    assert stats["queued"] == 0
+
+
+def test_max_batch_caps_group_size(monkeypatch):
+    worker, executed = _worker(monkeypatch, max_batch=4)
+    for i in range(10):
+        worker.enqueue(DataladJob(dataset_path=Path("/ds/a"), op="save", message=f"case-e: save {i}"))
+
+    worker.start()
+    worker.join()
+    worker.stop()
+
+    assert [job.merged for job in executed] == [4, 4, 2]
+
+
+def test_merged_save_unions_paths_and_falls_back_to_full_save(monkeypatch):
+    worker, executed = _worker(monkeypatch)
+    worker.enqueue_save(Path("/ds/a"), "case-e: upsert_entry study=1 entry=1", paths=["canonical/x.json"])
+    worker.enqueue_save(Path("/ds/a"), "case-e: upsert_entry study=1 entry=2", paths=["canonical/y.json", "canonical/x.json"])
+    worker.enqueue_save(Path("/ds/b"), "case-e: upsert_entry study=2 entry=1", paths=["canonical/z.json"])
+    worker.enqueue_save(Path("/ds/b"), "case-e: update_study study=2")
+
+    worker.start()
+    worker.join()
+    worker.stop()
+
+    assert [(str(job.dataset_path), job.paths) for job in executed] == [
+        ("/ds/a", ["canonical/x.json", "canonical/y.json"]),
+        ("/ds/b", None),
+    ]
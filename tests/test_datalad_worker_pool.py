@@ -0,0 +1,101 @@
+import threading
+import time
+from dataclasses import replace
+from pathlib import Path
+
+from eCRF_backend.datalad_config import get_datalad_config
+from eCRF_backend.datalad_worker import DataladWorker
+
+
+def _pool(monkeypatch, workers=4, max_batch=50):
+    monkeypatch.setenv("ECRF_DATALAD_MODE", "shadow")
+    cfg = replace(get_datalad_config(), commit_window_s=0.0, commit_max_batch=max_batch, workers=workers)
+    return DataladWorker(cfg, log=lambda _msg: None)
+
+
+def _paths_on_distinct_shards(worker, count):
+    seen, paths = set(), []
+    i = 0
+    while len(paths) < count:
+        path = Path(f"/ds/study-{i}")
+        shard = worker._shard_for(path).index
+        if shard not in seen:
+            seen.add(shard)
+            paths.append(path)
+        i += 1
+    return paths
+
+
+def test_slow_dataset_does_not_block_other_shards(monkeypatch):
+    worker = _pool(monkeypatch, workers=2)
+    slow, fast = _paths_on_distinct_shards(worker, 2)
+    release = threading.Event()
+    fast_done = threading.Event()
+
+    def execute(job):
+        if job.dataset_path == slow:
+            release.wait(5)
+        else:
+            fast_done.set()
+
+    worker._execute = execute
+    worker.start()
+    worker.enqueue_push(slow, to="ria")
+    worker.enqueue_save(fast, "case-e: update_study study=2")
+
+    assert fast_done.wait(2)
+    # The fast shard finishes while the slow one is still busy.
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline:
+        busy = [w["current"] for w in worker.stats()["workers"] if w["current"]]
+        if busy == [f"push {slow}"]:
+            break
+        time.sleep(0.01)
+    assert busy == [f"push {slow}"]
+
+    release.set()
+    worker.join()
+    worker.stop()
+    assert sum(w["jobs"] for w in worker.stats()["workers"]) == 2
+
+
+def test_jobs_for_one_dataset_keep_their_order(monkeypatch):
+    worker = _pool(monkeypatch, max_batch=1)
+    executed = []
+    worker._execute = lambda job: executed.append((str(job.dataset_path), job.op))
+    for i in range(4):
+        worker.enqueue_save(Path("/ds/a"), f"case-e: save {i}")
+        worker.enqueue_push(Path("/ds/a"), to="ria")
+
+    worker.start()
+    worker.join()
+    worker.stop()
+
+    assert [op for path, op in executed if path == "/ds/a"] == ["save", "push"] * 4
+
+
+def test_failed_job_is_re_enqueued_without_blocking_the_shard(monkeypatch):
+    worker = _pool(monkeypatch, workers=1)
+    attempts = []
+
+    def execute(job):
+        attempts.append((str(job.dataset_path), time.monotonic()))
+        if job.dataset_path == Path("/ds/flaky") and job.attempt == 0:
+            raise RuntimeError("remote unavailable")
+
+    worker._execute = execute
+    worker.enqueue_push(Path("/ds/flaky"), to="ria")
+    worker.enqueue_save(Path("/ds/other"), "case-e: save")
+
+    worker.start()
+    worker.join()
+    worker.stop()
+
+    assert [path for path, _ in attempts] == ["/ds/flaky", "/ds/other", "/ds/flaky"]
+    # The other dataset ran during the backoff instead of after it.
+    assert attempts[1][1] - attempts[0][1] < 1.0
+    assert attempts[2][1] - attempts[0][1] >= 2.0
+    stats = worker.stats()
+    assert stats["retries"] == 1
+    assert stats["failed"] == 0
+    assert stats["queued"] == 0
@@ -22,7 +22,7 @@ def test_worker_can_save(tmp_path: Path, monkeypatch):
     w.start()
     (ds_path / "hello.txt").write_text("hi", encoding="utf-8")
     w.enqueue_save(ds_path, "test save")
-    w._q.join()
+    w.join()
     w.stop()
 
     assert any("Saved dataset" in x for x in logs)